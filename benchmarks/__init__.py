@@ -0,0 +1,3 @@
+"""
+Benchmarks for notebook-cat.
+"""
@@ -0,0 +1,165 @@
+"""
+Deterministic synthetic corpus generator for the notebook-cat benchmarks.
+
+The same settings and seed always produce byte-identical files, so results
+from different runs and machines can be compared.
+"""
+
+import json
+import math
+import random
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+# Words the corpus text is drawn from
+VOCABULARY = (
+    "the of and to in is was for on that with as by at from notebook source "
+    "research paper transcript episode chapter section summary analysis model "
+    "data result method table figure note question answer example context "
+    "language system value process number point time people world work study"
+).split()
+
+# Size distributions of the number of words per file
+SIZE_DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+
+# Shapes of generated JSON files, with the --json-path that selects their text
+JSON_SHAPES: Dict[str, Optional[str]] = {
+    "text": "text",  # {"title": ..., "text": ...}
+    "segments": "segments.*.text",  # {"segments": [{"speaker": ..., "text": ...}, ...]}
+    "strings": None,  # [paragraph, paragraph, ...]
+    "nested": "episode.transcript.segments.*.text",  # Segments nested inside metadata objects
+}
+
+DEFAULT_MIX = {"txt": 5, "md": 3, "json": 2}
+
+
+class CorpusFile(NamedTuple):
+    """A generated file and the number of words of text it holds."""
+    path: Path
+    words: int
+    size: int
+
+
+class Corpus(NamedTuple):
+    """A generated corpus."""
+    directory: Path
+    files: List[CorpusFile]
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(f.size for f in self.files)
+
+    @property
+    def total_words(self) -> int:
+        return sum(f.words for f in self.files)
+
+
+def parse_mix(mix: str) -> Dict[str, int]:
+    """
+    Parse a file type mix such as "txt=5,md=3,json=2".
+
+    Args:
+        mix: Comma separated extension=weight pairs
+
+    Returns:
+        Weight of each extension
+    """
+    weights = {}
+    for item in mix.split(","):
+        extension, _, weight = item.partition("=")
+        extension = extension.strip().lstrip(".").lower()
+        if extension not in DEFAULT_MIX:
+            raise ValueError(f"Unsupported file type in mix: {extension}")
+        weights[extension] = int(weight) if weight else 1
+    if not any(weights.values()):
+        raise ValueError("The file type mix needs a positive weight")
+    return weights
+
+
+def _word_count(rng: random.Random, distribution: str, mean_words: int) -> int:
+    if distribution == "fixed":
+        return mean_words
+    if distribution == "uniform":
+        return rng.randint(1, 2 * mean_words - 1) if mean_words > 1 else 1
+    if distribution == "lognormal":
+        # Heavy-tailed, like real document collections; sigma 1 keeps the mean
+        sigma = 1.0
+        return max(1, int(rng.lognormvariate(math.log(mean_words) - sigma ** 2 / 2, sigma)))
+    raise ValueError(f"Unknown size distribution: {distribution}")
+
+
+def _paragraphs(rng: random.Random, words: int) -> List[str]:
+    """Split `words` random words into paragraphs of up to 120 words."""
+    paragraphs = []
+    while words > 0:
+        length = min(words, rng.randint(20, 120))
+        paragraphs.append(" ".join(rng.choice(VOCABULARY) for _ in range(length)))
+        words -= length
+    return paragraphs
+
+
+def _json_document(rng: random.Random, shape: str, paragraphs: List[str], index: int):
+    segments = [{"speaker": f"Speaker {i % 3 + 1}", "start": i * 30, "text": text}
+                for i, text in enumerate(paragraphs)]
+    if shape == "text":
+        return {"title": f"Document {index}", "text": "\n\n".join(paragraphs)}
+    if shape == "segments":
+        return {"title": f"Episode {index}", "segments": segments}
+    if shape == "strings":
+        return paragraphs
+    if shape == "nested":
+        return {"episode": {"id": index, "meta": {"language": "en", "tags": ["benchmark"]},
+                            "transcript": {"segments": segments}}}
+    raise ValueError(f"Unknown JSON shape: {shape}")
+
+
+def generate_corpus(directory: Path, files: int = 1000, seed: int = 0,
+                    mean_words: int = 2000, distribution: str = "lognormal",
+                    mix: Optional[Dict[str, int]] = None, json_shape: str = "segments",
+                    subdirectories: int = 0) -> Corpus:
+    """
+    Write a synthetic corpus of text, markdown and JSON files.
+
+    Args:
+        directory: Directory to write the files to (created if needed)
+        files: Number of files to generate
+        seed: Random seed; the same settings and seed give identical files
+        mean_words: Mean number of words per file
+        distribution: Distribution of words per file (see SIZE_DISTRIBUTIONS)
+        mix: Relative weight of each file type (default: DEFAULT_MIX)
+        json_shape: Structure of the JSON files (see JSON_SHAPES)
+        subdirectories: Number of subdirectories to spread the files over
+            (0 writes every file directly in directory)
+
+    Returns:
+        The generated corpus
+    """
+    if json_shape not in JSON_SHAPES:
+        raise ValueError(f"Unknown JSON shape: {json_shape}")
+    mix = mix or DEFAULT_MIX
+    extensions = [extension for extension, weight in mix.items() if weight > 0]
+    weights = [mix[extension] for extension in extensions]
+    rng = random.Random(seed)
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    generated = []
+    for index in range(files):
+        extension = rng.choices(extensions, weights)[0]
+        words = _word_count(rng, distribution, mean_words)
+        paragraphs = _paragraphs(rng, words)
+        if extension == "json":
+            content = json.dumps(_json_document(rng, json_shape, paragraphs, index), indent=2)
+        elif extension == "md":
+            content = f"# Document {index}\n\n" + "\n\n".join(paragraphs) + "\n"
+            words += 3  # The heading: "#", "Document" and the number
+        else:
+            content = "\n\n".join(paragraphs) + "\n"
+
+        parent = directory / f"part_{index % subdirectories:03d}" if subdirectories else directory
+        parent.mkdir(exist_ok=True)
+        path = parent / f"doc_{index:06d}.{extension}"
+        data = content.encode("utf-8")
+        path.write_bytes(data)
+        generated.append(CorpusFile(path, words, len(data)))
+    return Corpus(directory, generated)
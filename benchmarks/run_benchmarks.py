@@ -0,0 +1,280 @@
+"""
+Throughput benchmarks for notebook-cat.
+
+Generates a synthetic corpus (see corpus.py) and times the main stages of
+the tool on it, reporting files/s and MB/s of input for each. The
+import_main benchmark times the startup of the command line tool instead
+(importing notebook_cat.main in a fresh interpreter), with no input:
+
+    python benchmarks/run_benchmarks.py --files 2000 --mean-words 3000
+    python benchmarks/run_benchmarks.py --only count_words_in_file,process_directory --json results.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+# Run against the source tree, like the tests
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.notebook_cat import core
+from benchmarks.corpus import (
+    Corpus, DEFAULT_MIX, JSON_SHAPES, SIZE_DISTRIBUTIONS, generate_corpus, parse_mix
+)
+
+
+class BenchmarkResult(NamedTuple):
+    """Best time of a benchmark over its repeats, with the input it processed."""
+    name: str
+    files: int
+    bytes: int
+    seconds: float
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / self.seconds if self.seconds > 0 else float("inf")
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.bytes / 1e6 / self.seconds if self.seconds > 0 else float("inf")
+
+
+def _best_time(run: Callable[[], None], repeat: int) -> float:
+    """Run `run` `repeat` times with its output silenced and return the fastest time."""
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_count_words_in_file(corpus: Corpus, work_dir: Path, repeat: int,
+                              json_path: Optional[str]) -> Optional[BenchmarkResult]:
+    paths = [f.path for f in corpus.files]
+    seconds = _best_time(lambda: [core.count_words_in_file(path, json_path) for path in paths], repeat)
+    return BenchmarkResult("count_words_in_file", len(paths), corpus.total_bytes, seconds)
+
+
+def bench_count_words_numpy(corpus: Corpus, work_dir: Path, repeat: int,
+                            json_path: Optional[str]) -> Optional[BenchmarkResult]:
+    # Same files as count_words_in_file, so the two engines can be compared;
+    # JSON files are counted by both after extracting their text
+    try:
+        core.check_count_engine("numpy")
+    except ValueError as e:
+        print(f"Skipping count_words_numpy: {e}")
+        return None
+    paths = [f.path for f in corpus.files]
+    seconds = _best_time(lambda: [core.count_words_in_file(path, json_path, engine="numpy") for path in paths],
+                         repeat)
+    return BenchmarkResult("count_words_numpy", len(paths), corpus.total_bytes, seconds)
+
+
+def bench_extract_text_from_json(corpus: Corpus, work_dir: Path, repeat: int,
+                                 json_path: Optional[str]) -> Optional[BenchmarkResult]:
+    json_files = [f for f in corpus.files if f.path.suffix == ".json"]
+    if not json_files:
+        return None
+    seconds = _best_time(lambda: [core.extract_text_from_json(f.path, json_path) for f in json_files], repeat)
+    return BenchmarkResult("extract_text_from_json", len(json_files), sum(f.size for f in json_files), seconds)
+
+
+def bench_group_files(corpus: Corpus, work_dir: Path, repeat: int,
+                      json_path: Optional[str]) -> Optional[BenchmarkResult]:
+    files_with_counts = [(f.path, f.words) for f in corpus.files]
+    # No source limit, so every file is placed
+    seconds = _best_time(lambda: core.group_files(files_with_counts, len(files_with_counts)), repeat)
+    return BenchmarkResult("group_files", len(files_with_counts), corpus.total_bytes, seconds)
+
+
+def bench_concatenate_files(corpus: Corpus, work_dir: Path, repeat: int,
+                            json_path: Optional[str]) -> Optional[BenchmarkResult]:
+    files_with_counts = [(f.path, f.words) for f in corpus.files]
+    with contextlib.redirect_stdout(io.StringIO()):
+        groups, _ = core.group_files(files_with_counts, len(files_with_counts))
+    output_dir = work_dir / "concatenate"
+    output_dir.mkdir()
+
+    def run():
+        for number, group in enumerate(groups, 1):
+            core.concatenate_files(group, output_dir / f"notebooklm_source_{number}.txt")
+
+    seconds = _best_time(run, repeat)
+    grouped = {str(path) for group in groups for path, _ in group}
+    sizes = [f.size for f in corpus.files if str(f.path) in grouped]
+    return BenchmarkResult("concatenate_files", len(sizes), sum(sizes), seconds)
+
+
+def bench_process_directory(corpus: Corpus, work_dir: Path, repeat: int,
+                            json_path: Optional[str]) -> Optional[BenchmarkResult]:
+    output_dir = work_dir / "process"
+
+    def run():
+        # Start from an empty output directory every time
+        shutil.rmtree(output_dir, ignore_errors=True)
+        core.process_directory(str(corpus.directory), str(output_dir), source_limit=len(corpus.files),
+                               json_path=json_path, recursive=True)
+
+    seconds = _best_time(run, repeat)
+    return BenchmarkResult("process_directory", len(corpus.files), corpus.total_bytes, seconds)
+
+
+def bench_process_directory_zip(corpus: Corpus, work_dir: Path, repeat: int,
+                                json_path: Optional[str]) -> Optional[BenchmarkResult]:
+    output_dir = work_dir / "process"
+
+    def run():
+        shutil.rmtree(output_dir, ignore_errors=True)
+        output_dir.mkdir()
+        core.process_directory(str(corpus.directory), str(output_dir), source_limit=len(corpus.files),
+                               json_path=json_path, recursive=True,
+                               zip_path=str(output_dir / "notebook_cat_output.zip"))
+
+    seconds = _best_time(run, repeat)
+    return BenchmarkResult("process_directory_zip", len(corpus.files), corpus.total_bytes, seconds)
+
+
+def bench_webui_zip(corpus: Corpus, work_dir: Path, repeat: int,
+                    json_path: Optional[str]) -> Optional[BenchmarkResult]:
+    try:
+        from src.notebook_cat import webui
+    except ImportError:
+        print("Skipping webui_zip: the web UI module could not be imported.")
+        return None
+    paths = [str(f.path) for f in corpus.files]
+
+    def run():
+        # The web UI processes the uploads in place and returns a ZIP of the
+        # sources in a new workspace
+        outputs, status, _ = webui.process_files(paths, plan_type="plus", json_path=json_path)
+        if not outputs or not outputs[0].endswith(".zip"):
+            raise RuntimeError(f"The web UI did not produce a ZIP: {status}")
+        shutil.rmtree(os.path.dirname(outputs[0]), ignore_errors=True)
+
+    seconds = _best_time(run, repeat)
+    return BenchmarkResult("webui_zip", len(paths), corpus.total_bytes, seconds)
+
+
+def bench_import_main(corpus: Corpus, work_dir: Path, repeat: int,
+                      json_path: Optional[str]) -> Optional[BenchmarkResult]:
+    # Timed inside a fresh interpreter, so the interpreter's own startup is not counted
+    code = ("import time; start = time.perf_counter(); import notebook_cat.main; "
+            "print(time.perf_counter() - start)")
+    environment = dict(os.environ, PYTHONPATH=os.path.join(os.path.dirname(__file__), '..', 'src'))
+    seconds = min(float(subprocess.run([sys.executable, "-c", code], env=environment, capture_output=True,
+                                       text=True, check=True).stdout)
+                  for _ in range(max(1, repeat)))
+    return BenchmarkResult("import_main", 0, 0, seconds)
+
+
+# Benchmarks by name, in the order they run
+BENCHMARKS: Dict[str, Callable[..., Optional[BenchmarkResult]]] = {
+    "count_words_in_file": bench_count_words_in_file,
+    "count_words_numpy": bench_count_words_numpy,
+    "extract_text_from_json": bench_extract_text_from_json,
+    "group_files": bench_group_files,
+    "concatenate_files": bench_concatenate_files,
+    "process_directory": bench_process_directory,
+    "process_directory_zip": bench_process_directory_zip,
+    "webui_zip": bench_webui_zip,
+    "import_main": bench_import_main,
+}
+
+
+def run_benchmarks(corpus: Corpus, names: Optional[List[str]] = None, repeat: int = 3,
+                   json_path: Optional[str] = None) -> List[BenchmarkResult]:
+    """
+    Run benchmarks on a corpus.
+
+    Args:
+        corpus: Corpus to process
+        names: Benchmarks to run (default: all of BENCHMARKS)
+        repeat: Number of times each benchmark is run; the fastest is reported
+        json_path: JSON path used to extract text from the JSON files
+
+    Returns:
+        Results of the benchmarks that ran
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for name in names or BENCHMARKS:
+            work_dir = Path(tmpdir) / name
+            work_dir.mkdir()
+            result = BENCHMARKS[name](corpus, work_dir, repeat, json_path)
+            if result is not None:
+                results.append(result)
+    return results
+
+
+def format_results(results: List[BenchmarkResult]) -> str:
+    """Format benchmark results as a table."""
+    lines = [f"{'Benchmark':<24}{'Files':>10}{'MB':>10}{'Seconds':>10}{'Files/s':>12}{'MB/s':>10}"]
+    for r in results:
+        lines.append(f"{r.name:<24}{r.files:>10}{r.bytes / 1e6:>10.1f}{r.seconds:>10.3f}"
+                     f"{r.files_per_second:>12.0f}{r.mb_per_second:>10.1f}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main entry point for the benchmarks."""
+    parser = argparse.ArgumentParser(description="Measure notebook-cat throughput on a synthetic corpus.")
+    parser.add_argument("--files", type=int, default=1000, help="Number of files to generate (default: 1000)")
+    parser.add_argument("--mean-words", type=int, default=2000, help="Mean words per file (default: 2000)")
+    parser.add_argument("--distribution", choices=SIZE_DISTRIBUTIONS, default="lognormal",
+                        help="Distribution of words per file (default: lognormal)")
+    parser.add_argument("--mix", type=str, default=",".join(f"{k}={v}" for k, v in DEFAULT_MIX.items()),
+                        help="Relative weight of each file type (default: txt=5,md=3,json=2)")
+    parser.add_argument("--json-shape", choices=sorted(JSON_SHAPES), default="segments",
+                        help="Structure of the generated JSON files (default: segments)")
+    parser.add_argument("--subdirectories", type=int, default=0,
+                        help="Spread the files over this many subdirectories (default: 0)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the corpus (default: 0)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Runs per benchmark; the fastest is reported (default: 3)")
+    parser.add_argument("--only", type=str, help=f"Comma separated benchmarks to run, of: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--corpus-dir", type=str,
+                        help="Write the corpus here and keep it (default: a temporary directory)")
+    parser.add_argument("--json", dest="json_output", type=str, help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    names = [name.strip() for name in args.only.split(",")] if args.only else None
+    unknown = [name for name in names or [] if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"Unknown benchmarks: {', '.join(unknown)}")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        corpus_dir = Path(args.corpus_dir) if args.corpus_dir else Path(tmpdir) / "corpus"
+        corpus = generate_corpus(corpus_dir, args.files, args.seed, args.mean_words, args.distribution,
+                                 mix, args.json_shape, args.subdirectories)
+        print(f"Corpus: {len(corpus.files)} files, {corpus.total_words} words, "
+              f"{corpus.total_bytes / 1e6:.1f} MB in '{corpus.directory}'")
+        results = run_benchmarks(corpus, names, args.repeat, JSON_SHAPES[args.json_shape])
+
+    print(format_results(results))
+    if args.json_output:
+        with open(args.json_output, 'w', encoding='utf-8') as f:
+            json.dump({
+                "corpus": {"files": args.files, "mean_words": args.mean_words, "distribution": args.distribution,
+                           "mix": mix, "json_shape": args.json_shape, "seed": args.seed},
+                "results": [dict(r._asdict(), files_per_second=r.files_per_second, mb_per_second=r.mb_per_second)
+                            for r in results],
+            }, f, indent=2)
+        print(f"Results written to {args.json_output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -20,6 +20,10 @@ setup(
     install_requires=[
         'gradio>=3.36.1',  # Compatible with current installed version
     ],
+    extras_require={
+        'numpy': ['numpy'],  # --count-engine numpy
+        'zstd': ['zstandard'],  # .zst input files before Python 3.14
+    },
     classifiers=[
         'Development Status :: 5 - Production/Stable',
         'Intended Audience :: End Users/Desktop',
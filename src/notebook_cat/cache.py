@@ -0,0 +1,168 @@
+"""
+Persistent word count cache for notebook-cat.
+
+Word counts are stored in a small SQLite database keyed by file path, size,
+modification time and the JSON path used for extraction, so files that have
+not changed since the previous run do not need to be read again.
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from .jsonpath import JsonPathLike
+
+# Fingerprint of a file: (size in bytes, modification time in nanoseconds)
+Fingerprint = Tuple[int, int]
+
+
+def file_fingerprint(filepath: Path) -> Fingerprint:
+    """
+    Get the fingerprint used to detect changes to a file.
+
+    Args:
+        filepath: Path to the file
+
+    Returns:
+        tuple: (size, mtime_ns)
+    """
+    stat = os.stat(filepath)
+    return stat.st_size, stat.st_mtime_ns
+
+
+class WordCountCache:
+    """
+    On-disk cache of word counts.
+
+    By default all entries for the JSON path in use are loaded when the cache
+    is opened, so lookups do not touch the database. For very large corpora
+    the entries can instead be looked up in the database one at a time, so
+    they are not all held in memory. New counts are written in a single
+    transaction by ``save``.
+    """
+
+    def __init__(self, db_path: Path, json_path: Optional[JsonPathLike] = None,
+                 preload: bool = True):
+        """
+        Open (or create) a word count cache.
+
+        Args:
+            db_path: Path to the SQLite database file
+            json_path: JSON path (expression or compiled) used for extraction,
+                part of the cache key
+            preload: If True, load every entry into memory; if False, look
+                entries up in the database when they are needed
+        """
+        self.db_path = Path(db_path)
+        self.json_path = str(json_path) if json_path else ""
+        self.hits = 0
+        self.misses = 0
+        self._pending: Dict[str, Tuple[int, int, int]] = {}
+
+        import sqlite3  # Loaded on first use, to keep startup fast
+        self._conn = sqlite3.connect(str(self.db_path))
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS word_counts ("
+            " path TEXT NOT NULL,"
+            " json_path TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL,"
+            " words INTEGER NOT NULL,"
+            " PRIMARY KEY (path, json_path))"
+        )
+        self._conn.commit()
+
+        self._entries: Optional[Dict[str, Tuple[int, int, int]]] = None
+        if preload:
+            rows = self._conn.execute(
+                "SELECT path, size, mtime_ns, words FROM word_counts WHERE json_path = ?",
+                (self.json_path,)
+            )
+            self._entries = {path: (size, mtime_ns, words) for path, size, mtime_ns, words in rows}
+
+    @staticmethod
+    def _key(filepath: Path) -> str:
+        return os.path.abspath(str(filepath))
+
+    def get(self, filepath: Path, fingerprint: Optional[Fingerprint]) -> Optional[int]:
+        """
+        Look up the cached word count of a file.
+
+        Args:
+            filepath: Path to the file
+            fingerprint: Current (size, mtime_ns) of the file, or None if unknown
+
+        Returns:
+            The cached word count, or None if the file is new or has changed
+        """
+        entry = self._lookup(self._key(filepath)) if fingerprint is not None else None
+        if entry is not None and entry[:2] == tuple(fingerprint):
+            self.hits += 1
+            return entry[2]
+        self.misses += 1
+        return None
+
+    def _lookup(self, key: str) -> Optional[Tuple[int, int, int]]:
+        if self._entries is not None:
+            return self._entries.get(key)
+        entry = self._pending.get(key)
+        if entry is None:
+            entry = self._conn.execute(
+                "SELECT size, mtime_ns, words FROM word_counts WHERE path = ? AND json_path = ?",
+                (key, self.json_path)
+            ).fetchone()
+        return entry
+
+    def put(self, filepath: Path, fingerprint: Fingerprint, words: int):
+        """
+        Record the word count of a file. Changes are written by ``save``.
+
+        Files with zero words are not cached, since a zero count may also
+        mean the file could not be read.
+
+        Args:
+            filepath: Path to the file
+            fingerprint: (size, mtime_ns) of the file when it was counted
+            words: Word count of the file
+        """
+        if words <= 0:
+            return
+        size, mtime_ns = fingerprint
+        key = self._key(filepath)
+        if self._entries is not None:
+            self._entries[key] = (size, mtime_ns, words)
+        self._pending[key] = (size, mtime_ns, words)
+
+    def save(self):
+        """Write pending entries to the database."""
+        if not self._pending:
+            return
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO word_counts (path, json_path, size, mtime_ns, words) "
+                "VALUES (?, ?, ?, ?, ?)",
+                ((path, self.json_path, size, mtime_ns, words)
+                 for path, (size, mtime_ns, words) in self._pending.items())
+            )
+        self._pending.clear()
+
+    def clear(self):
+        """Invalidate every cached entry, for all JSON paths."""
+        with self._conn:
+            self._conn.execute("DELETE FROM word_counts")
+        if self._entries is not None:
+            self._entries.clear()
+        self._pending.clear()
+
+    def close(self):
+        """Save pending entries and close the database."""
+        try:
+            self.save()
+        finally:
+            self._conn.close()
+
+    def stats_message(self) -> str:
+        """Human readable hit/miss statistics."""
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0.0
+        return f"Word count cache: {self.hits} hits, {self.misses} misses ({rate:.1f}% hit rate)"
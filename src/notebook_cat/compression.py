@@ -0,0 +1,128 @@
+"""
+Compressed input files for notebook-cat.
+
+Input files may be compressed with gzip, bzip2, xz or Zstandard, e.g.
+``transcript.txt.gz`` or ``segments.json.xz``. Such a file is treated as the
+file type its name has without the compression suffix, and is decompressed
+as a stream while it is counted and written, so it never needs to be
+decompressed to disk or held in memory as a whole.
+
+gzip, bzip2 and xz are read with the standard library. Zstandard uses the
+``compression.zstd`` module of Python 3.14 or later, or else the optional
+zstandard package; use available() to check for it before reading ``.zst``
+files.
+"""
+
+import io
+import os
+from pathlib import Path
+from typing import BinaryIO, Optional, TextIO
+
+from .config.defaults import COMPRESSED_EXTENSIONS
+
+
+def compression_of(filepath: Path) -> Optional[str]:
+    """
+    Return the compression format of a file from its name.
+
+    Args:
+        filepath: Path to the file
+
+    Returns:
+        "gzip", "bz2", "xz" or "zstd", or None for an uncompressed file
+    """
+    return COMPRESSED_EXTENSIONS.get(Path(filepath).suffix.lower()[1:])
+
+
+def file_extension(filepath: Path) -> str:
+    """
+    Return the extension of a file's content, without the compression suffix.
+
+    For example "txt" for both ``notes.txt`` and ``notes.txt.gz``.
+    """
+    name = Path(filepath).name
+    if compression_of(filepath) is not None:
+        name = os.path.splitext(name)[0]
+    return os.path.splitext(name)[1].lower()[1:]
+
+
+def _zstd_module():
+    """Return the module used to read Zstandard files, or None if there is none."""
+    try:
+        from compression import zstd  # Python 3.14 and later
+        return zstd
+    except ImportError:
+        pass
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        return None
+
+
+def available(compression: str) -> bool:
+    """Return True if files compressed in this format can be read."""
+    if compression == "zstd":
+        return _zstd_module() is not None
+    return compression in COMPRESSED_EXTENSIONS.values()
+
+
+def open_binary(filepath: Path) -> BinaryIO:
+    """
+    Open a file for reading its bytes, decompressing them if it is compressed.
+
+    Args:
+        filepath: Path to the file
+
+    Returns:
+        Binary stream of the (decompressed) content
+
+    Raises:
+        OSError: If the file cannot be opened
+        ValueError: If it is Zstandard-compressed and no Zstandard module is installed
+    """
+    compression = compression_of(filepath)
+    # The modules are imported on first use, to keep startup fast
+    if compression is None:
+        return open(filepath, 'rb')
+    if compression == "gzip":
+        import gzip
+        return gzip.open(filepath, 'rb')
+    if compression == "bz2":
+        import bz2
+        return bz2.open(filepath, 'rb')
+    if compression == "xz":
+        import lzma
+        return lzma.open(filepath, 'rb')
+
+    zstd = _zstd_module()
+    if zstd is None:
+        raise ValueError(f"Reading {Path(filepath).name} requires Zstandard support. "
+                         "Install it with: pip install zstandard")
+    if hasattr(zstd, "ZstdFile"):
+        return zstd.ZstdFile(filepath, 'rb')
+    # zstandard package: a file may hold several frames, as zstd writes them
+    raw = open(filepath, 'rb')
+    try:
+        reader = zstd.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True)
+    except Exception:
+        raw.close()
+        raise
+    return io.BufferedReader(reader)
+
+
+def open_text(filepath: Path) -> TextIO:
+    """
+    Open a UTF-8 file as text, decompressing it if it is compressed.
+
+    Newlines are translated as by ``open(filepath, 'r', encoding='utf-8')``.
+
+    Args:
+        filepath: Path to the file
+
+    Returns:
+        Text stream of the (decompressed) content
+    """
+    if compression_of(filepath) is None:
+        return open(filepath, 'r', encoding='utf-8')
+    return io.TextIOWrapper(open_binary(filepath), encoding='utf-8')
@@ -1,23 +1,12 @@
 # Default configuration values for NotebookLM
-import sys
-import os
-from pathlib import Path
-
-# Try to import from the root config file
-try:
-    # Add project root to sys.path if not already there
-    project_root = Path(__file__).parents[3]  # Go up 3 levels to reach project root
-    if str(project_root) not in sys.path:
-        sys.path.insert(0, str(project_root))
-    
-    # Import from the root config
-    from config import WORD_LIMIT, DEFAULT_SOURCE_LIMIT, PLUS_SOURCE_LIMIT
-except ImportError:
-    # Fallback to default values if root config is not available
-    print("Warning: Could not import from root config.py. Using default values.")
-    WORD_LIMIT = 248000  # Maximum word count per source file (with 20k word cushion)
-    DEFAULT_SOURCE_LIMIT = 50  # Default source count limit (Free plan)
-    PLUS_SOURCE_LIMIT = 300  # Source count limit for Plus plan
+from .loader import load_user_config
+
+# Settings from the user's config.py, if there is one (see loader.py)
+_user_config = load_user_config()
+
+WORD_LIMIT = _user_config.get('WORD_LIMIT', 248000)  # Maximum word count per source file (with 20k word cushion)
+DEFAULT_SOURCE_LIMIT = _user_config.get('DEFAULT_SOURCE_LIMIT', 50)  # Default source count limit (Free plan)
+PLUS_SOURCE_LIMIT = _user_config.get('PLUS_SOURCE_LIMIT', 300)  # Source count limit for Plus plan
 
 # File extension patterns to match
 SUPPORTED_EXTENSIONS = {
@@ -26,8 +15,61 @@ SUPPORTED_EXTENSIONS = {
     'md': '*.md',  # Markdown files
 }
 
+# Compressed input files, e.g. notes.txt.gz, read as the type of their inner extension (see compression.py)
+COMPRESSED_EXTENSIONS = {
+    'gz': 'gzip',
+    'bz2': 'bz2',
+    'xz': 'xz',
+    'zst': 'zstd',  # Requires Python 3.14 or the zstandard package
+}
+
+# Word counting
+COUNT_CHUNK_SIZE = 1024 * 1024  # Characters read per block when streaming text files
+
+COUNT_ENGINES = ('python', 'numpy')  # str.split() on decoded text, or NumPy over memory-mapped bytes (optional)
+DEFAULT_COUNT_ENGINE = 'python'
+
+COUNT_CACHE_FILE = '.notebook_cat_cache.sqlite'  # Word count cache stored in the output directory
+
+# Parallel word counting
+DEFAULT_JOBS = 1  # Number of counting workers (0 = one per CPU core)
+COUNT_EXECUTORS = ('process', 'thread')  # Process pool for CPU-bound, thread pool for I/O-bound storage
+
+# Grouping files into sources
+PACKING_STRATEGIES = ('first-fit', 'best-fit')  # Bin packing strategies (see packing.py)
+DEFAULT_PACKING = 'first-fit'  # Keeps the grouping of earlier versions, so resumed runs line up
+
 # Resume processing
 RESUME_MARKER_FILE = '.notebook_cat_resume'  # File to track resume state
+RESUME_JOURNAL_FILE = '.notebook_cat_resume.journal'  # Groups completed since the resume state was saved
+RESUME_SYNC_GROUPS = 16  # Completed groups between syncs of the resume journal to disk
+PLAN_FILE = '.notebook_cat_plan.json'  # Grouping of the current run, reused by --resume
+
+# Low-memory runs (--memory-budget)
+SPILL_FILE = '.notebook_cat_spill.sqlite'  # File records of the run, stored in the output directory
+SPILL_RECORD_BYTES = 1024  # Estimated memory taken by one file record while it is processed
+MIN_SPILL_BATCH = 1000  # Fewest files counted or written to the spill at a time
+
+# Overlapped pipeline (--pipeline)
+PIPELINE_BATCH_FILES = 64  # Scanned files handed to a counting worker at a time
+PIPELINE_QUEUE_BATCHES = 16  # Scanned batches waiting to be counted before the scan pauses
+
+# Incremental runs
+MANIFEST_FILE = 'notebook_cat_manifest.json'  # Input files of each source, written next to the outputs
+
+# Web interface
+WEB_CONCURRENCY = 4  # Uploads the web interface processes at the same time
+WORKSPACE_QUOTA_MB = 2048  # Disk space of finished jobs above which the least recently used are removed
+WORKSPACE_MAX_AGE = 3600  # Seconds after its last use a finished job is removed
+WORKSPACE_REAP_INTERVAL = 60  # Seconds between checks for jobs to remove
+WORKSPACE_MARKER_FILE = '.notebook_cat_workspace'  # Marks the directories created for jobs
+
+# Profiling (--profile)
+PROFILE_FILE = 'notebook_cat_profile.json'  # Time and throughput of each phase of the run
+PROFILE_STATS_FILE = 'notebook_cat_profile.prof'  # cProfile statistics of the slowest phase
+
+# JSON files larger than this are parsed incrementally instead of loaded into memory
+JSON_STREAM_THRESHOLD = 16 * 1024 * 1024  # 16MB
 
 # Supported JSON fields to extract text from
 # These are common field names that might contain text in JSON files
@@ -0,0 +1,94 @@
+"""
+Resolution of the user's configuration file.
+
+The settings users are expected to change (the word limit and the source
+limits) can be overridden in a config.py file. The file is read rather than
+imported: only top-level assignments of literal values are evaluated, so
+loading it is cheap, runs no code and leaves sys.path alone.
+
+The file is looked up in this order:
+1. The path in the NOTEBOOK_CAT_CONFIG environment variable
+2. config.py in the project root, when running from a source checkout
+"""
+
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+# Environment variable with the path of the configuration file
+CONFIG_ENV_VAR = 'NOTEBOOK_CAT_CONFIG'
+
+# Settings that may be overridden by the configuration file
+USER_SETTINGS = ('WORD_LIMIT', 'DEFAULT_SOURCE_LIMIT', 'PLUS_SOURCE_LIMIT')
+
+
+def find_config_file() -> Optional[Path]:
+    """
+    Locate the user's configuration file.
+
+    Returns:
+        Path to the configuration file, or None if there is none
+    """
+    configured = os.environ.get(CONFIG_ENV_VAR)
+    if configured:
+        return Path(configured)
+    # src/notebook_cat/config/loader.py in a source checkout
+    package_parent = Path(__file__).resolve().parents[2]
+    if package_parent.name == 'src':
+        project_config = package_parent.parent / 'config.py'
+        if project_config.is_file():
+            return project_config
+    return None
+
+
+def read_config_file(config_path: Path, names: Iterable[str] = USER_SETTINGS) -> Dict[str, Any]:
+    """
+    Read settings from a configuration file without importing it.
+
+    Args:
+        config_path: Path to the configuration file
+        names: Names of the settings to read
+
+    Returns:
+        Dictionary of the settings that are assigned in the file
+
+    Raises:
+        OSError: If the file cannot be read
+        SyntaxError: If the file is not valid Python
+        ValueError: If a setting is assigned something other than a literal
+    """
+    import ast
+
+    with open(config_path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read(), str(config_path))
+    wanted = set(names)
+    settings = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            targets, value = node.targets, node.value
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            targets, value = [node.target], node.value
+        else:
+            continue
+        for target in targets:
+            if isinstance(target, ast.Name) and target.id in wanted:
+                settings[target.id] = ast.literal_eval(value)
+    return settings
+
+
+def load_user_config() -> Dict[str, Any]:
+    """
+    Load the settings of the user's configuration file, if there is one.
+
+    Returns:
+        Dictionary of the settings it overrides (empty if there is no
+        usable configuration file)
+    """
+    config_path = find_config_file()
+    if config_path is None:
+        return {}
+    try:
+        return read_config_file(config_path)
+    except Exception as e:
+        print(f"Warning: Could not read config file {config_path}: {e}. Using default values.")
+        return {}
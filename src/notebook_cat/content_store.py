@@ -0,0 +1,204 @@
+"""
+Retained file contents for notebook-cat.
+
+Files are read once while counting words. Their contents are kept in a
+ContentStore so they can be written to the output sources without reading
+the input files a second time. Contents are held in memory up to a budget
+and spilled to an anonymous temporary file beyond it. Files that will not
+be written (over the word limit, or left out of every source) are not kept. The budget is in
+bytes of memory actually used by the strings, which is up to four times
+their number of characters for text outside Latin-1.
+"""
+
+import codecs
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Size of the blocks read back from the spill file
+SPILL_READ_SIZE = 1024 * 1024
+
+
+def _memory_size(segments: List[object]) -> int:
+    """Bytes of memory used by the segments held in memory."""
+    return sum(sys.getsizeof(s) for s in segments if isinstance(s, str))
+
+
+class ContentStore:
+    """
+    Thread-safe store of file contents with a memory budget.
+
+    Each entry is a list of segments. A segment is either a string held in
+    memory or an (offset, length) pair pointing into the spill file, which
+    holds UTF-8 encoded text.
+    """
+
+    def __init__(self, memory_budget: int, spill_dir: Optional[str] = None,
+                 word_limit: Optional[int] = None):
+        """
+        Create an empty store.
+
+        Args:
+            memory_budget: Maximum number of bytes of text to keep in memory
+            spill_dir: Directory for the spill file (default: system temp directory)
+            word_limit: Optional word limit of a source; files with more words
+                are never written, so their content is not kept
+        """
+        self.memory_budget = memory_budget
+        self.spill_dir = spill_dir
+        self.word_limit = word_limit
+        self.memory_used = 0
+        self.spilled_bytes = 0
+        self._entries: Dict[str, List[object]] = {}
+        self._spill = None
+        self._spill_size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(filepath: Path) -> str:
+        return os.path.abspath(str(filepath))
+
+    def _spill_locked(self, text: str) -> Tuple[int, int]:
+        """Append text to the spill file. The lock must be held."""
+        if self._spill is None:
+            self._spill = tempfile.TemporaryFile(dir=self.spill_dir, prefix="notebook-cat-spill-")
+        data = text.encode('utf-8')
+        offset = self._spill_size
+        self._spill.seek(offset)
+        self._spill.write(data)
+        self._spill_size += len(data)
+        self.spilled_bytes += len(data)
+        return offset, len(data)
+
+    def writer(self, filepath: Path) -> "_EntryWriter":
+        """
+        Start a new entry for a file.
+
+        Args:
+            filepath: Path of the file whose content will be written
+
+        Returns:
+            A writer; call ``write`` for each block and ``commit`` when complete
+        """
+        return _EntryWriter(self, self._key(filepath))
+
+    def put(self, filepath: Path, content: str):
+        """
+        Store the complete content of a file.
+
+        Args:
+            filepath: Path of the file
+            content: Text content of the file
+        """
+        entry = self.writer(filepath)
+        entry.write(content)
+        entry.commit()
+
+    def __contains__(self, filepath: Path) -> bool:
+        with self._lock:
+            return self._key(filepath) in self._entries
+
+    def pop_chunks(self, filepath: Path) -> Optional[Iterator[str]]:
+        """
+        Remove an entry and return its content as an iterator of text blocks.
+
+        Args:
+            filepath: Path of the file
+
+        Returns:
+            Iterator over the stored text, or None if the file is not stored
+        """
+        with self._lock:
+            segments = self._entries.pop(self._key(filepath), None)
+            if segments is None:
+                return None
+            self.memory_used -= _memory_size(segments)
+        return self._iter_segments(segments)
+
+    def discard(self, filepath: Path):
+        """
+        Remove an entry that will not be read, releasing its share of the memory budget.
+
+        Args:
+            filepath: Path of the file (nothing happens if it is not stored)
+        """
+        with self._lock:
+            segments = self._entries.pop(self._key(filepath), None)
+            if segments is not None:
+                self.memory_used -= _memory_size(segments)
+
+    def _iter_segments(self, segments: List[object]) -> Iterator[str]:
+        for segment in segments:
+            if isinstance(segment, str):
+                yield segment
+                continue
+            offset, length = segment
+            # Decode incrementally so characters split across blocks are handled
+            decoder = codecs.getincrementaldecoder('utf-8')()
+            position = offset
+            end = offset + length
+            while position < end:
+                size = min(SPILL_READ_SIZE, end - position)
+                with self._lock:
+                    self._spill.seek(position)
+                    data = self._spill.read(size)
+                if not data:
+                    break
+                position += len(data)
+                text = decoder.decode(data, final=position >= end)
+                if text:
+                    yield text
+
+    def close(self):
+        """Discard all entries and delete the spill file."""
+        with self._lock:
+            self._entries.clear()
+            self.memory_used = 0
+            if self._spill is not None:
+                self._spill.close()
+                self._spill = None
+                self._spill_size = 0
+
+
+class _EntryWriter:
+    """Collects the blocks of one file and adds them to a ContentStore."""
+
+    def __init__(self, store: ContentStore, key: str):
+        self._store = store
+        self._key = key
+        self._segments: List[object] = []
+        self._reserved = 0  # Bytes of this entry counted against the memory budget
+
+    def write(self, text: str):
+        """Add a block of text to the entry."""
+        if not text:
+            return
+        store = self._store
+        size = sys.getsizeof(text)
+        with store._lock:
+            if store.memory_used + size <= store.memory_budget:
+                store.memory_used += size
+                self._reserved += size
+                self._segments.append(text)
+            else:
+                self._segments.append(store._spill_locked(text))
+
+    def commit(self):
+        """Make the entry available to readers."""
+        store = self._store
+        with store._lock:
+            previous = store._entries.get(self._key)
+            if previous is not None:
+                store.memory_used -= _memory_size(previous)
+            store._entries[self._key] = self._segments
+
+    def discard(self):
+        """Drop the entry, releasing its share of the memory budget."""
+        store = self._store
+        with store._lock:
+            store.memory_used -= self._reserved
+        self._segments = []
+        self._reserved = 0
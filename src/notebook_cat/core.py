@@ -1,47 +1,404 @@
 # Core logic for counting words, grouping files, and concatenating
 import os
 import math
+import io
+import codecs
 import json
+import fnmatch
+import re
+from contextlib import contextmanager
+from concurrent.futures import Executor, ThreadPoolExecutor, as_completed
+from functools import partial
 from pathlib import Path
-from typing import List, Tuple, Dict, Optional, Set
+from typing import List, Tuple, Dict, Optional, Set, TextIO, BinaryIO, Callable, NamedTuple, Sequence, Iterable, Iterator, Union, TypeVar
 
 from .config.defaults import (
     WORD_LIMIT,
     DEFAULT_SOURCE_LIMIT,
     SUPPORTED_EXTENSIONS,
+    COMPRESSED_EXTENSIONS,
     RESUME_MARKER_FILE,
-    JSON_TEXT_FIELDS
+    RESUME_JOURNAL_FILE,
+    RESUME_SYNC_GROUPS,
+    PLAN_FILE,
+    JSON_TEXT_FIELDS,
+    COUNT_EXECUTORS,
+    COUNT_ENGINES,
+    DEFAULT_COUNT_ENGINE,
+    COUNT_CHUNK_SIZE,
+    COUNT_CACHE_FILE,
+    JSON_STREAM_THRESHOLD,
+    DEFAULT_PACKING,
+    MANIFEST_FILE,
+    PROFILE_FILE,
+    PROFILE_STATS_FILE,
+    SPILL_FILE,
+    SPILL_RECORD_BYTES,
+    MIN_SPILL_BATCH
 )
+from .cache import WordCountCache, Fingerprint, file_fingerprint
+from .compression import compression_of, file_extension, open_text
+from .content_store import ContentStore
+from .jsonstream import iter_json_text
+from .jsonpath import JsonPath, JsonPathLike
+from .packing import PACKERS, PACKER_CLASSES, first_fit
+from .resume import ResumeJournal, ResumePlan, PlannedFile, replay_journal, journal_progress, save_plan, load_plan
+from .manifest import Manifest, ManifestEntry, load_manifest, save_manifest
+from .profiling import PhaseProfiler
+from .filetable import FileTable, ColumnView, GroupView, UNGROUPED
+from .spill import FileSpill, SpilledUngrouped
 
-def count_words_in_file(filepath: Path, json_path: Optional[str] = None) -> int:
+def _running_word_counts(chunks: Iterable[str]) -> Iterator[Tuple[str, int]]:
+    """
+    Yield each non-empty block of text with the number of words up to its end.
+    
+    A word cut by the end of a block is counted already, so the running
+    count never decreases and never exceeds the final count.
+    """
+    count = 0
+    inside_word = False  # Whether the previous block ended in the middle of a word
+    for chunk in chunks:
+        if not chunk:
+            continue
+        count += len(chunk.split())
+        # A word cut by the block boundary was counted once in each block
+        if inside_word and not chunk[0].isspace():
+            count -= 1
+        inside_word = not chunk[-1].isspace()
+        yield chunk, count
+
+def count_words_in_chunks(chunks: Iterable[str]) -> int:
+    """
+    Counts the words in text delivered as a sequence of blocks.
+    
+    The result is identical to ``len("".join(chunks).split())``, including
+    words that straddle blocks, without joining the blocks.
+    
+    Args:
+        chunks: Consecutive blocks of text
+        
+    Returns:
+        Word count
+    """
+    count = 0
+    for _, count in _running_word_counts(chunks):
+        pass
+    return count
+
+def _count_and_retain(stream: TextIO, content_store: ContentStore, filepath: Path) -> int:
+    """
+    Counts the words in a text stream, keeping its content in a content store.
+    
+    Retention stops as soon as the file has more words than the store's word
+    limit, since such a file is never written.
+    """
+    entry = content_store.writer(filepath)
+    word_limit = content_store.word_limit
+    count = 0
+    try:
+        for chunk, count in _running_word_counts(_read_blocks(stream, COUNT_CHUNK_SIZE, None)):
+            if entry is None:
+                continue
+            if word_limit is not None and count > word_limit:
+                entry.discard()
+                entry = None
+            else:
+                entry.write(chunk)
+    except Exception:
+        if entry is not None:
+            entry.discard()
+        raise
+    if entry is not None:
+        entry.commit()
+    return count
+
+def _read_blocks(stream: TextIO, chunk_size: int, sink: Optional[Callable[[str], None]]) -> Iterator[str]:
+    """Yield fixed-size blocks from a text stream, passing each to an optional sink."""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return
+        if sink is not None:
+            sink(chunk)
+        yield chunk
+
+def count_words_in_stream(stream: TextIO, chunk_size: int = COUNT_CHUNK_SIZE,
+                          sink: Optional[Callable[[str], None]] = None) -> int:
+    """
+    Counts the words in a text stream without reading it all into memory.
+    
+    The stream is read in fixed-size blocks, so peak memory depends on the
+    block size rather than the file size. The result is identical to
+    ``len(stream.read().split())``, including words that straddle blocks.
+    
+    Args:
+        stream: Text stream opened for reading
+        chunk_size: Number of characters to read per block
+        sink: Optional callable that receives every block read (e.g. to retain the content)
+        
+    Returns:
+        Word count
+    """
+    return count_words_in_chunks(_read_blocks(stream, chunk_size, sink))
+
+def count_words_in_file(filepath: Path, json_path: Optional[JsonPathLike] = None,
+                        content_store: Optional[ContentStore] = None,
+                        engine: str = DEFAULT_COUNT_ENGINE) -> int:
     """
     Counts the words in a file (supporting multiple file types).
     
+    Compressed files (e.g. ``notes.txt.gz``, see compression.py) are counted
+    as the type of their inner extension, decompressing them as they are read.
+    
     Args:
         filepath: Path to the file
         json_path: Optional path to text field in JSON files
+        content_store: Optional store that retains the file content for concatenation
+        engine: "python" to count with str.split(), or "numpy" to count text files
+            in their memory-mapped bytes (see numpy_count.py). Both give the same
+            counts; files whose content is retained are always counted as text.
         
     Returns:
         Word count
     """
     try:
-        # Get file extension (lowercase)
-        ext = filepath.suffix.lower()[1:]  # Remove the dot
+        # Get file extension (lowercase, without any compression suffix)
+        ext = file_extension(filepath)
+        compressed = compression_of(filepath) is not None
         
         # Handle different file types
         if ext == 'json':
-            content = extract_text_from_json(filepath, json_path)
-        else:  # For .txt and .md and any other text-based formats
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
+            if compressed or filepath.stat().st_size > JSON_STREAM_THRESHOLD:
+                # Large documents, and compressed ones whose size is not known
+                # until they are decompressed, are counted while they are parsed
+                # and are read again when written, rather than retained
+                return count_words_in_chunks(iter_text_from_json_stream(filepath, json_path))
+            raw_content = None
+            if content_store is not None:
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    raw_content = f.read()
+            count = len(extract_text_from_json(filepath, json_path, raw_content).split())
+            if content_store is not None and (content_store.word_limit is None or count <= content_store.word_limit):
+                content_store.put(filepath, raw_content)
+            return count
+        
+        if engine == "numpy" and content_store is None and not compressed:
+            from .numpy_count import count_words_in_mapped_file
+            return count_words_in_mapped_file(filepath)
         
-        # Count words (common for all file types)
-        words = content.split()
-        return len(words)
+        # For .txt and .md and any other text-based formats, stream the file in blocks
+        with open_text(filepath) as f:
+            if content_store is None:
+                return count_words_in_stream(f)
+            return _count_and_retain(f, content_store, filepath)
     except Exception as e:
         print(f"Error reading or counting words in {filepath}: {e}")
         return 0  # Treat files with errors as having 0 words
 
+def resolve_jobs(jobs: Optional[int]) -> int:
+    """
+    Resolve a requested worker count to an actual number of workers.
+    
+    Args:
+        jobs: Requested number of workers (None or 0 means one per CPU core)
+        
+    Returns:
+        Number of workers to use (always at least 1)
+    """
+    if jobs is None or jobs == 0:
+        return os.cpu_count() or 1
+    if jobs < 0:
+        raise ValueError(f"Number of jobs must be zero or positive, got {jobs}.")
+    return jobs
+
+def check_count_engine(engine: str):
+    """
+    Check that a counting engine exists and can be used.
+    
+    Args:
+        engine: Name of the counting engine
+        
+    Raises:
+        ValueError: If the engine is unknown or its dependencies are not installed
+    """
+    if engine not in COUNT_ENGINES:
+        raise ValueError(f"Unknown count engine '{engine}'. Expected one of: {', '.join(COUNT_ENGINES)}")
+    if engine == "numpy":
+        from .numpy_count import available
+        if not available():
+            raise ValueError("The numpy count engine requires NumPy. Install it with: pip install numpy")
+
+def create_count_pool(workers: int, executor: str = "process") -> Executor:
+    """
+    Creates a pool of workers to count words with, for several count_words_in_files calls.
+    
+    Starting worker processes is slow, so a run that counts its files in
+    batches creates one pool and passes it to every call.
+    
+    Args:
+        workers: Number of workers
+        executor: "process" for CPU-bound counting, "thread" for I/O-bound storage
+        
+    Returns:
+        The pool, to be shut down by the caller
+    """
+    if executor not in COUNT_EXECUTORS:
+        raise ValueError(f"Unknown executor '{executor}'. Expected one of: {', '.join(COUNT_EXECUTORS)}")
+    if executor == "process":
+        # Imported here: loading multiprocessing slows down startup for runs that don't need it
+        from concurrent.futures import ProcessPoolExecutor
+        return ProcessPoolExecutor(max_workers=workers)
+    return ThreadPoolExecutor(max_workers=workers)
+
+@contextmanager
+def _count_pool(workers: int, executor: str) -> Iterator[Optional[Executor]]:
+    """
+    Provide a pool of counting workers, or None for a single worker.
+    
+    The pool is shut down, and its worker processes waited for, on exit, so
+    a profiled phase that encloses it includes the CPU time of the workers.
+    """
+    if workers <= 1:
+        yield None
+        return
+    pool = create_count_pool(workers, executor)
+    try:
+        yield pool
+    finally:
+        pool.shutdown(wait=True)
+
+def count_words_in_files(files: List[Path], json_path: Optional[JsonPathLike] = None,
+                         jobs: int = 1, executor: str = "process",
+                         content_store: Optional[ContentStore] = None,
+                         engine: str = DEFAULT_COUNT_ENGINE,
+                         pool: Optional[Executor] = None) -> List[int]:
+    """
+    Counts the words in a list of files, optionally using a pool of workers.
+    
+    The counts are returned in the same order as the input files regardless of
+    the number of workers, so grouping results do not depend on parallelism.
+    
+    Args:
+        files: Paths to the files to count
+        json_path: Optional path to text field in JSON files
+        jobs: Number of parallel workers (1 counts in-process, 0 uses one per CPU core)
+        executor: "process" for CPU-bound counting, "thread" for I/O-bound storage
+        content_store: Optional store that retains file contents for concatenation.
+            Contents cannot be shared back from worker processes, so it is
+            ignored when counting with more than one "process" worker.
+        engine: Counting engine, "python" or "numpy" (see count_words_in_file)
+        pool: Optional pool from create_count_pool with this executor, used
+            instead of starting one for this call when counting with more than one worker
+        
+    Returns:
+        List of word counts, one per input file
+    """
+    if executor not in COUNT_EXECUTORS:
+        raise ValueError(f"Unknown executor '{executor}'. Expected one of: {', '.join(COUNT_EXECUTORS)}")
+    check_count_engine(engine)
+    
+    workers = min(resolve_jobs(jobs), len(files))
+    if workers <= 1:
+        return [count_words_in_file(f, json_path, content_store, engine) for f in files]
+    
+    if executor == "process":
+        content_store = None
+    count = partial(count_words_in_file, json_path=json_path, content_store=content_store, engine=engine)
+    # Hand out files in batches to keep inter-process overhead low on large corpora
+    chunksize = max(1, len(files) // (workers * 4))
+    if pool is not None:
+        # Executor.map yields results in input order, which keeps the output deterministic
+        return list(pool.map(count, files, chunksize=chunksize))
+    with create_count_pool(workers, executor) as pool:
+        return list(pool.map(count, files, chunksize=chunksize))
+
+def count_words_with_cache(files: List[Path], cache: Optional[WordCountCache],
+                           json_path: Optional[JsonPathLike] = None, jobs: int = 1,
+                           executor: str = "process",
+                           content_store: Optional[ContentStore] = None,
+                           fingerprints: Optional[List[Fingerprint]] = None,
+                           engine: str = DEFAULT_COUNT_ENGINE,
+                           pool: Optional[Executor] = None) -> List[int]:
+    """
+    Counts the words in a list of files, reusing cached counts for unchanged files.
+    
+    Only files whose fingerprint (size and modification time) differs from the
+    cached entry are read. New counts are stored back into the cache.
+    
+    Args:
+        files: Paths to the files to count
+        cache: Word count cache, or None to count every file
+        json_path: Optional path to text field in JSON files
+        jobs: Number of parallel workers for files that need counting
+        executor: "process" or "thread" worker type
+        content_store: Optional store that retains the content of files that are read
+        fingerprints: Optional (size, mtime_ns) of each file, e.g. from scan_files;
+            files are stat'ed when not given
+        engine: Counting engine, "python" or "numpy" (see count_words_in_file)
+        pool: Optional pool of workers shared with other calls (see count_words_in_files)
+        
+    Returns:
+        List of word counts, one per input file
+    """
+    if cache is None:
+        return count_words_in_files(files, json_path, jobs=jobs, executor=executor,
+                                    content_store=content_store, engine=engine, pool=pool)
+    
+    if fingerprints is None:
+        fingerprints = []
+        for f in files:
+            try:
+                fingerprints.append(file_fingerprint(f))
+            except OSError:
+                fingerprints.append(None)
+    
+    counts: List[Optional[int]] = []
+    stale = []  # Indices of files that need to be counted
+    for f, fingerprint in zip(files, fingerprints):
+        count = cache.get(f, fingerprint)
+        if count is None:
+            stale.append(len(counts))
+        counts.append(count)
+    
+    fresh_counts = count_words_in_files([files[i] for i in stale], json_path, jobs=jobs,
+                                        executor=executor, content_store=content_store,
+                                        engine=engine, pool=pool)
+    for i, count in zip(stale, fresh_counts):
+        counts[i] = count
+        if fingerprints[i] is not None:
+            cache.put(files[i], fingerprints[i], count)
+    
+    try:
+        cache.save()
+    except Exception as e:
+        print(f"Warning: Could not update word count cache: {e}")
+    return counts
+
+def open_count_cache(output_path: Path, json_path: Optional[JsonPathLike] = None,
+                     clear: bool = False, preload: bool = True) -> Optional[WordCountCache]:
+    """
+    Open the word count cache stored in the output directory.
+    
+    Args:
+        output_path: Output directory path
+        json_path: Optional path to text field in JSON files (part of the cache key)
+        clear: If True, invalidate all cached entries first
+        preload: If False, entries are looked up in the database instead of
+            being loaded into memory (see WordCountCache)
+        
+    Returns:
+        The cache, or None if it could not be opened
+    """
+    try:
+        cache = WordCountCache(output_path / COUNT_CACHE_FILE, json_path, preload)
+        if clear:
+            cache.clear()
+            print("Word count cache cleared.")
+        return cache
+    except Exception as e:
+        print(f"Warning: Could not open word count cache, counting all files: {e}")
+        return None
+
 def extract_default_text_from_json(data):
     """
     Extract text content from JSON data using default extraction methods.
@@ -67,6 +424,8 @@ def extract_default_text_from_json(data):
             if isinstance(value, list) and len(value) > 0 and isinstance(value[0], dict):
                 texts = []
                 for item in value:
+                    if not isinstance(item, dict):
+                        continue
                     for text_field in JSON_TEXT_FIELDS:
                         if text_field in item and isinstance(item[text_field], str):
                             texts.append(item[text_field])
@@ -77,82 +436,117 @@ def extract_default_text_from_json(data):
     # If nothing worked, convert the whole thing to a string
     return json.dumps(data, indent=2)
 
-def extract_text_from_json(filepath: Path, json_path: Optional[str] = None) -> str:
+def parse_json_path(json_path: Optional[JsonPathLike]) -> Optional[JsonPath]:
+    """
+    Compile and validate a JSON path expression.
+    
+    Args:
+        json_path: JSON path expression (e.g., "segments.*.text"), or an
+            already compiled JsonPath
+        
+    Returns:
+        Compiled path, or None if no path is given or the path is invalid
+        (in which case the default extraction is used)
+    """
+    try:
+        return JsonPath.compile(json_path)
+    except ValueError:
+        print(f"Warning: Invalid JSON path format: {json_path}. Using default extraction.")
+        return None
+
+def extract_text_from_json_value(value) -> str:
+    """
+    Convert a value selected by a JSON path to text.
+    
+    Args:
+        value: Parsed JSON value
+        
+    Returns:
+        Text content of the value
+    """
+    if isinstance(value, str):
+        return value
+    elif isinstance(value, list):
+        # If it's a list of strings, join them
+        if all(isinstance(item, str) for item in value):
+            return "\n\n".join(value)
+        # If it's a list of objects with text fields, extract and join
+        texts = []
+        for item in value:
+            if isinstance(item, dict):
+                for field in JSON_TEXT_FIELDS:
+                    if field in item and isinstance(item[field], str):
+                        texts.append(item[field])
+                        break
+        return "\n\n".join(texts)
+    elif isinstance(value, dict):
+        # Extract text from known text fields
+        for field in JSON_TEXT_FIELDS:
+            if field in value and isinstance(value[field], str):
+                return value[field]
+        
+        # No known text field found, convert to string
+        return json.dumps(value, indent=2)
+    else:
+        # Convert to string as fallback
+        return str(value)
+
+def iter_text_from_json_stream(filepath: Path, json_path: Optional[JsonPathLike] = None,
+                               content: Optional[str] = None) -> Iterator[str]:
+    """
+    Extract text content from a JSON file incrementally.
+    
+    The document is parsed as a stream of events instead of being loaded with
+    json.load, so memory use is bounded by the largest selected text value.
+    Joining the yielded pieces gives the same text as extract_text_from_json.
+    
+    Args:
+        filepath: Path to the JSON file
+        json_path: Optional JSON path to the text (e.g., "segments.*.text")
+        content: Raw file content if it has already been read
+        
+    Returns:
+        Iterator over pieces of the extracted text
+    """
+    if content is not None:
+        open_stream = lambda: io.StringIO(content)
+    else:
+        open_stream = lambda: open_text(filepath)
+    return iter_json_text(open_stream, parse_json_path(json_path), JSON_TEXT_FIELDS, COUNT_CHUNK_SIZE)
+
+def extract_text_from_json(filepath: Path, json_path: Optional[JsonPathLike] = None,
+                           content: Optional[str] = None) -> str:
     """
     Extract text content from a JSON file.
     
+    Files larger than JSON_STREAM_THRESHOLD, and compressed files, are parsed
+    incrementally rather than loaded into memory at once.
+    
     Args:
         filepath: Path to the JSON file
-        json_path: Optional dot-notation path to text field (e.g., "segments.text")
+        json_path: Optional JSON path to the text (e.g., "segments.*.text")
+        content: Raw file content if it has already been read (avoids reading the file again)
         
     Returns:
         Extracted text content as a string
     """
     try:
-        # Set file size limit to prevent JSON bomb attacks (50MB)
-        file_size_limit = 50 * 1024 * 1024  # 50MB
-        
-        # Check file size before loading
-        file_size = filepath.stat().st_size
-        if file_size > file_size_limit:
-            print(f"Warning: JSON file {filepath} exceeds size limit of 50MB. Skipping.")
-            return ""
-            
-        with open(filepath, 'r', encoding='utf-8') as f:
-            # Use json.load with size limit to prevent DoS attacks
-            data = json.load(f)
-        
-        # If a specific JSON path is provided, use it
-        if json_path:
-            # Validate JSON path to prevent traversal vulnerabilities
-            valid_path = True
-            for part in json_path.split('.'):
-                if not (part.isalnum() or part.isdigit()):
-                    print(f"Warning: Invalid JSON path format: {json_path}. Using default extraction.")
-                    valid_path = False
-                    break
-            
-            if valid_path:
-                parts = json_path.split('.')
-                current = data
-                for part in parts:
-                    if isinstance(current, dict) and part in current:
-                        current = current[part]
-                    elif isinstance(current, list) and part.isdigit():
-                        current = current[int(part)]
-                    else:
-                        return ""  # Path not found
-                
-                # Handle different types that the path might resolve to
-                if isinstance(current, str):
-                    return current
-                elif isinstance(current, list):
-                    # If it's a list of strings, join them
-                    if all(isinstance(item, str) for item in current):
-                        return "\n\n".join(current)
-                    # If it's a list of objects with text fields, extract and join
-                    texts = []
-                    for item in current:
-                        if isinstance(item, dict):
-                            for field in JSON_TEXT_FIELDS:
-                                if field in item and isinstance(item[field], str):
-                                    texts.append(item[field])
-                                    break
-                    return "\n\n".join(texts)
-                elif isinstance(current, dict):
-                    # Extract text from known text fields
-                    for field in JSON_TEXT_FIELDS:
-                        if field in current and isinstance(current[field], str):
-                            return current[field]
-                    
-                    # No known text field found, convert to string
-                    return json.dumps(current, indent=2)
-                else:
-                    # Convert to string as fallback
-                    return str(current)
-            else:
-                # If path is invalid, use default extraction
-                return extract_default_text_from_json(data)
+        # Large documents are streamed instead of loaded with json.load
+        if compression_of(filepath) is not None or filepath.stat().st_size > JSON_STREAM_THRESHOLD:
+            return "".join(iter_text_from_json_stream(filepath, json_path, content))
+        
+        if content is not None:
+            data = json.loads(content)
+        else:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        
+        # If a specific (valid) JSON path is provided, use it
+        path = parse_json_path(json_path)
+        if path is not None:
+            # Join the text of every selected value (nothing if the path is not found)
+            texts = (extract_text_from_json_value(value) for value in path.find(data))
+            return "\n\n".join(text for text in texts if text)
         
         # No path specified, try to automatically extract text
         return extract_default_text_from_json(data)
@@ -161,47 +555,238 @@ def extract_text_from_json(filepath: Path, json_path: Optional[str] = None) -> s
         print(f"Error extracting text from JSON file {filepath}: {e}")
         return ""
 
-def get_files_by_extensions(directory: Path, extensions: Set[str], limit: Optional[int] = None) -> List[Path]:
+class FileEntry(NamedTuple):
+    """A file found while scanning, with the stat information read during the scan."""
+    path: Path
+    size: int
+    mtime_ns: int
+
+    @property
+    def fingerprint(self) -> Fingerprint:
+        """Fingerprint used by the word count cache."""
+        return self.size, self.mtime_ns
+
+def _compile_globs(patterns: Optional[Sequence[str]]):
+    """Compile glob patterns into a single matcher (or None if there are no patterns)."""
+    if not patterns:
+        return None
+    regex = "|".join(f"(?:{fnmatch.translate(p)})" for p in patterns)
+    return re.compile(regex).match
+
+def iter_scan_files(directory: Path, extensions: Set[str], recursive: bool = False,
+                    include: Optional[Sequence[str]] = None,
+                    exclude: Optional[Sequence[str]] = None,
+                    skip_dir: Optional[Path] = None) -> Iterator[FileEntry]:
     """
-    Gets a list of files with the specified extensions in the directory.
+    Scans a directory once for files matching any of the given extensions.
+    
+    Every extension is matched in a single traversal with ``os.scandir``, and the
+    size and modification time read for each match are kept so later steps do
+    not need to stat the file again. Symbolic links to directories are not
+    followed. Files are yielded as they are found, in no particular order, so
+    the matches need not be held in memory; the number found per extension is
+    printed once the scan is complete. Compressed files count as files of
+    their inner extension (e.g. ``notes.txt.gz`` as "txt").
     
     Args:
         directory: Directory to search
         extensions: Set of file extensions to include (e.g., {"txt", "md", "json"})
-        limit: Optional maximum number of files to return
+        recursive: If True, also search subdirectories
+        include: Optional glob patterns; if given, only files whose path relative
+            to the directory matches one of them are returned
+        exclude: Optional glob patterns for relative paths of files and
+            directories to skip
+        skip_dir: Optional directory to leave out if it is inside the searched
+            one, e.g. the output directory, so earlier outputs are not read as input
         
-    Returns:
-        List of matching file paths
+    Yields:
+        Matching file entries
     """
     if not directory.is_dir():
         raise ValueError(f"Input path {directory} is not a valid directory.")
     
-    all_files = []
-    for ext in extensions:
-        # Either use the pattern from config or build a simple one
-        pattern = SUPPORTED_EXTENSIONS.get(ext, f"*.{ext}")
-        matching_files = list(directory.glob(pattern))
-        all_files.extend(matching_files)
-        print(f"Found {len(matching_files)} files with extension '{ext}' in {directory}")
+    # Either use the pattern from config or build a simple one
+    patterns = [(ext, re.compile(fnmatch.translate(SUPPORTED_EXTENSIONS.get(ext, f"*.{ext}"))).match)
+                for ext in sorted(extensions)]
+    include_match = _compile_globs(include)
+    exclude_match = _compile_globs(exclude)
+    found_per_extension = {ext: 0 for ext in extensions}
+    
+    # The directory to skip is recognised by its relative path, like excluded ones
+    skip_relative = None
+    if skip_dir is not None and recursive:
+        try:
+            relative = os.path.relpath(os.path.realpath(skip_dir), os.path.realpath(directory))
+        except ValueError:
+            # On another drive
+            relative = os.pardir
+        if relative != os.curdir and relative.split(os.sep)[0] != os.pardir:
+            skip_relative = relative.replace(os.sep, "/")
+    
+    pending = [(str(directory), "")]
+    while pending:
+        current, prefix = pending.pop()
+        with os.scandir(current) as it:
+            for entry in it:
+                relative = prefix + entry.name
+                if exclude_match is not None and exclude_match(relative):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive and relative != skip_relative:
+                        pending.append((entry.path, relative + "/"))
+                    continue
+                # Compressed files (e.g. notes.txt.gz) are matched by their inner name
+                name, dot, suffix = entry.name.rpartition(".")
+                if not dot or suffix.lower() not in COMPRESSED_EXTENSIONS:
+                    name = entry.name
+                matched_ext = next((ext for ext, match in patterns if match(name)), None)
+                if matched_ext is None or not entry.is_file():
+                    continue
+                if include_match is not None and not include_match(relative):
+                    continue
+                stat = entry.stat()
+                found_per_extension[matched_ext] += 1
+                yield FileEntry(Path(entry.path), stat.st_size, stat.st_mtime_ns)
+    
+    for ext in sorted(extensions):
+        print(f"Found {found_per_extension[ext]} files with extension '{ext}' in {directory}")
+
+def scan_files(directory: Path, extensions: Set[str], recursive: bool = False,
+               include: Optional[Sequence[str]] = None,
+               exclude: Optional[Sequence[str]] = None) -> List[FileEntry]:
+    """
+    Scans a directory for files matching any of the given extensions (see iter_scan_files).
+    
+    Args:
+        directory: Directory to search
+        extensions: Set of file extensions to include (e.g., {"txt", "md", "json"})
+        recursive: If True, also search subdirectories
+        include: Optional glob patterns that relative file paths must match
+        exclude: Optional glob patterns for relative paths to skip
+        
+    Returns:
+        List of matching file entries, sorted by path
+    """
+    # Sort files by path for consistent results
+    return sorted(iter_scan_files(directory, extensions, recursive, include, exclude),
+                  key=lambda e: e.path)
+
+def scan_table(directory: Path, extensions: Set[str], recursive: bool = False,
+               include: Optional[Sequence[str]] = None,
+               exclude: Optional[Sequence[str]] = None,
+               skip_dir: Optional[Path] = None) -> FileTable:
+    """
+    Scans a directory like scan_files, into a compact FileTable.
+    
+    Args:
+        directory: Directory to search
+        extensions: Set of file extensions to include (e.g., {"txt", "md", "json"})
+        recursive: If True, also search subdirectories
+        include: Optional glob patterns that relative file paths must match
+        exclude: Optional glob patterns for relative paths to skip
+        skip_dir: Optional directory to leave out, e.g. the output directory
+        
+    Returns:
+        Table of the matching files, sorted by path
+    """
+    table = FileTable.from_entries(iter_scan_files(directory, extensions, recursive, include, exclude, skip_dir))
+    return table.sorted_by_path()
+
+# An input file given explicitly: a path, or a (path, display name) pair
+InputFile = Union[str, Path, Tuple[Union[str, Path], str]]
+
+def _split_input_file(item: InputFile) -> Tuple[Path, Optional[str]]:
+    if isinstance(item, (str, os.PathLike)):
+        return Path(item), None
+    return Path(item[0]), item[1] or None
+
+def input_display_names(input_files: Sequence[InputFile]) -> Dict[str, str]:
+    """Return the display names given for input files, by path."""
+    display_names = {}
+    for item in input_files:
+        path, display_name = _split_input_file(item)
+        if display_name:
+            display_names[str(path)] = display_name
+    return display_names
+
+def collect_files(input_files: Sequence[InputFile], extensions: Set[str]) -> List[FileEntry]:
+    """
+    Gathers an explicit list of input files, like scan_files does for a directory.
+    
+    Files are kept in the order given. Each can come with a display name,
+    used in place of its file name in the output sources and summary report
+    (see input_display_names), e.g. the original name of an upload stored
+    under a temporary name.
+    
+    Args:
+        input_files: Paths, or (path, display name) pairs
+        extensions: Set of file extensions to include; other files are skipped
+        
+    Returns:
+        List of file entries for the files that exist and have a matching extension
+    """
+    entries: List[FileEntry] = []
+    for item in input_files:
+        path, display_name = _split_input_file(item)
+        name = display_name or path.name
+        if file_extension(path) not in extensions:
+            print(f"Skipped unsupported file: {name}")
+            continue
+        try:
+            stat = path.stat()
+        except OSError as e:
+            print(f"Warning: Could not read input file {name}: {e}")
+            continue
+        entries.append(FileEntry(path, stat.st_size, stat.st_mtime_ns))
+    print(f"Found {len(entries)} of {len(input_files)} given files with extensions {sorted(extensions)}")
+    return entries
+
+def _display_name(file_path: Path, display_names: Optional[Dict[str, str]]) -> str:
+    if display_names:
+        return display_names.get(str(file_path), file_path.name)
+    return file_path.name
+
+def get_files_by_extensions(directory: Path, extensions: Set[str], limit: Optional[int] = None,
+                            recursive: bool = False, include: Optional[Sequence[str]] = None,
+                            exclude: Optional[Sequence[str]] = None) -> List[Path]:
+    """
+    Gets a list of files with the specified extensions in the directory.
+    
+    Compressed variants of the files (e.g. ``notes.txt.gz``) are included.
     
-    # Sort files by name for consistent results
-    all_files.sort()
+    Args:
+        directory: Directory to search
+        extensions: Set of file extensions to include (e.g., {"txt", "md", "json"})
+        limit: Optional maximum number of files to return
+        recursive: If True, also search subdirectories
+        include: Optional glob patterns that relative file paths must match
+        exclude: Optional glob patterns for relative paths to skip
+        
+    Returns:
+        List of matching file paths
+    """
+    table = scan_table(directory, extensions, recursive, include, exclude)
     
     # Apply limit if specified
     if limit is not None and limit > 0:
-        all_files = all_files[:limit]
-        print(f"Limited to {limit} files, returning {len(all_files)}")
+        table = table.select(range(min(limit, len(table))))
+        print(f"Limited to {limit} files, returning {len(table)}")
     
-    return all_files
+    return list(table.paths)
 
 
-def group_files(files_with_counts: List[Tuple[Path, int]], source_limit: int) -> Tuple[List[List[Tuple[Path, int]]], List[Tuple[Path, int]]]:
-    """Groups files into lists, respecting the word limit per group and the total source limit."""
+def _groupable_files(files_with_counts: List[Tuple[Path, int]],
+                     word_limit: int) -> Tuple[List[Tuple[Path, int]], List[Tuple[Path, int]]]:
+    """
+    Sorts files for packing and sets aside files that cannot be grouped.
+    
+    Returns:
+        tuple: (files to pack, largest first; files exceeding the word limit)
+    """
     # Sort files by word count, descending. This might help pack larger files first.
     sorted_files = sorted(files_with_counts, key=lambda item: item[1], reverse=True)
 
-    groups: List[List[Tuple[Path, int]]] = []
-    group_word_counts: List[int] = []
+    candidates: List[Tuple[Path, int]] = []
     ungrouped_files: List[Tuple[Path, int]] = []
 
     for file_path, word_count in sorted_files:
@@ -209,32 +794,169 @@ def group_files(files_with_counts: List[Tuple[Path, int]], source_limit: int) ->
             print(f"Skipping file {file_path.name} due to read error or empty content.")
             continue
 
-        if word_count > WORD_LIMIT:
-            print(f"Warning: File {file_path.name} ({word_count} words) exceeds the single source word limit of {WORD_LIMIT}. It will be skipped.")
+        if word_count > word_limit:
+            print(f"Warning: File {file_path.name} ({word_count} words) exceeds the single source word limit of {word_limit}. It will be skipped.")
             ungrouped_files.append((file_path, word_count))
             continue
 
-        placed = False
-        # Try to place the file in an existing group
-        for i in range(len(groups)):
-            if group_word_counts[i] + word_count <= WORD_LIMIT:
-                groups[i].append((file_path, word_count))
-                group_word_counts[i] += word_count
-                placed = True
-                break
-
-        # If it wasn't placed and we have room for a new group
-        if not placed:
-            if len(groups) < source_limit:
-                groups.append([(file_path, word_count)])
-                group_word_counts.append(word_count)
-                placed = True
+        candidates.append((file_path, word_count))
+
+    return candidates, ungrouped_files
+
+def _warn_unplaced(file_path: Path, word_count: int, source_limit: int):
+    # Cannot place the file, exceeds source limit
+    print(f"Warning: Could not place file {file_path.name} ({word_count} words) without exceeding the source limit of {source_limit}. It will be skipped.")
+
+# Identifies a file being placed, e.g. a FileTable row
+T = TypeVar("T")
+
+def _place_files(files: Iterable[Tuple[T, str, int]], source_limit: int, strategy: str,
+                 word_limit: int, packable: Optional[int] = None) -> Iterator[Tuple[T, int]]:
+    """
+    Places files, given largest first, into groups.
+    
+    Args:
+        files: (key, file name, word count) of each file, sorted by word count, descending
+        source_limit: Maximum number of groups
+        strategy: Packing strategy (see packing.py)
+        word_limit: Maximum number of words per group
+        packable: Number of files with 1 to word_limit words, if known
+        
+    Yields:
+        (key, group index) for each file, with UNGROUPED as the index of files
+        that exceed the word limit or do not fit; empty files are skipped
+    """
+    packer = PACKER_CLASSES[strategy](word_limit, source_limit, items=packable)
+    for key, name, word_count in files:
+        if word_count == 0:
+            print(f"Skipping file {name} due to read error or empty content.")
+            continue
+        if word_count > word_limit:
+            print(f"Warning: File {name} ({word_count} words) exceeds the single source word limit of {word_limit}. It will be skipped.")
+            yield key, UNGROUPED
+            continue
+        index = packer.place(word_count)
+        if index < 0:
+            _warn_unplaced(Path(name), word_count, source_limit)
+            index = UNGROUPED
+        yield key, index
+
+def pack_files(table: FileTable, source_limit: int, strategy: str = DEFAULT_PACKING,
+               word_limit: Optional[int] = None):
+    """
+    Groups the files of a table, respecting the word limit per group and the total source limit.
+    
+    Files are packed largest first; files with the same word count keep
+    their order in the table. The groups are recorded in the table (see
+    FileTable.set_groups).
+    
+    Args:
+        table: Files with their word counts
+        source_limit: Maximum number of groups
+        strategy: Packing strategy, "first-fit" or "best-fit" (see packing.py)
+        word_limit: Maximum number of words per group (default: WORD_LIMIT)
+    """
+    if strategy not in PACKERS:
+        raise ValueError(f"Unknown packing strategy: {strategy}")
+    if word_limit is None:
+        word_limit = WORD_LIMIT
+    
+    packable = sum(1 for count in table.words if 0 < count <= word_limit)
+    rows = ((row, table.names[row], table.words[row]) for row in table.rows_by_words())
+    table.set_groups(_place_files(rows, source_limit, strategy, word_limit, packable))
+
+def group_files(files_with_counts: List[Tuple[Path, int]], source_limit: int,
+                strategy: str = DEFAULT_PACKING,
+                word_limit: Optional[int] = None) -> Tuple[List[List[Tuple[Path, int]]], List[Tuple[Path, int]]]:
+    """
+    Groups files into lists, respecting the word limit per group and the total source limit.
+    
+    This is pack_files for lists of (file path, word count) tuples.
+    
+    Args:
+        files_with_counts: List of (file path, word count) tuples
+        source_limit: Maximum number of groups
+        strategy: Packing strategy, "first-fit" or "best-fit" (see packing.py)
+        word_limit: Maximum number of words per group (default: WORD_LIMIT)
+        
+    Returns:
+        tuple: (groups, ungrouped files)
+    """
+    table = FileTable.from_pairs(files_with_counts)
+    pack_files(table, source_limit, strategy, word_limit)
+    # The rows of the table are the positions of the given tuples
+    groups = [[files_with_counts[row] for row in table.group_rows(index)] for index in range(table.group_count())]
+    return groups, [files_with_counts[row] for row in table.ungrouped_rows()]
+
+def plan_incremental_groups(manifest: Manifest, files_with_counts: List[Tuple[Path, int]],
+                            fingerprints: Dict[str, Fingerprint], source_limit: int,
+                            word_limit: Optional[int] = None
+                            ) -> Tuple[Dict[int, List[Tuple[Path, int]]], List[Tuple[Path, int]], Dict[int, str]]:
+    """
+    Groups files while keeping the sources of a previous run as they were.
+    
+    A source whose input files are all present and unchanged keeps them. Files
+    that are new or changed are packed first into sources that lost files
+    anyway, then into new sources, and only into otherwise untouched sources
+    once the source limit is reached, so as few sources as possible change.
+    
+    Args:
+        manifest: Manifest of the previous run
+        files_with_counts: List of (file path, word count) tuples
+        fingerprints: Current (size, mtime_ns) of each file, by path
+        source_limit: Maximum number of sources
+        word_limit: Maximum number of words per source (default: WORD_LIMIT)
+        
+    Returns:
+        tuple: (groups by source number, ungrouped files, status by source number).
+        The status is "new", "changed", "untouched" or "removed"; removed
+        sources have no group.
+    """
+    if word_limit is None:
+        word_limit = WORD_LIMIT
+    current = {str(file_path): (file_path, word_count) for file_path, word_count in files_with_counts}
+    sources: Dict[int, List[Tuple[Path, int]]] = {}
+    dirty: List[int] = []
+    untouched: List[int] = []
+    kept_paths: Set[str] = set()
+    for number, entries in sorted(manifest.sources.items()):
+        group = []
+        intact = bool(entries)
+        for entry in entries:
+            file_info = current.get(entry.path)
+            if (file_info is not None and file_info[1] == entry.words and entry.path not in kept_paths
+                    and fingerprints.get(entry.path) == (entry.size, entry.mtime_ns)):
+                group.append(file_info)
+                kept_paths.add(entry.path)
             else:
-                # Cannot place the file, exceeds source limit
-                print(f"Warning: Could not place file {file_path.name} ({word_count} words) without exceeding the source limit of {source_limit}. It will be skipped.")
-                ungrouped_files.append((file_path, word_count))
+                intact = False  # Removed, changed or listed twice
+        sources[number] = group
+        (untouched if intact else dirty).append(number)
 
-    return groups, ungrouped_files
+    candidates, ungrouped_files = _groupable_files(
+        [item for item in files_with_counts if str(item[0]) not in kept_paths], word_limit)
+
+    # Bins in order of preference: sources being rewritten anyway, new sources, untouched sources
+    first_new = max(sources, default=0) + 1
+    new_numbers = list(range(first_new, first_new + max(0, source_limit - len(sources))))
+    order = dirty + new_numbers + untouched
+    loads = [sum(count for _, count in sources.get(number, ())) for number in order]
+    assignment = first_fit([count for _, count in candidates], word_limit, len(order), loads)
+
+    status = {number: "untouched" for number in untouched}
+    for (file_path, word_count), index in zip(candidates, assignment):
+        if index < 0:
+            _warn_unplaced(file_path, word_count, source_limit)
+            ungrouped_files.append((file_path, word_count))
+            continue
+        number = order[index]
+        sources.setdefault(number, []).append((file_path, word_count))
+        status[number] = "new" if number >= first_new else "changed"
+    for number in dirty:
+        status[number] = "changed" if sources[number] else "removed"
+
+    groups = {number: group for number, group in sources.items() if group}
+    return groups, ungrouped_files, status
 
 def sanitize_filename(filename: str) -> str:
     """
@@ -249,45 +971,295 @@ def sanitize_filename(filename: str) -> str:
     # Replace potentially dangerous characters with underscores
     return ''.join(c if c.isalnum() or c in '._- ' else '_' for c in filename)
 
-def concatenate_files(group: List[Tuple[Path, int]], output_filepath: Path):
-    """Concatenates files from a group into a single output file with separators."""
+def _encode_output(text: str) -> bytes:
+    """Encode text for an output file, translating newlines as text mode would."""
+    if os.linesep != "\n":
+        text = text.replace("\n", os.linesep)
+    return text.encode('utf-8')
+
+def _write_all(outfile: BinaryIO, data: bytes):
+    """Write all of data to an unbuffered binary file."""
+    view = memoryview(data)
+    while view:
+        view = view[outfile.write(view):]
+
+def _copy_utf8(infile: BinaryIO, outfile: BinaryIO):
+    """
+    Copy UTF-8 text between binary files in a single pass, as reading it in
+    text mode and writing it back would.
+    
+    Each block is checked before it is written: ASCII blocks with
+    bytes.isascii() alone, other blocks by decoding them. Carriage returns are
+    translated to "\n" in the bytes, which is safe because UTF-8 never uses
+    the byte of "\r" inside a multi-byte character. For platforms that use
+    "\n" line endings.
+    
+    Raises:
+        UnicodeDecodeError: If the file is not valid UTF-8; the blocks before
+            the invalid one have already been written
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    after_cr = False  # Whether the previous block ended with "\r"
+    while True:
+        block = infile.read(COUNT_CHUNK_SIZE)
+        if not block:
+            break
+        # Bytes of a character split between blocks are pending in the decoder
+        if not block.isascii() or decoder.getstate()[0]:
+            decoder.decode(block)
+        if after_cr and block.startswith(b"\n"):
+            block = block[1:]  # The "\r" of a "\r\n" split between blocks was written as "\n"
+        after_cr = block.endswith(b"\r")
+        if b"\r" in block:
+            block = block.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+        _write_all(outfile, block)
+    decoder.decode(b"", final=True)
+
+def _write_group(group: List[Tuple[Path, int]], outfile: BinaryIO,
+                 content_store: Optional[ContentStore] = None,
+                 display_names: Optional[Dict[str, str]] = None):
+    """
+    Write the files of a group, with separators, to a binary output file.
+    
+    Input files are read once, a block at a time. If one cannot be read to
+    the end, what was written of it is removed again when outfile is
+    seekable, and an error line is written in its place.
+    
+    Args:
+        group: List of (file path, word count) tuples to write
+        outfile: Unbuffered binary output file
+        content_store: Optional store with contents retained during counting
+        display_names: Optional names to show for input files, by path
+    """
+    for file_path, word_count in group:
+        # Sanitize filename before including in output
+        safe_filename = sanitize_filename(_display_name(file_path, display_names))
+        header = _encode_output(f"--- START FILE: {safe_filename} ({word_count} words) ---\n\n")
+        footer = _encode_output(f"\n\n--- END FILE: {safe_filename} ---\n\n")
+        retained = content_store.pop_chunks(file_path) if content_store is not None else None
+        if retained is not None:
+            _write_all(outfile, header)
+            for chunk in retained:
+                _write_all(outfile, _encode_output(chunk))
+            _write_all(outfile, footer)
+            continue
+        start = outfile.tell() if outfile.seekable() else None
+        try:
+            if compression_of(file_path) is not None:
+                # Decompressed a block at a time, so the file is never held in memory whole
+                with open_text(file_path) as infile:
+                    _write_all(outfile, header)
+                    for chunk in _read_blocks(infile, COUNT_CHUNK_SIZE, None):
+                        _write_all(outfile, _encode_output(chunk))
+                    _write_all(outfile, footer)
+            elif os.linesep == "\n":
+                # Copied as bytes, without decoding more than it takes to check them
+                with open(file_path, 'rb') as infile:
+                    _write_all(outfile, header)
+                    _copy_utf8(infile, outfile)
+                    _write_all(outfile, footer)
+            else:
+                with open(file_path, 'r', encoding='utf-8') as infile:
+                    content = infile.read()
+                    _write_all(outfile, header)
+                    _write_all(outfile, _encode_output(content))
+                    _write_all(outfile, footer)
+        except Exception as e:
+            print(f"Error reading file {file_path} during concatenation: {e}")
+            if start is not None:
+                # Remove the part of the file written before the error
+                outfile.seek(start)
+                outfile.truncate()
+            # Sanitize filename in error message
+            _write_all(outfile, _encode_output(f"--- ERROR: Could not read file {safe_filename} ---\n\n"))
+
+def concatenate_files(group: List[Tuple[Path, int]], output_filepath: Path,
+                      content_store: Optional[ContentStore] = None,
+                      display_names: Optional[Dict[str, str]] = None) -> bool:
+    """
+    Concatenates files from a group into a single output file with separators.
+    
+    Input files are read once and copied as bytes, with newlines translated
+    as text mode would; only blocks that are not ASCII are decoded, to check
+    that they are valid UTF-8. The output is written to a temporary
+    ".part" file and renamed into place once complete, so an output file
+    never holds a partially written group.
+    
+    Args:
+        group: List of (file path, word count) tuples to concatenate
+        output_filepath: Path of the output file
+        content_store: Optional store with contents retained during counting;
+            files found there are not read from disk again
+        display_names: Optional names to show for input files instead of
+            their file names, by path
+        
+    Returns:
+        True if the output file was written, False otherwise
+    """
+    partial_filepath = output_filepath.with_name(output_filepath.name + ".part")
     try:
-        with open(output_filepath, 'w', encoding='utf-8') as outfile:
-            for file_path, word_count in group:
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as infile:
-                        content = infile.read()
-                        # Sanitize filename before including in output
-                        safe_filename = sanitize_filename(file_path.name)
-                        outfile.write(f"--- START FILE: {safe_filename} ({word_count} words) ---\n\n")
-                        outfile.write(content)
-                        outfile.write(f"\n\n--- END FILE: {safe_filename} ---\n\n")
-                except Exception as e:
-                    print(f"Error reading file {file_path} during concatenation: {e}")
-                    # Sanitize filename in error message
-                    safe_filename = sanitize_filename(file_path.name)
-                    outfile.write(f"--- ERROR: Could not read file {safe_filename} ---\n\n")
+        with open(partial_filepath, 'wb', buffering=0) as outfile:
+            _write_group(group, outfile, content_store, display_names=display_names)
+        os.replace(partial_filepath, output_filepath)
         print(f"Successfully created concatenated file: {output_filepath.name}")
+        return True
     except Exception as e:
         print(f"Error writing output file {output_filepath}: {e}")
+        try:
+            partial_filepath.unlink()
+        except OSError:
+            pass
+        return False
+
+def write_groups_to_zip(groups: List[List[Tuple[Path, int]]], zip_path: Path,
+                        numbers: Optional[Sequence[int]] = None,
+                        content_store: Optional[ContentStore] = None,
+                        display_names: Optional[Dict[str, str]] = None) -> List[bool]:
+    """
+    Writes each group straight into a notebooklm_source_<number>.txt entry of a ZIP archive.
+    
+    The sources are never written to the output directory, so their bytes
+    are written to disk only once. Entries are written one after another,
+    as a ZIP archive can only be written sequentially. Like an output file,
+    the archive is written to a ".part" file and renamed into place once
+    complete.
+    
+    Args:
+        groups: Groups of (file path, word count) tuples to write
+        zip_path: Path of the ZIP archive to create
+        numbers: Source number of each group (default: numbered from 1)
+        content_store: Optional store with contents retained during counting
+        display_names: Optional names to show for input files, by path
+        
+    Returns:
+        For each group, whether its entry was written (all or none)
+    """
+    import zipfile  # Only needed for ZIP output, so not loaded at startup
+
+    if numbers is None:
+        numbers = range(1, len(groups) + 1)
+    partial_path = zip_path.with_name(zip_path.name + ".part")
+    try:
+        with zipfile.ZipFile(partial_path, 'w') as archive:
+            for number, group in zip(numbers, groups):
+                output_filename = _source_filename(number)
+                group_total_words = sum(count for _, count in group)
+                print(f"  Adding {output_filename} from {len(group)} files (Total words: {group_total_words})...")
+                # Entries over 2 GiB need ZIP64 headers, which must be chosen before writing.
+                # The size of compressed inputs once decompressed is unknown, so they always get them
+                input_size = sum(_file_size(file_path) for file_path, _ in group)
+                zip64 = (input_size > zipfile.ZIP64_LIMIT // 2
+                         or any(compression_of(file_path) is not None for file_path, _ in group))
+                with archive.open(output_filename, 'w', force_zip64=zip64) as entry:
+                    _write_group(group, entry, content_store, display_names=display_names)
+        os.replace(partial_path, zip_path)
+        print(f"Successfully created archive: {zip_path.name}")
+        return [True] * len(groups)
+    except Exception as e:
+        # A partly written archive is not usable
+        print(f"Error writing archive {zip_path}: {e}")
+        try:
+            partial_path.unlink()
+        except OSError:
+            pass
+        return [False] * len(groups)
+
+def write_groups(groups: List[List[Tuple[Path, int]]], output_path: Path, first_number: int = 1,
+                 content_store: Optional[ContentStore] = None, jobs: int = 1,
+                 numbers: Optional[Sequence[int]] = None,
+                 display_names: Optional[Dict[str, str]] = None) -> List[bool]:
+    """
+    Writes each group to notebooklm_source_<number>.txt, optionally in parallel.
+    
+    Groups are written by a pool of worker threads and may finish in any
+    order. The resume state only advances over the unbroken run of groups,
+    from the first one, that have been completely written and renamed into
+    place, so a resumed run never skips a group that is missing. Progress is
+    appended to the resume journal in the output directory.
+    
+    Args:
+        groups: Groups of (file path, word count) tuples to write
+        output_path: Output directory path
+        first_number: Number of the first group's output file
+        content_store: Optional store with contents retained during counting
+        jobs: Number of groups written at the same time (0 uses one per CPU core)
+        numbers: Explicit source number of each group, for writing only some of
+            the sources; the resume state is not updated in this case
+        display_names: Optional names to show for input files, by path
+        
+    Returns:
+        For each group, whether its output file was written
+    """
+    finished: Dict[int, bool] = {}
+    loaded: Dict[int, List[Tuple[Path, int]]] = {}  # Written groups waiting to be recorded in the journal
+    next_index = 0
+    journal = None
+    if numbers is None:
+        numbers = range(first_number, first_number + len(groups))
+        journal = ResumeJournal(output_path / RESUME_JOURNAL_FILE, RESUME_SYNC_GROUPS)
+    
+    def write_group(index: int) -> bool:
+        group = groups[index]
+        # Kept for the journal, so groups that are loaded on access are not loaded twice
+        if journal is not None and finished.get(next_index) is not False:
+            loaded[index] = group
+        output_filename = _source_filename(numbers[index])
+        group_total_words = sum(count for _, count in group)
+        print(f"  Creating {output_filename} from {len(group)} files (Total words: {group_total_words})...")
+        return concatenate_files(group, output_path / output_filename, content_store, display_names)
+    
+    def record(index: int, written: bool):
+        nonlocal next_index
+        finished[index] = written
+        if journal is None:
+            return
+        # Update resume state for each group that completes the written prefix
+        while finished.get(next_index):
+            journal.record(first_number + next_index, (str(file_path) for file_path, _ in loaded.pop(next_index)))
+            next_index += 1
+        if finished.get(next_index) is False:
+            loaded.clear()  # No group after one that failed is recorded
+    
+    workers = min(resolve_jobs(jobs), len(groups))
+    try:
+        if workers <= 1:
+            for index in range(len(groups)):
+                record(index, write_group(index))
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(write_group, index): index for index in range(len(groups))}
+                for future in as_completed(futures):
+                    record(futures[future], future.result())
+    finally:
+        if journal is not None:
+            journal.close()
+    return [finished[index] for index in range(len(groups))]
 
 def save_resume_state(output_path: Path, groups_processed: int, files_processed: Set[str]):
     """
     Save resume state to allow continuing an interrupted operation.
     
+    The state replaces any previous state, including the resume journal.
+    
     Args:
         output_path: Output directory path
         groups_processed: Number of groups already processed
         files_processed: Set of file paths that have been processed
     """
     resume_file = output_path / RESUME_MARKER_FILE
+    partial_file = resume_file.with_name(resume_file.name + ".part")
     try:
         state = {
             'groups_processed': groups_processed,
             'files_processed': list(files_processed)  # Convert set to list for JSON serialization
         }
-        with open(resume_file, 'w', encoding='utf-8') as f:
+        with open(partial_file, 'w', encoding='utf-8') as f:
             json.dump(state, f)
+        os.replace(partial_file, resume_file)
+        # The journal is folded into the saved state
+        journal_file = output_path / RESUME_JOURNAL_FILE
+        if journal_file.exists():
+            journal_file.unlink()
     except Exception as e:
         print(f"Warning: Could not save resume state: {e}")
 
@@ -295,6 +1267,9 @@ def load_resume_state(output_path: Path) -> Tuple[int, Set[str]]:
     """
     Load resume state from previous interrupted operation.
     
+    The saved state is read first, then the groups recorded in the resume
+    journal since it was saved are applied.
+    
     Args:
         output_path: Output directory path
         
@@ -302,34 +1277,69 @@ def load_resume_state(output_path: Path) -> Tuple[int, Set[str]]:
         Tuple of (groups_processed, files_processed)
     """
     resume_file = output_path / RESUME_MARKER_FILE
-    
-    if not resume_file.exists():
-        return 0, set()
+    groups_processed, files_processed = 0, set()
     
     try:
-        with open(resume_file, 'r', encoding='utf-8') as f:
-            state = json.load(f)
-            groups_processed = state.get('groups_processed', 0)
-            # Convert list back to set
-            files_processed = set(state.get('files_processed', []))
-            return groups_processed, files_processed
+        if resume_file.exists():
+            with open(resume_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+                groups_processed = state.get('groups_processed', 0)
+                # Convert list back to set
+                files_processed = set(state.get('files_processed', []))
+        return replay_journal(output_path / RESUME_JOURNAL_FILE, groups_processed, files_processed)
     except Exception as e:
         print(f"Warning: Could not load resume state: {e}")
         return 0, set()
 
+def compact_resume_state(output_path: Path):
+    """
+    Fold the resume journal into the saved resume state.
+    
+    Args:
+        output_path: Output directory path
+    """
+    if (output_path / RESUME_JOURNAL_FILE).exists():
+        groups_processed, files_processed = load_resume_state(output_path)
+        save_resume_state(output_path, groups_processed, files_processed)
+
+def clear_resume_state(output_path: Path):
+    """
+    Remove the resume state, journal and grouping plan, e.g. once all groups are written.
+    
+    Args:
+        output_path: Output directory path
+    """
+    for name in (RESUME_MARKER_FILE, RESUME_JOURNAL_FILE, PLAN_FILE):
+        resume_file = output_path / name
+        if resume_file.exists():
+            try:
+                resume_file.unlink()
+            except Exception:
+                pass  # Ignore errors in cleanup
+
 def generate_summary_report(output_path: Path, groups: List[List[Tuple[Path, int]]], 
                            ungrouped: List[Tuple[Path, int]], 
-                           total_files: int, total_words: int):
+                           total_files: int, total_words: int,
+                           source_numbers: Optional[Sequence[int]] = None,
+                           display_names: Optional[Dict[str, str]] = None,
+                           word_limit: Optional[int] = None):
     """
     Generate a summary report file in the output directory.
     
     Args:
         output_path: Output directory path
-        groups: List of file groups created
+        groups: List of file groups created, or a GroupView (e.g. of a FileTable)
         ungrouped: List of files that couldn't be grouped
         total_files: Total number of files processed
         total_words: Total number of words processed
+        source_numbers: Source number of each group (default: numbered from 1)
+        display_names: Optional names to show for input files, by path
+        word_limit: Word limit the groups were made with (default: WORD_LIMIT)
     """
+    if word_limit is None:
+        word_limit = WORD_LIMIT
+    if source_numbers is None:
+        source_numbers = range(1, len(groups) + 1)
     summary_path = output_path / "notebook_cat_summary.txt"
     
     try:
@@ -346,150 +1356,835 @@ def generate_summary_report(output_path: Path, groups: List[List[Tuple[Path, int
             
             f.write("GROUP DETAILS\n")
             f.write("-------------\n")
-            for i, group in enumerate(groups):
-                group_words = sum(count for _, count in group)
-                efficiency = (group_words / WORD_LIMIT) * 100
-                f.write(f"Group {i+1}: {len(group)} files, {group_words} words ")
+            for index, number in zip(range(len(groups)), source_numbers):
+                # Views of a FileTable or spill list file names without creating Path objects
+                if isinstance(groups, GroupView):
+                    group = groups.names(index)
+                else:
+                    group = [(str(file_path), file_path.name, count) for file_path, count in groups[index]]
+                group_words = sum(count for _, _, count in group)
+                efficiency = (group_words / word_limit) * 100
+                f.write(f"Group {number}: {len(group)} files, {group_words} words ")
                 f.write(f"({efficiency:.1f}% of capacity)\n")
                 
                 # List files in each group
-                for j, (file_path, word_count) in enumerate(group):
-                    f.write(f"  {j+1}. {file_path.name} ({word_count} words)\n")
+                for j, (path, name, word_count) in enumerate(group):
+                    if display_names:
+                        name = display_names.get(path, name)
+                    f.write(f"  {j+1}. {name} ({word_count} words)\n")
                 f.write("\n")
             
             if ungrouped:
                 f.write("UNGROUPED FILES\n")
                 f.write("--------------\n")
                 for file_path, word_count in ungrouped:
-                    reason = "Exceeds word limit" if word_count > WORD_LIMIT else "Couldn't fit in groups"
-                    f.write(f"- {file_path.name} ({word_count} words): {reason}\n")
+                    reason = "Exceeds word limit" if word_count > word_limit else "Couldn't fit in groups"
+                    f.write(f"- {_display_name(file_path, display_names)} ({word_count} words): {reason}\n")
         
         print(f"Summary report created: {summary_path}")
     except Exception as e:
         print(f"Warning: Could not create summary report: {e}")
 
-def process_directory(input_dir: str, output_dir: str, source_limit: int = DEFAULT_SOURCE_LIMIT, 
+def _source_filename(number: int) -> str:
+    return f"notebooklm_source_{number}.txt"
+
+def _remove_source(source_path: Path):
+    """Delete an output source that no longer has any input files."""
+    try:
+        if source_path.exists():
+            source_path.unlink()
+            print(f"  Removed {source_path.name}, which no longer has any input files.")
+    except Exception as e:
+        print(f"Warning: Could not remove {source_path}: {e}")
+
+def _format_numbers(numbers: Iterable[int]) -> str:
+    """Format source numbers compactly, e.g. "1-3, 7"."""
+    ranges: List[List[int]] = []
+    for number in sorted(numbers):
+        if ranges and number == ranges[-1][1] + 1:
+            ranges[-1][1] = number
+        else:
+            ranges.append([number, number])
+    return ", ".join(str(a) if a == b else f"{a}-{b}" for a, b in ranges) or "none"
+
+def _incremental_report(status: Dict[int, str]) -> str:
+    """Describe which sources an incremental run writes, keeps and removes."""
+    lines = ["Incremental update:"]
+    for state in ("new", "changed", "untouched", "removed"):
+        numbers = [number for number, value in status.items() if value == state]
+        lines.append(f"  {state.capitalize()} sources ({len(numbers)}): {_format_numbers(numbers)}")
+    return "\n".join(lines)
+
+def _manifest_entries(group: List[Tuple[Path, int]], fingerprints: Dict[str, Fingerprint]) -> List[ManifestEntry]:
+    entries = []
+    for file_path, word_count in group:
+        size, mtime_ns = fingerprints[str(file_path)]
+        entries.append(ManifestEntry(str(file_path), size, mtime_ns, word_count))
+    return entries
+
+def _load_compatible_manifest(output_path: Path, json_path: Optional[JsonPath],
+                              source_limit: int, word_limit: int) -> Optional[Manifest]:
+    """Load the manifest of the previous run, if its sources can be kept."""
+    manifest = load_manifest(output_path / MANIFEST_FILE)
+    if manifest is None:
+        print("No manifest from a previous run found; writing all sources.")
+        return None
+    if (manifest.word_limit != word_limit or manifest.json_path != (str(json_path) if json_path else "")
+            or len(manifest.sources) > source_limit):
+        print("The previous run used a different word limit, JSON path or source limit; writing all sources.")
+        return None
+    return manifest
+
+def _plan_settings(input_path: Optional[Path], input_files: Optional[Sequence[InputFile]],
+                   file_extensions: Set[str], json_path: Optional[JsonPath],
+                   source_limit: int, max_files: Optional[int], recursive: bool,
+                   include: Optional[Sequence[str]], exclude: Optional[Sequence[str]],
+                   packing: str, word_limit: int) -> Dict:
+    """Options that the grouping of a run depends on, as saved in its plan."""
+    return {
+        'input_dir': str(input_path.resolve()) if input_path is not None else None,
+        'input_files': ([str(_split_input_file(item)[0].resolve()) for item in input_files]
+                        if input_files is not None else None),
+        'extensions': sorted(file_extensions),
+        'json_path': str(json_path) if json_path else "",
+        'source_limit': source_limit,
+        'word_limit': word_limit,
+        'max_files': max_files if max_files is not None and max_files > 0 else None,
+        'recursive': recursive,
+        'include': list(include) if include else None,
+        'exclude': list(exclude) if exclude else None,
+        'packing': packing,
+    }
+
+def _load_matching_plan(output_path: Path, settings: Dict) -> Optional[ResumePlan]:
+    """Load the grouping plan of the interrupted run, if it was made with the same options."""
+    plan = load_plan(output_path / PLAN_FILE)
+    if plan is not None and plan.settings != settings:
+        print("The saved grouping plan was made with different options; scanning the input directory again.")
+        return None
+    return plan
+
+def _plan_table(plan: ResumePlan) -> FileTable:
+    """Return the files and groups of a saved grouping plan as a FileTable."""
+    table = FileTable()
+    assignment = []
+    for index, group in enumerate(plan.groups):
+        for planned in group:
+            assignment.append((len(table), index))
+            table.add(planned.path, planned.size, planned.mtime_ns, planned.words)
+    for path, words in plan.ungrouped:
+        assignment.append((len(table), UNGROUPED))
+        table.add(path, words=words)
+    table.set_groups(assignment)
+    return table
+
+def _write_sources(output_path: Path, groups: List[List[Tuple[Path, int]]], numbers: List[int],
+                   ungrouped: List[Tuple[Path, int]], total_files: int, total_words: int,
+                   fingerprints: Optional[Dict[str, Fingerprint]], json_path: Optional[JsonPath],
+                   skip: int = 0, complete: bool = True, status: Optional[Dict[int, str]] = None,
+                   plan: Optional[ResumePlan] = None, content_store: Optional[ContentStore] = None,
+                   write_jobs: int = 1, cache_message: Optional[str] = None,
+                   profiler: Optional[PhaseProfiler] = None,
+                   zip_path: Optional[Path] = None,
+                   display_names: Optional[Dict[str, str]] = None,
+                   word_limit: Optional[int] = None,
+                   spill: Optional[FileSpill] = None,
+                   table: Optional[FileTable] = None) -> List[str]:
+    """
+    Write the output sources of a grouping, then the manifest and summary report.
+    
+    Args:
+        output_path: Output directory path
+        groups: File groups, in source number order
+        numbers: Source number of each group
+        ungrouped: Files that couldn't be grouped
+        total_files: Total number of files processed
+        total_words: Total number of words processed
+        fingerprints: (size, mtime_ns) of every grouped file, by path (None
+            with spill or table)
+        json_path: JSON path used to extract text from JSON files
+        skip: Number of leading groups already written by an interrupted run
+        complete: If True, groups and numbers describe every source, so a
+            manifest is written
+        status: Incremental status of each source number; untouched sources
+            are not written
+        plan: Grouping plan to save before writing, for --resume; any
+            earlier resume state is discarded
+        content_store: File contents retained while counting
+        write_jobs: Number of output source files written at the same time
+        cache_message: Word count cache statistics to report
+        profiler: Profiler that times the writing and report phases
+        zip_path: Write the sources as entries of this ZIP archive instead of
+            files in the output directory; the summary report is added to it
+        display_names: Optional names to show for input files, by path
+        word_limit: Word limit the groups were made with (default: WORD_LIMIT)
+        spill: File records of a low-memory run that groups and ungrouped are
+            read from; it is closed at the end, and removed unless it is needed
+            to resume writing the sources that failed
+        table: File records that groups and ungrouped are the views of (see
+            FileTable.group_view)
+        
+    Returns:
+        Names of the sources written
+    """
+    if word_limit is None:
+        word_limit = WORD_LIMIT
+    if profiler is None:
+        profiler = PhaseProfiler(enabled=False)
+    print(f"Concatenating files into '{zip_path or output_path}'...")
+    # Files and input bytes of each group, for the statistics of the write phase
+    if spill is not None or table is not None:
+        group_sizes = [(files, size) for files, _, size in (spill or table).group_totals()]
+    else:
+        group_sizes = [(len(group), sum(fingerprints[str(file_path)][0] for file_path, _ in group))
+                       for group in groups]
+
+    with profiler.phase("write") as stats:
+        if zip_path is not None:
+            try:
+                written = dict(zip(numbers, write_groups_to_zip(groups, zip_path, numbers, content_store,
+                                                                display_names)))
+            finally:
+                if content_store is not None:
+                    content_store.close()
+            stats.bytes_written = _file_size(zip_path)
+        else:
+            written = _write_planned_groups(output_path, groups, numbers, skip, status, plan,
+                                            content_store, write_jobs, display_names)
+        for number, (files, size) in zip(numbers, group_sizes):
+            if written.get(number):
+                stats.files += files
+                stats.bytes_read += size
+                if zip_path is None:
+                    stats.bytes_written += _file_size(output_path / _source_filename(number))
+    failed = [number for number, result in written.items() if not result]
+
+    # Remove resume state when complete, keep it (compacted) if some groups were not written
+    if zip_path is not None:
+        pass  # Archives are written in one go and cannot be resumed
+    elif failed:
+        # A spill is the grouping plan of a low-memory run; its journal is
+        # not compacted, as that would load the files of every written group
+        if spill is None:
+            compact_resume_state(output_path)
+    else:
+        clear_resume_state(output_path)
+
+    print("\nProcessing complete.")
+    if status is not None:
+        print(f"  {len(written) - len(failed)} source files written, "
+              f"{len(groups) - len(written)} left untouched in '{output_path}'.")
+    else:
+        print(f"  {len(written) - len(failed)} source files created in '{zip_path or output_path}'.")
+    if failed:
+        if zip_path is not None:
+            retry = ""
+        else:
+            retry = " with --incremental" if status is not None else " with --resume"
+        print(f"  Warning: sources {_format_numbers(failed)} could not be written; run again{retry} to retry.")
+    if ungrouped:
+        print(f"  {len(ungrouped)} files could not be grouped due to limits.")
+        print("  See summary report for details.")
+    if cache_message:
+        print(f"  {cache_message}")
+    
+    with profiler.phase("report") as stats:
+        if complete:
+            sources = {}
+            for index, number in enumerate(numbers):
+                if not written.get(number, True):
+                    sources[number] = []
+                elif table is not None:
+                    sources[number] = [ManifestEntry(path, size, mtime_ns, words) for path, words, size, mtime_ns
+                                       in table.records(table.group_rows(index))]
+                else:
+                    sources[number] = _manifest_entries(groups[index], fingerprints)
+            save_manifest(output_path / MANIFEST_FILE, Manifest(
+                word_limit, str(json_path) if json_path else "", sources))
+            stats.bytes_written += _file_size(output_path / MANIFEST_FILE)
+        # Generate summary report
+        generate_summary_report(output_path, groups[skip:], ungrouped,
+                              total_files, total_words, numbers[skip:], display_names, word_limit)
+        summary_path = output_path / "notebook_cat_summary.txt"
+        stats.bytes_written += _file_size(summary_path)
+        if zip_path is not None and not failed and summary_path.exists():
+            try:
+                import zipfile
+                with zipfile.ZipFile(zip_path, 'a') as archive:
+                    archive.write(summary_path, arcname=summary_path.name)
+            except Exception as e:
+                print(f"Warning: Could not add the summary report to {zip_path}: {e}")
+    if spill is not None:
+        spill.close()
+        if zip_path is not None or not failed:
+            FileSpill.remove_file(spill.db_path)
+    _save_profile(profiler, output_path)
+    return [_source_filename(number) for number, result in written.items() if result]
+
+def _write_planned_groups(output_path: Path, groups: List[List[Tuple[Path, int]]], numbers: List[int],
+                          skip: int, status: Optional[Dict[int, str]], plan: Optional[ResumePlan],
+                          content_store: Optional[ContentStore], write_jobs: int,
+                          display_names: Optional[Dict[str, str]] = None) -> Dict[int, bool]:
+    """Write the groups that need it and return whether each was written, by source number."""
+    try:
+        if status is not None:
+            to_write = [i for i, number in enumerate(numbers) if status[number] != "untouched"]
+            results = write_groups([groups[i] for i in to_write], output_path, content_store=content_store,
+                                   jobs=write_jobs, numbers=[numbers[i] for i in to_write],
+                                   display_names=display_names)
+            written = {numbers[i]: result for i, result in zip(to_write, results)}
+            for number, state in status.items():
+                if state == "removed":
+                    _remove_source(output_path / _source_filename(number))
+        else:
+            if plan is not None:
+                # Progress left by an earlier run does not apply to this one
+                clear_resume_state(output_path)
+                save_plan(output_path / PLAN_FILE, plan)
+            # Skip already processed groups if resuming
+            results = write_groups(groups[skip:], output_path, numbers[skip] if skip < len(numbers) else 1,
+                                   content_store, jobs=write_jobs, display_names=display_names)
+            written = dict(zip(numbers[skip:], results))
+    finally:
+        if content_store is not None:
+            content_store.close()
+    return written
+
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+def _save_profile(profiler: PhaseProfiler, output_path: Path):
+    """Write the profile report of a run and print its summary."""
+    if not profiler.enabled:
+        return
+    profiler.save(output_path / PROFILE_FILE, output_path / PROFILE_STATS_FILE)
+    print(profiler.summary())
+    print(f"Profile report saved to {output_path / PROFILE_FILE}")
+    if profiler.cprofile:
+        slowest = profiler.slowest_phase()
+        if slowest is not None:
+            print(f"cProfile statistics of the slowest phase ({slowest.name}) saved to "
+                  f"{output_path / PROFILE_STATS_FILE}")
+
+def _print_dry_run(groups: Sequence[List[Tuple[Path, int]]], numbers: List[int], word_limit: int,
+                   display_names: Optional[Dict[str, str]] = None):
+    """Print the sources a dry run would create."""
+    print("\n--- DRY RUN MODE: No files will be created ---")
+    print(f"Would create {len(groups)} output files with the following content:")
+    
+    for number, group in zip(numbers, groups):
+        group_total_words = sum(count for _, count in group)
+        efficiency = (group_total_words / word_limit) * 100
+        print(f"  Group {number}: {len(group)} files, {group_total_words} words ({efficiency:.1f}% of limit)")
+        
+        # Option to show detailed file list in dry run
+        for j, (file_path, word_count) in enumerate(group[:5]):  # Show first 5 files
+            print(f"    - {_display_name(file_path, display_names)} ({word_count} words)")
+        if len(group) > 5:
+            print(f"    - ... and {len(group) - 5} more files")
+
+def _pack_spilled(spill: FileSpill, source_limit: int, strategy: str, word_limit: int, batch_size: int):
+    """
+    Group the files of a spill, like pack_files, streaming them largest first.
+    
+    Only the packer's bins are held in memory; the group of each file is
+    written back to the spill in batches.
+    """
+    files = (((position, file_id), os.path.basename(path), word_count)
+             for position, (file_id, path, word_count) in enumerate(spill.files_by_words()))
+    placements: List[Tuple[int, int, int]] = []
+    for (position, file_id), index in _place_files(files, source_limit, strategy, word_limit,
+                                                   spill.count_packable(word_limit)):
+        placements.append((position, file_id, index))
+        if len(placements) >= batch_size:
+            spill.add_placements(placements)
+            placements = []
+    spill.add_placements(placements)
+    spill.finish_placements()
+
+def _process_with_spill(input_path: Optional[Path], input_files: Optional[Sequence[InputFile]],
+                        output_path: Path, settings: Dict, memory_budget: int, source_limit: int,
+                        dry_run: bool, file_extensions: Set[str], json_path: Optional[JsonPath],
+                        resume: bool, max_files: Optional[int], jobs: int, executor: str,
+                        use_cache: bool, clear_cache: bool, recursive: bool,
+                        include: Optional[Sequence[str]], exclude: Optional[Sequence[str]],
+                        packing: str, write_jobs: int, profiler: PhaseProfiler,
+                        zip_path: Optional[str], display_names: Optional[Dict[str, str]],
+                        word_limit: int, count_engine: str) -> List[str]:
+    """
+    Low-memory version of process_directory (see its memory_budget option).
+    
+    The file records are kept in a spill database in the output directory
+    (see spill.py) instead of in memory. Half of the budget goes to the
+    database's page cache; the rest bounds the number of files held in
+    memory at once while they are counted and grouped.
+    """
+    spill_path = output_path / SPILL_FILE
+    cache_bytes = memory_budget // 2
+    batch_size = max(MIN_SPILL_BATCH, memory_budget // 2 // SPILL_RECORD_BYTES)
+
+    if resume:
+        with profiler.phase("plan") as stats:
+            spill = FileSpill.open_plan(spill_path, settings, cache_bytes)
+            if spill is not None:
+                stats.bytes_read = _file_size(spill_path)
+        if spill is not None and not dry_run:
+            groups_processed = journal_progress(output_path / RESUME_JOURNAL_FILE)
+            print(f"Resuming previous operation: {groups_processed} groups already processed.")
+            print("Using the saved grouping plan; skipping scanning and word counting.")
+            groups = spill.group_view()
+            return _write_sources(output_path, groups, list(range(1, len(groups) + 1)), SpilledUngrouped(spill),
+                                  int(spill.get_meta('total_files')), int(spill.get_meta('total_words')),
+                                  None, json_path, skip=min(groups_processed, len(groups)), complete=False,
+                                  write_jobs=write_jobs, profiler=profiler, display_names=display_names,
+                                  word_limit=word_limit, spill=spill)
+        if spill is not None:
+            spill.close()
+        elif not dry_run:
+            print("No saved grouping plan of a low-memory run with these options; processing all files.")
+
+    spill = FileSpill(spill_path, cache_bytes)
+    try:
+        if input_path is not None:
+            print(f"Scanning for files with extensions {file_extensions} in '{input_path}'...")
+        with profiler.phase("scan") as stats:
+            if input_path is not None:
+                entries = iter_scan_files(input_path, file_extensions, recursive, include, exclude, output_path)
+            else:
+                entries = collect_files(input_files, file_extensions)
+            found = spill.add_files(entries, batch_size, sort_by_path=input_path is not None)
+            if max_files is not None and max_files > 0:
+                spill.limit_files(max_files)
+                print(f"Limited to {max_files} files, returning {min(found, max_files)}")
+            total_files = spill.file_count()
+            stats.files = total_files
+
+        if not total_files:
+            print(f"No matching files found in the input {'directory' if input_path is not None else 'files'}.")
+            spill.close()
+            FileSpill.remove_file(spill_path)
+            return []
+
+        cache = None
+        if use_cache:
+            # Cached counts are looked up one batch at a time instead of all loaded
+            cache = open_count_cache(output_path, json_path, clear=clear_cache, preload=False)
+        elif clear_cache:
+            cache_file = output_path / COUNT_CACHE_FILE
+            if cache_file.exists():
+                cache_file.unlink()
+                print("Word count cache cleared.")
+
+        workers = min(resolve_jobs(jobs), total_files)
+        if workers > 1:
+            print(f"Found {total_files} files. Counting words with {workers} {executor} workers...")
+        else:
+            print(f"Found {total_files} files. Counting words...")
+        try:
+            # One pool of workers counts every batch
+            with profiler.phase("count") as stats, _count_pool(workers, executor) as pool:
+                for batch in spill.file_batches(batch_size):
+                    counts = count_words_with_cache([Path(path) for _, path, _, _ in batch], cache, json_path,
+                                                    jobs=min(workers, len(batch)), executor=executor,
+                                                    fingerprints=[(size, mtime_ns) for _, _, size, mtime_ns in batch],
+                                                    engine=count_engine, pool=pool)
+                    spill.set_words((file_id, count) for (file_id, _, _, _), count in zip(batch, counts))
+                    stats.files += len(batch)
+                    stats.bytes_read += sum(size for _, _, size, _ in batch)
+        finally:
+            if cache is not None:
+                cache.close()
+        total_words = spill.total_words()
+        cache_message = cache.stats_message() if cache is not None else None
+
+        print(f"Total words across all files: {total_words}")
+        print(f"Grouping files with a source limit of {source_limit} and word limit of {word_limit} per source...")
+        with profiler.phase("group") as stats:
+            _pack_spilled(spill, source_limit, packing, word_limit, batch_size)
+            stats.files = total_files
+        groups = spill.group_view()
+        numbers = list(range(1, len(groups) + 1))
+    except BaseException:
+        spill.close()
+        raise
+
+    if not groups:
+        print("No groups could be formed. Check file sizes and limits.")
+        spill.close()
+        FileSpill.remove_file(spill_path)
+        return []
+
+    print(f"Created {len(groups)} groups.")
+
+    if dry_run:
+        _print_dry_run(groups, numbers, word_limit, display_names)
+        with profiler.phase("report") as stats:
+            generate_summary_report(output_path, groups, SpilledUngrouped(spill),
+                                    total_files, total_words, numbers, display_names, word_limit)
+            stats.bytes_written = _file_size(output_path / "notebook_cat_summary.txt")
+        spill.close()
+        FileSpill.remove_file(spill_path)
+        if cache_message:
+            print(cache_message)
+        _save_profile(profiler, output_path)
+        return []
+
+    if zip_path is None:
+        # The spill is the grouping plan for --resume; progress left by an
+        # earlier run does not apply to this one
+        spill.save_plan(settings, total_files, total_words)
+        clear_resume_state(output_path)
+    return _write_sources(output_path, groups, numbers, SpilledUngrouped(spill), total_files, total_words,
+                          None, json_path, complete=False, write_jobs=write_jobs,
+                          cache_message=cache_message, profiler=profiler,
+                          zip_path=Path(zip_path) if zip_path is not None else None,
+                          display_names=display_names, word_limit=word_limit, spill=spill)
+
+def _open_count_stores(output_path: Path, json_path: Optional[JsonPath], use_cache: bool,
+                       clear_cache: bool, content_budget: int, workers: int,
+                       executor: str, word_limit: int) -> Tuple[Optional[WordCountCache], Optional[ContentStore]]:
+    """
+    Open the word count cache and content store used while counting, as requested.
+    
+    Args:
+        content_budget: Memory budget of the content store (0 for none)
+        workers: Number of counting workers
+        (other arguments as in process_directory)
+        
+    Returns:
+        The cache and content store, each None if not used
+    """
+    cache = None
+    if use_cache:
+        cache = open_count_cache(output_path, json_path, clear=clear_cache)
+    elif clear_cache:
+        cache_file = output_path / COUNT_CACHE_FILE
+        if cache_file.exists():
+            cache_file.unlink()
+            print("Word count cache cleared.")
+
+    content_store = None
+    if content_budget > 0:
+        if workers > 1 and executor == "process":
+            print("Note: File contents cannot be retained when counting with worker processes; "
+                  "use --executor thread to read each file only once.")
+        else:
+            content_store = ContentStore(content_budget, word_limit=word_limit)
+    return cache, content_store
+
+def process_directory(input_dir: Optional[str], output_dir: str, source_limit: int = DEFAULT_SOURCE_LIMIT, 
                      dry_run: bool = False, file_extensions: Optional[Set[str]] = None,
-                     json_path: Optional[str] = None, resume: bool = False,
-                     max_files: Optional[int] = None):
+                     json_path: Optional[JsonPathLike] = None, resume: bool = False,
+                     max_files: Optional[int] = None, jobs: int = 1,
+                     executor: str = "process", use_cache: bool = False,
+                     clear_cache: bool = False, content_budget: int = 0,
+                     recursive: bool = False, include: Optional[Sequence[str]] = None,
+                     exclude: Optional[Sequence[str]] = None,
+                     packing: str = DEFAULT_PACKING, write_jobs: int = 1,
+                     incremental: bool = False, profile: bool = False,
+                     cprofile: bool = False, zip_path: Optional[str] = None,
+                     input_files: Optional[Sequence[InputFile]] = None,
+                     word_limit: Optional[int] = None,
+                     count_engine: str = DEFAULT_COUNT_ENGINE,
+                     memory_budget: int = 0) -> List[str]:
     """
     Main processing function.
     
     Args:
-        input_dir: Input directory containing source files
+        input_dir: Input directory containing source files (None with input_files)
         output_dir: Output directory for concatenated files
         source_limit: Maximum number of source files to create
         dry_run: If True, don't create output files, just report
         file_extensions: Set of file extensions to process (default: txt, md, json)
-        json_path: Optional path to text field in JSON files
+        json_path: Optional JSON path to the text in JSON files (e.g., "segments.*.text")
         resume: If True, attempt to resume a previous interrupted operation
         max_files: Maximum number of input files to process
+        jobs: Number of parallel word counting workers (0 uses one per CPU core)
+        executor: Worker type used when jobs > 1 ("process" or "thread")
+        use_cache: If True, reuse word counts of unchanged files from previous runs
+        clear_cache: If True, invalidate the word count cache before counting
+        content_budget: Memory budget in bytes for keeping file contents read during
+            counting, so they are not read again when writing (0 disables; contents
+            beyond the budget are spilled to a temporary file)
+        recursive: If True, also process files in subdirectories
+        include: Optional glob patterns that file paths relative to input_dir must match
+        exclude: Optional glob patterns for relative paths of files and directories to skip
+        packing: Strategy used to pack files into sources ("first-fit" or "best-fit")
+        write_jobs: Number of output source files written at the same time
+            (0 uses one per CPU core)
+        incremental: If True, keep the sources of the previous run whose input
+            files are unchanged and only write sources that are new or changed
+            (see the manifest written after each run)
+        profile: If True, time each phase of the run and write a report of the
+            time, files and bytes of every phase to the output directory
+        cprofile: If True (with profile), also dump cProfile statistics of the
+            slowest phase
+        zip_path: Write the sources straight into entries of this ZIP archive
+            (with the summary report) instead of files in output_dir, so their
+            bytes are written only once; resume and incremental updates are not
+            available in this mode
+        input_files: Explicit files to process instead of scanning input_dir, as
+            paths or (path, display name) pairs (see process_files)
+        word_limit: Maximum number of words per source (default: WORD_LIMIT).
+            Passing it, rather than changing WORD_LIMIT, lets runs with
+            different limits take place at the same time
+        count_engine: Word counting engine, "python" or "numpy" (memory-maps
+            text files and counts their words with NumPy; requires NumPy)
+        memory_budget: Memory budget in bytes for very large inputs (0 disables).
+            The records of every file are then kept in a database in the output
+            directory instead of in memory, and streamed through counting,
+            grouping and writing, so memory use does not grow with the number
+            of files. Incremental runs, the manifest and content_budget are not
+            available in this mode
+        
+    Returns:
+        Names of the output sources written by this run (empty in dry run
+        mode or if nothing could be processed)
     """
-    input_path = Path(input_dir)
+    input_path = Path(input_dir) if input_files is None else None
     output_path = Path(output_dir)
 
-    if not input_path.is_dir():
+    if input_path is not None and not input_path.is_dir():
         print(f"Error: Input directory '{input_dir}' not found or is not a directory.")
-        return
+        return []
 
     output_path.mkdir(parents=True, exist_ok=True)  # Create output dir if it doesn't exist
 
     # Set default file extensions if not specified
     if file_extensions is None:
         file_extensions = {"txt", "md", "json"}
+    if word_limit is None:
+        word_limit = WORD_LIMIT
+
+    # Compile the JSON path once; it is shared by every file and worker
+    json_path = parse_json_path(json_path)
+    profiler = PhaseProfiler(enabled=profile, cprofile=cprofile)
+
+    if incremental and resume:
+        print("Note: --resume is ignored with --incremental, which only writes sources that need it.")
+        resume = False
+    if zip_path is not None and (incremental or resume):
+        print("Note: Sources written to a ZIP archive are always written in full; "
+              "resume and incremental updates are ignored.")
+        incremental = resume = False
 
     # Check for resume state
     groups_processed = 0
     files_processed = set()
+    settings = _plan_settings(input_path, input_files, file_extensions, json_path, source_limit, max_files,
+                              recursive, include, exclude, packing, word_limit)
+    display_names = input_display_names(input_files) if input_files is not None else None
+    if memory_budget > 0:
+        if incremental or content_budget > 0:
+            print("Note: --incremental and --content-budget are ignored with --memory-budget.")
+        return _process_with_spill(input_path, input_files, output_path, settings, memory_budget,
+                                   source_limit, dry_run, file_extensions, json_path, resume, max_files,
+                                   jobs, executor, use_cache, clear_cache, recursive, include, exclude,
+                                   packing, write_jobs, profiler, zip_path, display_names, word_limit,
+                                   count_engine)
     if resume:
         groups_processed, files_processed = load_resume_state(output_path)
         if groups_processed > 0 or files_processed:
             print(f"Resuming previous operation: {groups_processed} groups already processed.")
+        with profiler.phase("plan") as stats:
+            plan = _load_matching_plan(output_path, settings)
+            if plan is not None:
+                stats.files = plan.total_files
+                stats.bytes_read = _file_size(output_path / PLAN_FILE)
+        if plan is not None and not dry_run:
+            # The plan holds the file list, counts and groups of the interrupted run
+            print("Using the saved grouping plan; skipping scanning and word counting.")
+            table = _plan_table(plan)
+            groups = table.group_view()
+            return _write_sources(output_path, groups, list(range(1, len(groups) + 1)), table.ungrouped_view(),
+                                  plan.total_files, plan.total_words, None, json_path,
+                                  skip=min(groups_processed, len(groups)), write_jobs=write_jobs,
+                                  profiler=profiler, display_names=display_names,
+                                  word_limit=word_limit, table=table)
 
-    print(f"Scanning for files with extensions {file_extensions} in '{input_path}'...")
-    all_files = get_files_by_extensions(input_path, file_extensions, max_files)
-    
-    # Remove already processed files if resuming
-    if resume and files_processed:
-        all_files = [f for f in all_files if str(f) not in files_processed]
+    if input_path is not None:
+        print(f"Scanning for files with extensions {file_extensions} in '{input_path}'...")
+    with profiler.phase("scan") as stats:
+        if input_path is not None:
+            table = scan_table(input_path, file_extensions, recursive, include, exclude, output_path)
+        else:
+            table = FileTable.from_entries(collect_files(input_files, file_extensions))
+        if max_files is not None and max_files > 0:
+            table = table.select(range(min(max_files, len(table))))
+            print(f"Limited to {max_files} files, returning {len(table)}")
+        
+        # Remove already processed files if resuming
+        if resume and files_processed:
+            table = table.select(row for row in range(len(table)) if table.path_str(row) not in files_processed)
+        stats.files = len(table)
     
-    if not all_files:
-        print(f"No matching files found in the input directory.")
-        return
+    if not len(table):
+        print(f"No matching files found in the input {'directory' if input_path is not None else 'files'}.")
+        return []
+
+    workers = min(resolve_jobs(jobs), len(table))
+    if workers > 1:
+        print(f"Found {len(table)} files. Counting words with {workers} {executor} workers...")
+    else:
+        print(f"Found {len(table)} files. Counting words...")
+    cache, content_store = _open_count_stores(output_path, json_path, use_cache, clear_cache,
+                                              0 if dry_run else content_budget, workers, executor, word_limit)
+    if profiler.enabled:
+        # JSON files are counted in a phase of their own, so the time spent
+        # parsing JSON is reported separately from plain text counting
+        is_json = [file_extension(name) == "json" for name in table.names]
+        batches = [("count", [i for i, flag in enumerate(is_json) if not flag]),
+                   ("json", [i for i, flag in enumerate(is_json) if flag])]
+    else:
+        batches = [("count", range(len(table)))]
+    try:
+        for phase, indices in batches:
+            if not indices:
+                continue
+            with profiler.phase(phase) as stats, _count_pool(workers, executor) as pool:
+                # Paths are created as the files are counted, not all at once
+                batch_counts = count_words_with_cache(ColumnView(len(indices), lambda i: table.path(indices[i])),
+                                                      cache, json_path,
+                                                      jobs=min(workers, len(indices)), executor=executor,
+                                                      content_store=content_store,
+                                                      fingerprints=ColumnView(len(indices), lambda i: (
+                                                          table.sizes[indices[i]], table.mtimes[indices[i]])),
+                                                      engine=count_engine, pool=pool)
+                for i, count in zip(indices, batch_counts):
+                    table.words[i] = count
+                stats.files = len(indices)
+                stats.bytes_read = sum(table.sizes[i] for i in indices)
+    finally:
+        if cache is not None:
+            cache.close()
+    cache_message = cache.stats_message() if cache is not None else None
+    return _group_and_write(output_path, table, settings, source_limit, word_limit, packing, dry_run,
+                            incremental, json_path, content_store, cache_message, profiler,
+                            display_names, write_jobs, zip_path, groups_processed, files_processed)
 
-    print(f"Found {len(all_files)} files. Counting words...")
-    files_with_counts = []
-    total_words = 0
-    for f in all_files:
-        count = count_words_in_file(f, json_path)
-        files_with_counts.append((f, count))
-        total_words += count
+def _group_and_write(output_path: Path, table: FileTable, settings: Dict, source_limit: int,
+                     word_limit: int, packing: str, dry_run: bool, incremental: bool,
+                     json_path: Optional[JsonPath], content_store: Optional[ContentStore],
+                     cache_message: Optional[str], profiler: PhaseProfiler,
+                     display_names: Optional[Dict[str, str]], write_jobs: int,
+                     zip_path: Optional[str], groups_processed: int = 0,
+                     files_processed: Optional[Set[str]] = None) -> List[str]:
+    """
+    Group counted files and write their sources (the second half of process_directory).
+    
+    Args:
+        table: Scanned files with their word counts
+        cache_message: Word count cache statistics to print, if a cache was used
+        groups_processed: Sources written by the interrupted run being resumed
+        files_processed: Input files of those sources
+        (other arguments as in process_directory)
+        
+    Returns:
+        Names of the output sources written
+    """
+    total_words = table.total_words()
 
     print(f"Total words across all files: {total_words}")
-    print(f"Grouping files with a source limit of {source_limit} and word limit of {WORD_LIMIT} per source...")
+    print(f"Grouping files with a source limit of {source_limit} and word limit of {word_limit} per source...")
 
-    groups, ungrouped = group_files(files_with_counts, source_limit)
+    manifest = _load_compatible_manifest(output_path, json_path, source_limit, word_limit) if incremental else None
+    status: Optional[Dict[int, str]] = None  # Incremental status of each source number
+    fingerprints = None  # Only incremental runs need them by path
+    with profiler.phase("group") as stats:
+        if manifest is not None:
+            fingerprints = {table.path_str(row): (table.sizes[row], table.mtimes[row]) for row in range(len(table))}
+            sources, ungrouped, status = plan_incremental_groups(manifest, table.pairs(),
+                                                                 fingerprints, source_limit, word_limit)
+            numbers = sorted(sources)
+            groups = [sources[number] for number in numbers]
+        else:
+            pack_files(table, source_limit, packing, word_limit)
+            groups, ungrouped = table.group_view(), table.ungrouped_view()
+            numbers = list(range(1, len(groups) + 1))
+        stats.files = len(table)
 
     if not groups:
         print("No groups could be formed. Check file sizes and limits.")
-        return
+        if content_store is not None:
+            content_store.close()
+        return []
 
     print(f"Created {len(groups)} groups.")
+    if status is not None:
+        # Sources whose output file has gone missing are written again
+        for number in numbers:
+            if status[number] == "untouched" and not (output_path / _source_filename(number)).exists():
+                status[number] = "changed"
+        print(_incremental_report(status))
+    if content_store is not None:
+        # The contents of files that are not written are not needed
+        for file_path, _ in ungrouped:
+            content_store.discard(file_path)
+        if status is not None:
+            for number, group in zip(numbers, groups):
+                if status[number] == "untouched":
+                    for file_path, _ in group:
+                        content_store.discard(file_path)
     
     if dry_run:
-        print("\n--- DRY RUN MODE: No files will be created ---")
-        print(f"Would create {len(groups)} output files with the following content:")
-        
-        for i, group in enumerate(groups):
-            group_total_words = sum(count for _, count in group)
-            efficiency = (group_total_words / WORD_LIMIT) * 100
-            print(f"  Group {i+1}: {len(group)} files, {group_total_words} words ({efficiency:.1f}% of limit)")
-            
-            # Option to show detailed file list in dry run
-            for j, (file_path, word_count) in enumerate(group[:5]):  # Show first 5 files
-                print(f"    - {file_path.name} ({word_count} words)")
-            if len(group) > 5:
-                print(f"    - ... and {len(group) - 5} more files")
+        _print_dry_run(groups, numbers, word_limit, display_names)
         
         # Generate summary report even in dry run mode
-        generate_summary_report(output_path, groups, ungrouped, 
-                              len(files_with_counts), total_words)
-        return
-
-    print(f"Concatenating files into '{output_path}'...")
+        with profiler.phase("report") as stats:
+            generate_summary_report(output_path, groups, ungrouped, 
+                                  len(table), total_words, numbers, display_names, word_limit)
+            stats.bytes_written = _file_size(output_path / "notebook_cat_summary.txt")
+        if cache_message:
+            print(cache_message)
+        _save_profile(profiler, output_path)
+        return []
 
-    # Skip already processed groups if resuming
-    if groups_processed > 0:
-        groups = groups[groups_processed:]
+    if status is not None:
+        return _write_sources(output_path, groups, numbers, ungrouped, len(table), total_words,
+                              fingerprints, json_path, status=status, content_store=content_store,
+                              write_jobs=write_jobs, cache_message=cache_message, profiler=profiler,
+                              display_names=display_names, word_limit=word_limit)
+    elif groups_processed or files_processed:
+        # Resuming without a saved plan: the remaining files were grouped
+        # again, so their groups are numbered after the written ones
+        numbers = [groups_processed + number for number in numbers]
+        return _write_sources(output_path, groups, numbers, ungrouped, len(table), total_words,
+                              None, json_path, complete=False, content_store=content_store,
+                              write_jobs=write_jobs, cache_message=cache_message, profiler=profiler,
+                              display_names=display_names, word_limit=word_limit, table=table)
+    elif zip_path is not None:
+        return _write_sources(output_path, groups, numbers, ungrouped, len(table), total_words,
+                              None, json_path, complete=False, content_store=content_store,
+                              cache_message=cache_message, profiler=profiler, zip_path=Path(zip_path),
+                              display_names=display_names, word_limit=word_limit, table=table)
+    else:
+        plan = ResumePlan(settings, [[PlannedFile(*record) for record in table.records(table.group_rows(index))]
+                                     for index in range(len(groups))],
+                          [(path, words) for path, words, _, _ in table.records(table.ungrouped_rows())],
+                          len(table), total_words)
+        return _write_sources(output_path, groups, numbers, ungrouped, len(table), total_words,
+                              None, json_path, plan=plan, content_store=content_store,
+                              write_jobs=write_jobs, cache_message=cache_message, profiler=profiler,
+                              display_names=display_names, word_limit=word_limit, table=table)
 
-    processed_file_paths = set(files_processed)  # Copy the set
+def process_files(input_files: Sequence[InputFile], output_dir: str, **options) -> List[str]:
+    """
+    Process an explicit list of files instead of the files of a directory.
     
-    for i, group in enumerate(groups, start=groups_processed + 1):
-        output_filename = f"notebooklm_source_{i}.txt"
-        output_filepath = output_path / output_filename
-        group_total_words = sum(count for _, count in group)
-        print(f"  Creating {output_filename} from {len(group)} files (Total words: {group_total_words})...")
-        concatenate_files(group, output_filepath)
-        
-        # Update resume state after each group
-        for file_path, _ in group:
-            processed_file_paths.add(str(file_path))
-        save_resume_state(output_path, i, processed_file_paths)
-
-    # Remove resume file when complete
-    resume_file = output_path / RESUME_MARKER_FILE
-    if resume_file.exists():
-        try:
-            resume_file.unlink()
-        except Exception:
-            pass  # Ignore errors in cleanup
-
-    print("\nProcessing complete.")
-    print(f"  {len(groups) + groups_processed} source files created in '{output_path}'.")
-    if ungrouped:
-        print(f"  {len(ungrouped)} files could not be grouped due to limits.")
-        print("  See summary report for details.")
+    The files are read where they are, e.g. uploads in the temporary files of
+    a web server, so they need not be copied into an input directory first.
     
-    # Generate summary report
-    generate_summary_report(output_path, groups, ungrouped, 
-                          len(files_with_counts), total_words)
+    Args:
+        input_files: Paths, or (path, display name) pairs; the display name is
+            shown in place of the file name in the sources and summary report
+        output_dir: Output directory for concatenated files
+        **options: Options of process_directory (recursive, include and exclude
+            do not apply)
+        
+    Returns:
+        Names of the output sources written
+    """
+    return process_directory(None, output_dir, input_files=input_files, **options)
@@ -0,0 +1,299 @@
+"""
+Compact store of per-file records for notebook-cat.
+
+A list of (Path, word count) tuples costs several hundred bytes per file: a
+Path object with its cached string and parts, a tuple and an int. FileTable
+instead keeps the records in columns. Each path is split into its directory,
+stored once in a table of interned directory strings, and its file name;
+word counts, sizes, modification times and group ids are machine integers
+in ``array('q')`` columns. Sorting and packing work on row indices and the
+integer columns, and Path objects are only created for the files being
+counted or written at the time.
+
+The functions of core.py keep accepting and returning lists of tuples;
+from_pairs, pairs and the group views convert between the two.
+"""
+
+import os
+from array import array
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Group id of files that are not placed in a group
+UNGROUPED = -1  # Exceeds the word or source limit, listed in the summary report
+SKIPPED = -2  # Empty or unreadable
+
+
+def path_sort_key(path: str) -> str:
+    """
+    Key that orders path strings like Path objects, component by component.
+
+    The separator is replaced by a character that sorts before every other,
+    so "a/b" sorts before "a-b" as it does for Path("a/b") < Path("a-b").
+    """
+    return os.path.normcase(path).replace(os.sep, "\x00")
+
+
+class ColumnView(Sequence[T]):
+    """Read-only sequence that creates its items from a table when they are accessed."""
+
+    def __init__(self, length: int, item: Callable[[int], T]):
+        self._length = length
+        self._item = item
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._item(i) for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("index out of range")
+        return self._item(index)
+
+
+class GroupView:
+    """
+    Read-only sequence of file groups, each loaded as a list of (path, word
+    count) tuples when it is accessed, e.g. from a FileTable or a spill.
+    """
+
+    def __init__(self, load_group: Callable[[int], List[Tuple[Path, int]]], count: int, start: int = 0,
+                 load_names: Optional[Callable[[int], List[Tuple[str, str, int]]]] = None):
+        """
+        Create a view of groups.
+
+        Args:
+            load_group: Returns the files of a group, by group index
+            count: Number of groups
+            start: Index of the first group in the view
+            load_names: Returns (path, file name, word count) of the files of
+                a group, for reports that need no Path objects
+        """
+        self._load_group = load_group
+        self._load_names = load_names
+        self._start = start
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._count)
+            if step != 1:
+                raise ValueError("Group views can only be sliced with a step of 1")
+            return GroupView(self._load_group, max(0, stop - start), self._start + start, self._load_names)
+        return self._load_group(self._absolute(index))
+
+    def _absolute(self, index: int) -> int:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("group index out of range")
+        return self._start + index
+
+    def names(self, index: int) -> List[Tuple[str, str, int]]:
+        """Return (path, file name, word count) of the files of a group."""
+        if self._load_names is None:
+            return [(str(file_path), file_path.name, count) for file_path, count in self[index]]
+        return self._load_names(self._absolute(index))
+
+    def __iter__(self) -> Iterator[List[Tuple[Path, int]]]:
+        for index in range(self._count):
+            yield self[index]
+
+
+class FileTable:
+    """Columns of per-file records: path, size, modification time, word count and group."""
+
+    def __init__(self):
+        self._directories: List[str] = []  # Interned directory prefixes, with their trailing separator
+        self._directory_ids: Dict[str, int] = {}
+        self.directory = array('q')
+        self.names: List[str] = []
+        self.sizes = array('q')
+        self.mtimes = array('q')
+        self.words = array('q')
+        self.groups = array('q')
+        self._members: List[array] = []  # Rows of each group, in packing order
+        self._ungrouped = array('q')  # Rows that could not be grouped, in packing order
+
+    @classmethod
+    def from_entries(cls, entries: Iterable) -> "FileTable":
+        """
+        Build a table of scanned files.
+
+        Args:
+            entries: Files with path, size and mtime_ns attributes (FileEntry)
+        """
+        table = cls()
+        table.extend((entry.path, entry.size, entry.mtime_ns, 0) for entry in entries)
+        return table
+
+    @classmethod
+    def from_pairs(cls, files_with_counts: Iterable[Tuple[Path, int]]) -> "FileTable":
+        """
+        Build a table from (path, word count) tuples.
+
+        Args:
+            files_with_counts: Files with their word counts; sizes and
+                modification times are left at 0
+        """
+        table = cls()
+        table.extend((file_path, 0, 0, word_count) for file_path, word_count in files_with_counts)
+        return table
+
+    def add(self, path, size: int = 0, mtime_ns: int = 0, words: int = 0):
+        """Append a file record."""
+        self.extend([(path, size, mtime_ns, words)])
+
+    def extend(self, records: Iterable[Tuple[object, int, int, int]]):
+        """
+        Append file records.
+
+        Args:
+            records: (path, size, mtime_ns, word count) of each file
+        """
+        # Local names keep the loop fast for millions of files
+        directory_ids, directories = self._directory_ids, self._directories
+        add_directory, add_name = self.directory.append, self.names.append
+        add_size, add_mtime, add_words = self.sizes.append, self.mtimes.append, self.words.append
+        separator = os.sep
+        added = 0
+        for path, size, mtime_ns, words in records:
+            head, found, name = str(path).rpartition(separator)
+            prefix = head + found
+            directory_id = directory_ids.get(prefix)
+            if directory_id is None:
+                directory_id = directory_ids[prefix] = len(directories)
+                directories.append(prefix)
+            add_directory(directory_id)
+            add_name(name)
+            add_size(size)
+            add_mtime(mtime_ns)
+            add_words(words)
+            added += 1
+        self.groups.extend(array('q', [UNGROUPED]) * added)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def path_str(self, row: int) -> str:
+        return self._directories[self.directory[row]] + self.names[row]
+
+    def path(self, row: int) -> Path:
+        return Path(self.path_str(row))
+
+    @property
+    def paths(self) -> ColumnView[Path]:
+        """Paths of all files, created as they are accessed."""
+        return ColumnView(len(self), self.path)
+
+    @property
+    def fingerprints(self) -> ColumnView[Tuple[int, int]]:
+        """(size, mtime_ns) of all files, as used by the word count cache."""
+        return ColumnView(len(self), lambda row: (self.sizes[row], self.mtimes[row]))
+
+    def pairs(self, rows: Optional[Iterable[int]] = None) -> List[Tuple[Path, int]]:
+        """Return (path, word count) tuples of the given rows (default: all rows)."""
+        if rows is None:
+            rows = range(len(self))
+        return [(self.path(row), self.words[row]) for row in rows]
+
+    def select(self, rows: Iterable[int]) -> "FileTable":
+        """
+        Return a table of the given rows, in the given order.
+
+        The directory table is shared with this table.
+        """
+        table = FileTable()
+        table._directories = self._directories
+        table._directory_ids = self._directory_ids
+        for row in rows:
+            table.directory.append(self.directory[row])
+            table.names.append(self.names[row])
+            table.sizes.append(self.sizes[row])
+            table.mtimes.append(self.mtimes[row])
+            table.words.append(self.words[row])
+            table.groups.append(self.groups[row])
+        return table
+
+    def sorted_by_path(self) -> "FileTable":
+        """Return the table sorted by path, like a sorted list of Path objects."""
+        return self.select(sorted(range(len(self)), key=lambda row: path_sort_key(self.path_str(row))))
+
+    def set_words(self, counts: Iterable[int]):
+        """Set the word count column, one count per row."""
+        self.words = array('q', counts)
+        if len(self.words) != len(self):
+            raise ValueError("Expected one word count per file")
+
+    def total_words(self) -> int:
+        return sum(self.words)
+
+    def rows_by_words(self) -> List[int]:
+        """Rows sorted by word count, largest first; rows with equal counts keep their order."""
+        return sorted(range(len(self)), key=self.words.__getitem__, reverse=True)
+
+    def set_groups(self, assignment: Iterable[Tuple[int, int]]):
+        """
+        Record the grouping of the files.
+
+        Args:
+            assignment: (row, group id) pairs in packing order; the group id is
+                UNGROUPED or SKIPPED for files not placed in a group. Rows
+                that are not listed are skipped.
+        """
+        self.groups = array('q', [SKIPPED]) * len(self)
+        self._members = []
+        self._ungrouped = array('q')
+        for row, group in assignment:
+            self.groups[row] = group
+            if group >= 0:
+                while group >= len(self._members):
+                    self._members.append(array('q'))
+                self._members[group].append(row)
+            elif group == UNGROUPED:
+                self._ungrouped.append(row)
+
+    def group_count(self) -> int:
+        return len(self._members)
+
+    def group_rows(self, group: int) -> array:
+        """Rows of a group, in packing order."""
+        return self._members[group]
+
+    def group(self, group: int) -> List[Tuple[Path, int]]:
+        """Return the files of a group as (path, word count) tuples."""
+        return self.pairs(self._members[group])
+
+    def group_names(self, group: int) -> List[Tuple[str, str, int]]:
+        """Return (path, file name, word count) of the files of a group."""
+        return [(self.path_str(row), self.names[row], self.words[row]) for row in self._members[group]]
+
+    def group_view(self) -> GroupView:
+        """Return the groups as a sequence of lists of (path, word count) tuples."""
+        return GroupView(self.group, self.group_count(), load_names=self.group_names)
+
+    def group_totals(self) -> List[Tuple[int, int, int]]:
+        """Return the (file count, word count, bytes) of every group."""
+        return [(len(rows), sum(self.words[row] for row in rows), sum(self.sizes[row] for row in rows))
+                for rows in self._members]
+
+    def records(self, rows: Iterable[int]) -> List[Tuple[str, int, int, int]]:
+        """Return (path, word count, size, mtime_ns) of the given rows."""
+        return [(self.path_str(row), self.words[row], self.sizes[row], self.mtimes[row]) for row in rows]
+
+    def ungrouped_rows(self) -> array:
+        """Rows of the files that could not be grouped, in packing order."""
+        return self._ungrouped
+
+    def ungrouped_view(self) -> ColumnView[Tuple[Path, int]]:
+        """Files that could not be grouped, as (path, word count) tuples."""
+        return ColumnView(len(self._ungrouped), lambda i: (self.path(self._ungrouped[i]),
+                                                           self.words[self._ungrouped[i]]))
@@ -0,0 +1,154 @@
+"""
+Compiled JSON path expressions for notebook-cat.
+
+A JSON path selects the text to extract from JSON files using dot notation,
+for example ``segments.0.text``. Expressions are parsed once per run into a
+JsonPath object, which is shared by every file and can be sent to worker
+processes.
+
+Syntax:
+
+- ``key`` selects a field of an object, ``0`` an item of a list (or a field
+  named "0" of an object)
+- ``*`` selects every field of an object or every item of a list
+- A key applied to a list is applied to each item, so ``segments.text`` and
+  ``segments.*.text`` select the same values
+- Alternatives are separated by commas, e.g. ``transcript,segments.*.text``;
+  the first alternative that matches anything in a document is used
+"""
+
+from typing import Any, Iterator, List, Optional, Sequence, Tuple, Union
+
+# Step that matches every field of an object or item of a list
+WILDCARD = "*"
+
+_KEY_PUNCTUATION = "_-"
+
+
+def _is_valid_step(step: str) -> bool:
+    """Keys may contain letters, digits, underscores and hyphens."""
+    if step == WILDCARD:
+        return True
+    return bool(step) and all(c.isalnum() or c in _KEY_PUNCTUATION for c in step)
+
+
+class JsonPath:
+    """
+    A parsed JSON path expression.
+
+    Attributes:
+        expression: Normalised text of the expression
+        alternatives: Tuple of alternatives, each a tuple of steps
+    """
+
+    __slots__ = ("expression", "alternatives")
+
+    def __init__(self, expression: str):
+        """
+        Parse a JSON path expression.
+
+        Args:
+            expression: Dot-notation path, optionally with wildcards and
+                comma-separated alternatives
+
+        Raises:
+            ValueError: If the expression is empty or malformed
+        """
+        if not expression or not expression.strip():
+            raise ValueError("Empty JSON path")
+        alternatives = []
+        for alternative in expression.split(','):
+            steps = tuple(alternative.strip().split('.'))
+            # Validate JSON path to prevent traversal vulnerabilities
+            if not all(_is_valid_step(step) for step in steps):
+                raise ValueError(f"Invalid JSON path format: {expression}")
+            alternatives.append(steps)
+        self.alternatives: Tuple[Tuple[str, ...], ...] = tuple(alternatives)
+        self.expression = ",".join(".".join(steps) for steps in self.alternatives)
+
+    @classmethod
+    def compile(cls, json_path: Optional[Union[str, "JsonPath"]]) -> Optional["JsonPath"]:
+        """
+        Get a JsonPath for an expression, reusing an already compiled one.
+
+        Args:
+            json_path: Expression, JsonPath or None
+
+        Returns:
+            The compiled path, or None if no path is given
+
+        Raises:
+            ValueError: If the expression is malformed
+        """
+        if json_path is None or isinstance(json_path, JsonPath):
+            return json_path
+        if not json_path:
+            return None
+        return cls(json_path)
+
+    def __getstate__(self):
+        return self.expression, self.alternatives
+
+    def __setstate__(self, state):
+        self.expression, self.alternatives = state
+
+    def __str__(self) -> str:
+        return self.expression
+
+    def __repr__(self) -> str:
+        return f"JsonPath({self.expression!r})"
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, JsonPath):
+            return self.alternatives == other.alternatives
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.alternatives)
+
+    def find(self, data: Any) -> List[Any]:
+        """
+        Find the values selected by the path in parsed JSON data.
+
+        Args:
+            data: Parsed JSON data
+
+        Returns:
+            Matching values in document order, from the first alternative
+            that matches anything (empty if none does)
+        """
+        for steps in self.alternatives:
+            matches = list(_iter_matches(data, steps))
+            if matches:
+                return matches
+        return []
+
+
+def _iter_matches(value: Any, steps: Sequence[str]) -> Iterator[Any]:
+    """Yield the values selected by a sequence of steps, in document order."""
+    if not steps:
+        yield value
+        return
+    step, rest = steps[0], steps[1:]
+    if isinstance(value, dict):
+        if step == WILDCARD:
+            for item in value.values():
+                yield from _iter_matches(item, rest)
+        elif step in value:
+            yield from _iter_matches(value[step], rest)
+    elif isinstance(value, list):
+        if step == WILDCARD:
+            for item in value:
+                yield from _iter_matches(item, rest)
+        elif step.isdecimal():
+            index = int(step)
+            if index < len(value):
+                yield from _iter_matches(value[index], rest)
+        else:
+            # A key applied to a list is applied to each of its items
+            for item in value:
+                yield from _iter_matches(item, steps)
+
+
+# A JSON path given either as an expression or already compiled
+JsonPathLike = Union[str, JsonPath]
@@ -0,0 +1,487 @@
+"""
+Incremental JSON text extraction for notebook-cat.
+
+Large JSON files are not loaded with ``json.load``. Instead they are read as
+a stream of parse events, and only the text values selected by a JSON path
+(or the default text fields) are materialised, so memory use is proportional
+to the largest single text value rather than to the whole document.
+
+The extracted text is identical to what the in-memory extraction in
+``core.extract_text_from_json`` produces for the same document.
+"""
+
+import json
+import re
+from json.decoder import scanstring
+from typing import Any, Callable, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from .jsonpath import JsonPath, WILDCARD
+
+# A parse event: (kind, value). Kinds are 'start_map', 'map_key', 'end_map',
+# 'start_array', 'end_array' and 'value' (for strings, numbers, booleans and null).
+Event = Tuple[str, Any]
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_NUMBER = re.compile(r'(-?(?:0|[1-9]\d*))(\.\d+)?([eE][-+]?\d+)?')
+_CONSTANTS = (
+    ('true', True),
+    ('false', False),
+    ('null', None),
+    ('NaN', float('nan')),
+    ('Infinity', float('inf')),
+    ('-Infinity', float('-inf')),
+)
+_LONGEST_CONSTANT = max(len(name) for name, _ in _CONSTANTS)
+
+# Parser states
+_VALUE, _FIRST_VALUE, _KEY, _FIRST_KEY, _AFTER_VALUE, _DONE = range(6)
+
+# Separator placed between extracted text values, as in the in-memory extraction
+TEXT_SEPARATOR = "\n\n"
+
+
+class _Buffer:
+    """Sliding window over a text stream."""
+
+    def __init__(self, stream: TextIO, chunk_size: int):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def more(self) -> bool:
+        """Read the next block, dropping consumed text. Returns False at end of stream."""
+        if self.eof:
+            return False
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.text = self.text[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ('' at end of stream)."""
+        while True:
+            self.pos = _WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.more():
+                return ""
+
+    def ensure(self, size: int):
+        """Make sure at least ``size`` characters are buffered, unless the stream ends first."""
+        while len(self.text) - self.pos < size and self.more():
+            pass
+
+    def read_string(self) -> str:
+        """Read a string literal starting at the current position (an opening quote)."""
+        start = self.pos + 1
+        search = start
+        while True:
+            end = self.text.find('"', search)
+            if end == -1:
+                consumed = self.pos
+                search = len(self.text)
+                if not self.more():
+                    raise ValueError("Unterminated string in JSON data")
+                # Reading more drops the consumed part of the buffer
+                start -= consumed
+                search -= consumed
+                continue
+            # The quote ends the string unless it is escaped by an odd number of backslashes
+            backslash = end - 1
+            while backslash >= start and self.text[backslash] == '\\':
+                backslash -= 1
+            if (end - 1 - backslash) % 2 == 0:
+                break
+            search = end + 1
+        value, self.pos = scanstring(self.text, start)
+        return value
+
+    def read_number(self):
+        """Read a number (or a named constant) at the current position."""
+        # A sign needs the following digit to be recognised
+        self.ensure(2)
+        while True:
+            match = _NUMBER.match(self.text, self.pos)
+            # The number may continue in the next block, possibly after a
+            # partial fraction or exponent such as "1." or "1e+"
+            if match is not None and len(self.text) - match.end() <= 2 and self.more():
+                continue
+            break
+        if match is None:
+            return self.read_constant()
+        integer, fraction, exponent = match.groups()
+        self.pos = match.end()
+        if fraction or exponent:
+            return float(integer + (fraction or '') + (exponent or ''))
+        return int(integer)
+
+    def read_constant(self):
+        """Read true, false, null, NaN, Infinity or -Infinity."""
+        self.ensure(_LONGEST_CONSTANT)
+        for name, value in _CONSTANTS:
+            if self.text.startswith(name, self.pos):
+                self.pos += len(name)
+                return value
+        raise ValueError(f"Expecting value in JSON data near {self.text[self.pos:self.pos + 20]!r}")
+
+
+def iter_json_events(stream: TextIO, chunk_size: int = 1024 * 1024) -> Iterator[Event]:
+    """
+    Parse a JSON document incrementally, yielding parse events.
+
+    Only the current block and the value being parsed are held in memory.
+    Invalid documents raise ValueError, like ``json.load`` would.
+
+    Args:
+        stream: Text stream containing one JSON document
+        chunk_size: Number of characters to read per block
+
+    Yields:
+        (kind, value) parse events
+    """
+    buffer = _Buffer(stream, chunk_size)
+    stack: List[bool] = []  # True for objects, False for arrays
+    state = _VALUE
+    while True:
+        char = buffer.peek()
+        if state == _DONE:
+            if char:
+                raise ValueError("Extra data after JSON document")
+            return
+        if not char:
+            raise ValueError("Unexpected end of JSON data")
+
+        if state == _AFTER_VALUE:
+            if char == ',':
+                buffer.pos += 1
+                state = _KEY if stack[-1] else _VALUE
+                continue
+            if char != ('}' if stack[-1] else ']'):
+                raise ValueError(f"Expecting ',' delimiter in JSON data, found {char!r}")
+        elif state == _FIRST_KEY and char == '}' or state == _FIRST_VALUE and char == ']':
+            pass
+        elif state in (_KEY, _FIRST_KEY):
+            if char != '"':
+                raise ValueError(f"Expecting property name in JSON data, found {char!r}")
+            key = buffer.read_string()
+            if buffer.peek() != ':':
+                raise ValueError("Expecting ':' delimiter in JSON data")
+            buffer.pos += 1
+            yield ('map_key', key)
+            state = _VALUE
+            continue
+        elif char == '{':
+            buffer.pos += 1
+            stack.append(True)
+            yield ('start_map', None)
+            state = _FIRST_KEY
+            continue
+        elif char == '[':
+            buffer.pos += 1
+            stack.append(False)
+            yield ('start_array', None)
+            state = _FIRST_VALUE
+            continue
+        else:
+            if char == '"':
+                value = buffer.read_string()
+            elif char == '-' or '0' <= char <= '9':
+                value = buffer.read_number()
+            else:
+                value = buffer.read_constant()
+            yield ('value', value)
+            state = _AFTER_VALUE if stack else _DONE
+            continue
+
+        # Closing an object or array
+        buffer.pos += 1
+        yield ('end_map', None) if stack.pop() else ('end_array', None)
+        state = _AFTER_VALUE if stack else _DONE
+
+
+def _skip_value(events: Iterator[Event], event: Event):
+    """Consume the rest of a value whose first event has been read."""
+    if event[0] not in ('start_map', 'start_array'):
+        return
+    depth = 1
+    for kind, _ in events:
+        if kind in ('start_map', 'start_array'):
+            depth += 1
+        elif kind in ('end_map', 'end_array'):
+            depth -= 1
+            if depth == 0:
+                return
+
+
+def _iter_dump(events: Iterator[Event], event: Event, level: int = 0) -> Iterator[str]:
+    """Yield the pieces of ``json.dumps(value, indent=2)`` for a value being parsed."""
+    kind, value = event
+    if kind == 'value':
+        yield json.dumps(value)
+        return
+    is_map = kind == 'start_map'
+    end_kind = 'end_map' if is_map else 'end_array'
+    inner_indent = "\n" + "  " * (level + 1)
+    first = True
+    for item_event in events:
+        if item_event[0] == end_kind:
+            break
+        yield (("{" if is_map else "[") + inner_indent) if first else ("," + inner_indent)
+        first = False
+        if is_map:
+            yield json.dumps(item_event[1]) + ": "
+            item_event = next(events)
+        yield from _iter_dump(events, item_event, level + 1)
+    if first:
+        yield "{}" if is_map else "[]"
+    else:
+        yield "\n" + "  " * level + ("}" if is_map else "]")
+
+
+def _navigate(events: Iterator[Event], key: str) -> Optional[Event]:
+    """
+    Move to the value of a key in an object whose 'start_map' event has been read.
+
+    Returns:
+        The first event of the value, or None if the object has no such key
+    """
+    for kind, name in events:
+        if kind == 'end_map':
+            return None
+        event = next(events)
+        if name == key:
+            return event
+        _skip_value(events, event)
+    return None
+
+
+def _iter_matches(events: Iterator[Event], event: Event, steps: Sequence[str]) -> Iterator[Event]:
+    """
+    Yield the first event of each value selected by the steps of a JSON path.
+
+    Follows the rules of ``jsonpath.JsonPath.find``. The caller must consume
+    each selected value completely before asking for the next one.
+    """
+    if not steps:
+        yield event
+        return
+    step, rest = steps[0], steps[1:]
+    if event[0] == 'start_map':
+        for kind, key in events:
+            if kind == 'end_map':
+                return
+            value_event = next(events)
+            if step == WILDCARD or key == step:
+                yield from _iter_matches(events, value_event, rest)
+            else:
+                _skip_value(events, value_event)
+    elif event[0] == 'start_array':
+        index = int(step) if step.isdecimal() else None
+        position = 0
+        for item in events:
+            if item[0] == 'end_array':
+                return
+            if step == WILDCARD or position == index:
+                yield from _iter_matches(events, item, rest)
+            elif index is None:
+                # A key applied to a list is applied to each of its items
+                yield from _iter_matches(events, item, steps)
+            else:
+                _skip_value(events, item)
+            position += 1
+
+
+def _first_text_field(events: Iterator[Event], text_fields: Sequence[str]) -> Optional[str]:
+    """
+    Read an object (after its 'start_map' event) and return the value of its
+    highest-priority text field that holds a string, if any.
+    """
+    found = {}
+    for kind, key in events:
+        if kind == 'end_map':
+            break
+        event = next(events)
+        if key in text_fields and event[0] == 'value' and isinstance(event[1], str):
+            found.setdefault(key, event[1])
+        else:
+            _skip_value(events, event)
+    for field in text_fields:
+        if field in found:
+            return found[field]
+    return None
+
+
+def _analyse(events: Iterator[Event], event: Event, default: bool,
+             text_fields: Sequence[str]) -> Tuple:
+    """
+    Decide how the text of a value is extracted, consuming the value.
+
+    Returns:
+        A plan tuple understood by ``_emit``
+    """
+    kind = event[0]
+    if kind == 'value':
+        return ('scalar',)
+    if kind == 'start_array':
+        all_strings = True
+        for item in events:
+            if item[0] == 'end_array':
+                break
+            if item[0] != 'value' or not isinstance(item[1], str):
+                all_strings = False
+            _skip_value(events, item)
+        if all_strings:
+            return ('strings',)
+        return ('dump',) if default else ('item_texts',)
+
+    # Object: look for a direct text field, and (for the default extraction)
+    # for the first list of objects that contains text fields
+    direct_fields = set()
+    list_field = None
+    for kind, key in events:
+        if kind == 'end_map':
+            break
+        value_event = next(events)
+        if key in text_fields and value_event[0] == 'value' and isinstance(value_event[1], str):
+            direct_fields.add(key)
+        elif default and value_event[0] == 'start_array':
+            first_item = next(events)
+            has_text = False
+            if first_item[0] == 'start_map':
+                item = first_item
+                while item[0] != 'end_array':
+                    if item[0] == 'start_map':
+                        has_text = _first_text_field(events, text_fields) is not None or has_text
+                    else:
+                        _skip_value(events, item)
+                    item = next(events)
+            else:
+                # Only lists whose first item is an object are considered
+                _skip_value(events, first_item)
+                if first_item[0] != 'end_array':
+                    _skip_value(events, ('start_array', None))
+            if has_text and list_field is None:
+                list_field = key
+            continue
+        _skip_value(events, value_event)
+
+    for field in text_fields:
+        if field in direct_fields:
+            return ('field', field)
+    if list_field is not None:
+        return ('list_field', list_field)
+    return ('dump',)
+
+
+def _iter_item_texts(events: Iterator[Event], text_fields: Sequence[str]) -> Iterator[str]:
+    """Yield the text field of each object in an array (after its 'start_array' event)."""
+    first = True
+    for item in events:
+        if item[0] == 'end_array':
+            return
+        if item[0] != 'start_map':
+            _skip_value(events, item)
+            continue
+        text = _first_text_field(events, text_fields)
+        if text is not None:
+            if not first:
+                yield TEXT_SEPARATOR
+            first = False
+            yield text
+
+
+def _emit(events: Iterator[Event], event: Event, plan: Tuple, default: bool,
+          text_fields: Sequence[str]) -> Iterator[str]:
+    """Yield the extracted text of a value according to a plan from ``_analyse``."""
+    kind = plan[0]
+    if kind == 'scalar':
+        value = event[1]
+        if default:
+            yield json.dumps(value)
+        elif isinstance(value, str):
+            yield value
+        else:
+            yield str(value)
+    elif kind == 'strings':
+        first = True
+        for item in events:
+            if item[0] == 'end_array':
+                return
+            if not first:
+                yield TEXT_SEPARATOR
+            first = False
+            yield item[1]
+    elif kind == 'item_texts':
+        yield from _iter_item_texts(events, text_fields)
+    elif kind == 'dump':
+        yield from _iter_dump(events, event)
+    else:  # 'field' or 'list_field'
+        target = _navigate(events, plan[1])
+        if kind == 'field':
+            yield target[1]
+        else:
+            yield from _iter_item_texts(events, text_fields)
+        # Consume the rest of the object
+        _skip_value(events, ('start_map', None))
+
+
+def iter_json_text(open_stream: Callable[[], TextIO], json_path: Optional[JsonPath],
+                   text_fields: Sequence[str], chunk_size: int = 1024 * 1024) -> Iterator[str]:
+    """
+    Extract text from a JSON document without loading it into memory.
+
+    The document is parsed at least twice: the first pass validates it and
+    decides what to extract from each selected value, the second pass yields
+    the selected text. Each alternative of the JSON path that matches nothing
+    costs one more pass. Joining the yielded pieces gives the same text as
+    the in-memory extraction.
+
+    Args:
+        open_stream: Callable returning a new text stream over the document
+        json_path: Compiled JSON path, or None for the default extraction
+        text_fields: Field names that hold text, in priority order
+        chunk_size: Number of characters to read per block
+
+    Yields:
+        Pieces of the extracted text
+    """
+    default = json_path is None
+    alternatives = json_path.alternatives if json_path is not None else ((),)
+
+    steps: Sequence[str] = ()
+    plans: List[Tuple] = []
+    for steps in alternatives:
+        known_plans = {}
+        with open_stream() as stream:
+            events = iter_json_events(stream, chunk_size)
+            for target in _iter_matches(events, next(events), steps):
+                plan = _analyse(events, target, default, text_fields)
+                plans.append(known_plans.setdefault(plan, plan))
+            # Validate the rest of the document, as json.load would
+            for _ in events:
+                pass
+        if plans:
+            break
+    if not plans:
+        return
+
+    with open_stream() as stream:
+        events = iter_json_events(stream, chunk_size)
+        emitted = False
+        for target, plan in zip(_iter_matches(events, next(events), steps), plans):
+            # Values with no text are left out, so separators only go
+            # between non-empty texts
+            started = False
+            for piece in _emit(events, target, plan, default, text_fields):
+                if not piece:
+                    continue
+                if not started:
+                    if emitted:
+                        yield TEXT_SEPARATOR
+                    started = emitted = True
+                yield piece
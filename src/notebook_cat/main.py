@@ -7,21 +7,41 @@ from pathlib import Path
 # Import from the installed package
 try:
     from notebook_cat import core
+    from notebook_cat.jsonpath import JsonPath
     from notebook_cat.config.defaults import (
         DEFAULT_SOURCE_LIMIT,
         PLUS_SOURCE_LIMIT,
         WORD_LIMIT,
-        SUPPORTED_EXTENSIONS
+        SUPPORTED_EXTENSIONS,
+        DEFAULT_JOBS,
+        COUNT_EXECUTORS,
+        COUNT_ENGINES,
+        DEFAULT_COUNT_ENGINE,
+        PACKING_STRATEGIES,
+        DEFAULT_PACKING,
+        PROFILE_FILE,
+        PROFILE_STATS_FILE,
+        SPILL_FILE
     )
 except ImportError:
     # Fall back to relative import for development
     sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
     from src.notebook_cat import core
+    from src.notebook_cat.jsonpath import JsonPath
     from src.notebook_cat.config.defaults import (
         DEFAULT_SOURCE_LIMIT,
         PLUS_SOURCE_LIMIT,
         WORD_LIMIT,
-        SUPPORTED_EXTENSIONS
+        SUPPORTED_EXTENSIONS,
+        DEFAULT_JOBS,
+        COUNT_EXECUTORS,
+        COUNT_ENGINES,
+        DEFAULT_COUNT_ENGINE,
+        PACKING_STRATEGIES,
+        DEFAULT_PACKING,
+        PROFILE_FILE,
+        PROFILE_STATS_FILE,
+        SPILL_FILE
     )
 
 def main():
@@ -79,13 +99,34 @@ def main():
     file_group.add_argument(
         "--json-path",
         type=str,
-        help="Path to text field in JSON files (dot notation, e.g., 'segments.text')"
+        help="Path to the text in JSON files (dot notation, e.g., 'segments.0.text'). "
+             "'*' matches every field or list item (e.g., 'segments.*.text'); separate "
+             "alternative paths with commas to use the first one that matches"
     )
     file_group.add_argument(
         "--max-files",
         type=int,
         help="Maximum number of input files to process (useful for large directories)"
     )
+    file_group.add_argument(
+        "-r", "--recursive",
+        action="store_true",
+        help="Also process files in subdirectories of the input directory"
+    )
+    file_group.add_argument(
+        "--include",
+        action="append",
+        metavar="GLOB",
+        help="Only process files whose path relative to the input directory matches this glob "
+             "(can be given multiple times, e.g. 'transcripts/*')"
+    )
+    file_group.add_argument(
+        "--exclude",
+        action="append",
+        metavar="GLOB",
+        help="Skip files and directories whose relative path matches this glob "
+             "(can be given multiple times, e.g. 'archive' or '*.draft.md')"
+    )
     
     # Processing options
     proc_group = parser.add_argument_group('Processing Options')
@@ -99,9 +140,114 @@ def main():
         action="store_true",
         help="Resume a previously interrupted operation"
     )
+    proc_group.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help="Number of parallel workers for word counting (0 = one per CPU core)"
+    )
+    proc_group.add_argument(
+        "--executor",
+        choices=COUNT_EXECUTORS,
+        default="process",
+        help="Worker type used with --jobs: 'process' for CPU-bound counting, "
+             "'thread' for I/O-bound storage such as network filesystems"
+    )
+    proc_group.add_argument(
+        "--count-engine",
+        choices=COUNT_ENGINES,
+        default=DEFAULT_COUNT_ENGINE,
+        help="Word counting engine: 'python' splits the decoded text, 'numpy' counts "
+             "memory-mapped text files with NumPy (faster on large files; requires NumPy)"
+    )
+    proc_group.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only rewrite sources whose input files changed since the previous run, "
+             "keeping the others untouched (uses the manifest in the output directory)"
+    )
+    proc_group.add_argument(
+        "--write-jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help="Number of output source files written at the same time (0 = one per CPU core)"
+    )
+    proc_group.add_argument(
+        "--packing",
+        choices=PACKING_STRATEGIES,
+        default=DEFAULT_PACKING,
+        help="How files are packed into sources: 'first-fit' fills sources in order, "
+             "'best-fit' puts each file in the fullest source it fits in, which can need "
+             f"fewer sources (default: {DEFAULT_PACKING})"
+    )
+    proc_group.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Count every file instead of reusing word counts of unchanged files from previous runs"
+    )
+    proc_group.add_argument(
+        "--clear-cache",
+        action="store_true",
+        help="Invalidate the word count cache in the output directory before counting"
+    )
+    proc_group.add_argument(
+        "--content-budget",
+        type=int,
+        default=0,
+        metavar="MB",
+        help="Keep file contents read during counting (up to MB in memory, spilling the rest "
+             "to a temporary file) so each input file is read only once; 0 disables"
+    )
+    proc_group.add_argument(
+        "--memory-budget",
+        type=int,
+        default=0,
+        metavar="MB",
+        help=f"Low-memory mode for millions of files: keep the file records in {SPILL_FILE} in the "
+             f"output directory instead of in memory, using about MB of memory; 0 disables"
+    )
+    proc_group.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Count files while the input directory is still being scanned, instead of "
+             "scanning it completely first (faster on large directories)"
+    )
+    proc_group.add_argument(
+        "--profile",
+        action="store_true",
+        help=f"Report the time, files and bytes of each phase of the run, and save them to "
+             f"{PROFILE_FILE} in the output directory"
+    )
+    proc_group.add_argument(
+        "--cprofile",
+        action="store_true",
+        help=f"With --profile, also save cProfile statistics of the slowest phase to {PROFILE_STATS_FILE}"
+    )
     
     args = parser.parse_args()
     
+    if args.jobs < 0:
+        parser.error("--jobs must be zero or a positive number")
+    if args.incremental and args.resume:
+        parser.error("--incremental cannot be combined with --resume")
+    if args.write_jobs < 0:
+        parser.error("--write-jobs must be zero or a positive number")
+    if args.content_budget < 0:
+        parser.error("--content-budget must be zero or a positive number")
+    if args.memory_budget < 0:
+        parser.error("--memory-budget must be zero or a positive number")
+    if args.memory_budget and (args.incremental or args.content_budget):
+        parser.error("--memory-budget cannot be combined with --incremental or --content-budget")
+    try:
+        core.check_count_engine(args.count_engine)
+    except ValueError as e:
+        parser.error(f"--count-engine: {e}")
+    if args.json_path:
+        try:
+            JsonPath(args.json_path)
+        except ValueError as e:
+            parser.error(f"--json-path: {e}")
+    
     # Parse file extensions
     extensions = set(ext.strip() for ext in args.extensions.split(',') if ext.strip())
     
@@ -117,7 +263,7 @@ def main():
         input_dir = str(Path(args.input_dir).absolute())
         output_dir = str(Path(args.output_dir).absolute())
         
-        core.process_directory(
+        options = dict(
             input_dir=input_dir,
             output_dir=output_dir,
             source_limit=args.limit,
@@ -125,8 +271,31 @@ def main():
             file_extensions=extensions,
             json_path=args.json_path,
             resume=args.resume,
-            max_files=args.max_files
+            max_files=args.max_files,
+            jobs=args.jobs,
+            executor=args.executor,
+            use_cache=not args.no_cache,
+            clear_cache=args.clear_cache,
+            content_budget=args.content_budget * 1024 * 1024,
+            recursive=args.recursive,
+            include=args.include,
+            exclude=args.exclude,
+            packing=args.packing,
+            write_jobs=args.write_jobs,
+            incremental=args.incremental,
+            profile=args.profile or args.cprofile,
+            cprofile=args.cprofile,
+            count_engine=args.count_engine,
+            memory_budget=args.memory_budget * 1024 * 1024
         )
+        if args.pipeline:
+            # Loaded only with --pipeline, to keep startup fast
+            import asyncio
+            from importlib import import_module
+            pipeline = import_module(".pipeline", core.__package__)
+            asyncio.run(pipeline.process_directory_async(**options))
+        else:
+            core.process_directory(**options)
         print("\nSuccessfully finished.")
     except FileNotFoundError as e:
         print(f"\nError: File or directory not found: {e}")
@@ -0,0 +1,86 @@
+"""
+Source manifest for notebook-cat.
+
+After each complete run, a manifest is written next to the output sources. It
+records which input files went into each numbered source, with their size,
+modification time and word count. An incremental run compares the manifest
+with the current inputs so that only sources whose inputs changed need to be
+written (and uploaded to NotebookLM) again.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+# Manifest format version, increased on incompatible changes
+MANIFEST_VERSION = 1
+
+
+class ManifestEntry(NamedTuple):
+    """An input file of a source, as it was when the source was written."""
+    path: str
+    size: int
+    mtime_ns: int
+    words: int
+
+
+class Manifest(NamedTuple):
+    """Contents of the output sources written by a previous run."""
+    word_limit: int
+    json_path: str
+    sources: Dict[int, List[ManifestEntry]]  # Input files by source number
+
+
+def load_manifest(manifest_path: Path) -> Optional[Manifest]:
+    """
+    Load a source manifest.
+
+    Args:
+        manifest_path: Path to the manifest file
+
+    Returns:
+        The manifest, or None if it does not exist or cannot be used
+    """
+    if not manifest_path.exists():
+        return None
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != MANIFEST_VERSION:
+            print(f"Warning: Ignoring manifest with unsupported version: {manifest_path}")
+            return None
+        sources = {
+            int(number): [ManifestEntry(*entry) for entry in entries]
+            for number, entries in data['sources'].items()
+        }
+        return Manifest(data['word_limit'], data.get('json_path', ""), sources)
+    except Exception as e:
+        print(f"Warning: Could not load manifest {manifest_path}: {e}")
+        return None
+
+
+def save_manifest(manifest_path: Path, manifest: Manifest):
+    """
+    Write a source manifest, replacing any previous one atomically.
+
+    Args:
+        manifest_path: Path to the manifest file
+        manifest: Manifest to write
+    """
+    data = {
+        'version': MANIFEST_VERSION,
+        'word_limit': manifest.word_limit,
+        'json_path': manifest.json_path,
+        'sources': {
+            str(number): [list(entry) for entry in entries]
+            for number, entries in sorted(manifest.sources.items())
+        },
+    }
+    partial_path = manifest_path.with_name(manifest_path.name + ".part")
+    try:
+        with open(partial_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(partial_path, manifest_path)
+    except Exception as e:
+        print(f"Warning: Could not save manifest: {e}")
@@ -0,0 +1,159 @@
+"""
+NumPy word counting engine for notebook-cat.
+
+Counting with ``str.split()`` decodes the file and creates a string for every
+word. This engine instead memory-maps the file and counts the words in the
+raw UTF-8 bytes with vectorized NumPy operations: a word starts wherever a
+byte that is not whitespace follows a whitespace byte (or starts the file).
+
+Whitespace is the set of characters for which ``str.isspace()`` is true, so
+the counts are identical to ``len(text.split())``. ASCII whitespace is looked
+up per byte; the few multi-byte whitespace characters (such as U+00A0 and
+U+3000) are located through their lead bytes and all their bytes marked as
+whitespace. Bytes of other multi-byte characters never count as whitespace,
+so a character is never split into several words. Files that are not valid
+UTF-8 raise UnicodeDecodeError, as they do when read as text.
+
+The file is processed in blocks, so the temporary arrays stay small however
+large the file is. NumPy is an optional dependency, imported when this module
+is loaded; use available() to check for it first.
+"""
+
+import codecs
+import mmap
+import os
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+# Bytes processed per block
+BLOCK_SIZE = 16 * 1024 * 1024
+
+# Longest UTF-8 encoding of a whitespace character, in bytes
+_MAX_SEQUENCE = 4
+
+
+def available() -> bool:
+    """Return True if NumPy is installed, so this engine can be used."""
+    return np is not None
+
+
+@lru_cache(maxsize=None)
+def _whitespace_tables() -> Tuple["np.ndarray", int, int, Dict[int, List[bytes]]]:
+    """
+    Whitespace as str.split() sees it, in UTF-8.
+
+    Returns:
+        Tuple of (table of the single-byte whitespace characters, indexed by
+        byte value, highest single-byte whitespace value, lowest value from
+        which every byte up to the highest is whitespace, multi-byte
+        whitespace encodings by lead byte)
+    """
+    ascii_space = np.zeros(256, dtype=bool)
+    for byte in range(0x80):
+        ascii_space[byte] = chr(byte).isspace()
+    highest = int(np.flatnonzero(ascii_space)[-1])
+    dense_from = highest
+    while dense_from > 0 and ascii_space[dense_from - 1]:
+        dense_from -= 1
+    sequences: Dict[int, List[bytes]] = {}
+    for code_point in range(0x80, sys.maxunicode + 1):
+        if chr(code_point).isspace():
+            encoded = chr(code_point).encode('utf-8')
+            sequences.setdefault(encoded[0], []).append(encoded)
+    return ascii_space, highest, dense_from, sequences
+
+
+def _validate_utf8(data: "np.ndarray"):
+    """Raise UnicodeDecodeError if the buffer is not valid UTF-8."""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    for start in range(0, len(data), BLOCK_SIZE):
+        block = data[start:start + BLOCK_SIZE]
+        # ASCII blocks are valid unless they complete a character cut by the previous block
+        if decoder.getstate()[0] or (block >= 0x80).any():
+            decoder.decode(block.tobytes())
+    decoder.decode(b'', final=True)
+
+
+def _whitespace_mask(window: "np.ndarray") -> "np.ndarray":
+    """Return which bytes of a buffer belong to whitespace characters."""
+    ascii_space, highest, dense_from, sequences = _whitespace_tables()
+    # Single-byte whitespace is the space and a few control characters below it.
+    # Comparing is much faster than a table lookup per byte, which is only
+    # needed for the (rare) bytes below the run of whitespace ending at the space
+    space = window <= highest
+    low = np.flatnonzero(window < dense_from)
+    if len(low):
+        space[low] = ascii_space[window[low]]
+    high = np.flatnonzero(window >= 0x80)
+    if len(high) == 0:
+        return space
+    high_bytes = window[high]
+    for lead, encodings in sequences.items():
+        leads = high[high_bytes == lead]
+        if len(leads) == 0:
+            continue
+        for encoded in encodings:
+            matches = leads[leads + len(encoded) <= len(window)]
+            for offset in range(1, len(encoded)):
+                matches = matches[window[matches + offset] == encoded[offset]]
+            for offset in range(len(encoded)):
+                space[matches + offset] = True
+    return space
+
+
+def count_words_in_buffer(data: "np.ndarray", block_size: int = BLOCK_SIZE) -> int:
+    """
+    Count the words in UTF-8 encoded bytes.
+
+    Args:
+        data: Bytes to count, as a uint8 array
+        block_size: Number of bytes processed at a time
+
+    Returns:
+        Word count, equal to ``len(data.tobytes().decode('utf-8').split())``
+    """
+    count = 0
+    previous_space = True  # The start of the data counts as whitespace
+    for start in range(0, len(data), block_size):
+        end = min(len(data), start + block_size)
+        # Widen the window so whitespace characters cut by the block boundary are recognized
+        low = max(0, start - (_MAX_SEQUENCE - 1))
+        window = data[low:min(len(data), end + _MAX_SEQUENCE - 1)]
+        space = _whitespace_mask(window)[start - low:end - low]
+        # A word starts at each non-whitespace byte that follows whitespace
+        count += int(np.count_nonzero(space[:-1] > space[1:]))
+        if previous_space and not space[0]:
+            count += 1
+        previous_space = bool(space[-1])
+    return count
+
+
+def count_words_in_mapped_file(filepath: Path) -> int:
+    """
+    Count the words in a UTF-8 text file by memory-mapping it.
+
+    Args:
+        filepath: Path to the file
+
+    Returns:
+        Word count, identical to counting ``str.split()`` over the decoded text
+
+    Raises:
+        OSError: If the file cannot be read
+        UnicodeDecodeError: If the file is not valid UTF-8
+    """
+    with open(filepath, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return 0  # Empty files cannot be mapped
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    # The mapping is released with the last array that refers to it
+    data = np.frombuffer(mapped, dtype=np.uint8)
+    _validate_utf8(data)
+    return count_words_in_buffer(data)
@@ -0,0 +1,277 @@
+"""
+Bin packing strategies for grouping files into sources.
+
+Each strategy takes item sizes (word counts, already sorted by the caller),
+the capacity of a bin (the word limit of a source) and the maximum number of
+bins (the source limit), and returns the bin index of every item, or -1 for
+items that do not fit in any bin.
+
+- ``first-fit`` places each item in the lowest-numbered bin with room. Bins
+  are indexed by a segment tree of remaining capacities, so each placement
+  takes O(log g) for g bins instead of scanning every bin.
+- ``best-fit`` places each item in the bin with the least remaining room
+  that still fits it. Open bins are indexed by their remaining capacity in a
+  tree of 64-bit masks, so the best bin is found in O(log C / 6) steps for a
+  capacity of C, and bins with the same remaining capacity are kept in a
+  heap, so each placement takes O(log g + log C) however many bins are open.
+  With items in decreasing order it often needs fewer bins than first-fit
+  and leaves fuller sources.
+
+Each strategy is also available as a packer class that places one item at
+a time, for inputs that are streamed rather than held in memory.
+"""
+
+from heapq import heappop, heappush
+from typing import Callable, Dict, List, Optional, Sequence
+
+
+class FirstFitPacker:
+    """
+    Places items one at a time with the first-fit rule.
+
+    Items can be placed as they arrive, e.g. while streaming them from disk,
+    so the sizes need not be held in memory at once.
+    """
+
+    def __init__(self, capacity: int, max_bins: int, loads: Sequence[int] = (),
+                 items: Optional[int] = None):
+        """
+        Create a packer.
+
+        Args:
+            capacity: Capacity of each bin
+            max_bins: Maximum number of bins
+            loads: Current contents of bins that are already open; they are
+                bins 0 to len(loads) - 1 and count towards max_bins
+            items: Number of items that will be placed, if known; it bounds
+                the number of bins that can be opened, and so the memory used
+        """
+        # At most one new bin per item can ever be opened
+        bins = max(len(loads), min(max_bins, len(loads) + items) if items is not None else max_bins)
+        leaves = 1
+        while leaves < bins:
+            leaves *= 2
+        self._leaves = leaves
+
+        # tree[1] is the root; tree[leaves + i] is the remaining capacity of bin i.
+        # Bins that are not opened yet are full, and padding leaves are unusable.
+        tree = [0] * (2 * leaves)
+        for i in range(bins):
+            tree[leaves + i] = capacity - loads[i] if i < len(loads) else capacity
+        for node in range(leaves - 1, 0, -1):
+            tree[node] = max(tree[2 * node], tree[2 * node + 1])
+        if bins == 0:
+            tree[1] = -1  # Not even an empty item can be placed
+        self._tree = tree
+
+    def place(self, size: int) -> int:
+        """
+        Place an item.
+
+        Args:
+            size: Size of the item; must not exceed the capacity
+
+        Returns:
+            Bin index of the item, or -1 if it could not be placed
+        """
+        tree, leaves = self._tree, self._leaves
+        if tree[1] < size:
+            return -1
+        # Descend to the leftmost bin with enough room
+        node = 1
+        while node < leaves:
+            node = 2 * node if tree[2 * node] >= size else 2 * node + 1
+        index = node - leaves
+        tree[node] -= size
+        node //= 2
+        while node:
+            tree[node] = max(tree[2 * node], tree[2 * node + 1])
+            node //= 2
+        return index
+
+
+class _CapacitySet:
+    """
+    Set of integers from 0 to a limit that finds the smallest member at or above a value.
+
+    Members are bits in a tree of 64-bit masks: a bit of a mask is set when
+    the mask it stands for on the level below is not empty. Only non-empty
+    masks are stored, so memory grows with the number of members, not the
+    limit. Every operation visits at most one mask per level.
+    """
+
+    def __init__(self, limit: int):
+        """
+        Create an empty set.
+
+        Args:
+            limit: Largest value that can be added
+        """
+        # The top level has a single mask
+        self._levels: List[Dict[int, int]] = [{}]
+        while limit >> (6 * len(self._levels)):
+            self._levels.append({})
+
+    def add(self, value: int):
+        """Add a value that is not in the set."""
+        for level in self._levels:
+            word = value >> 6
+            bits = level.get(word, 0)
+            level[word] = bits | (1 << (value & 63))
+            if bits:
+                # The levels above already mark this mask
+                return
+            value = word
+
+    def remove(self, value: int):
+        """Remove a value that is in the set."""
+        for level in self._levels:
+            word = value >> 6
+            bits = level[word] & ~(1 << (value & 63))
+            if bits:
+                level[word] = bits
+                return
+            del level[word]
+            value = word
+
+    def successor(self, value: int) -> Optional[int]:
+        """Return the smallest member that is at least value, or None."""
+        levels = self._levels
+        depth = 0
+        # Climb until a mask has a member at or after the position of value
+        while True:
+            if depth == len(levels):
+                return None
+            bit = value & 63
+            bits = levels[depth].get(value >> 6, 0) >> bit << bit
+            if bits:
+                value = (value >> 6 << 6) | ((bits & -bits).bit_length() - 1)
+                break
+            value = (value >> 6) + 1
+            depth += 1
+        # Descend to the smallest member below it
+        while depth:
+            depth -= 1
+            bits = levels[depth][value]
+            value = (value << 6) | ((bits & -bits).bit_length() - 1)
+        return value
+
+
+class BestFitPacker:
+    """
+    Places items one at a time with the best-fit rule.
+
+    Ties between bins with the same remaining capacity go to the lowest
+    numbered bin, so the result is deterministic.
+    """
+
+    def __init__(self, capacity: int, max_bins: int, loads: Sequence[int] = (),
+                 items: Optional[int] = None):
+        """
+        Create a packer.
+
+        Args:
+            capacity: Capacity of each bin
+            max_bins: Maximum number of bins
+            loads: Current contents of bins that are already open; they are
+                bins 0 to len(loads) - 1 and count towards max_bins
+            items: Number of items that will be placed, if known (unused; only
+                bins that are opened take memory)
+        """
+        self._capacity = capacity
+        self._max_bins = max_bins
+        # Remaining capacities of the open bins, and the bins with each, lowest index first
+        self._capacities = _CapacitySet(capacity)
+        self._bins: Dict[int, List[int]] = {}
+        for i, load in enumerate(loads):
+            # A bin that is already over capacity cannot take any item
+            if load <= capacity:
+                self._add(capacity - load, i)
+        self._bin_count = len(loads)
+
+    def _add(self, remaining: int, index: int):
+        bins = self._bins.get(remaining)
+        if bins is None:
+            self._bins[remaining] = [index]
+            self._capacities.add(remaining)
+        else:
+            heappush(bins, index)
+
+    def place(self, size: int) -> int:
+        """
+        Place an item.
+
+        Args:
+            size: Size of the item; must not exceed the capacity
+
+        Returns:
+            Bin index of the item, or -1 if it could not be placed
+        """
+        remaining = self._capacities.successor(size)
+        if remaining is not None:
+            bins = self._bins[remaining]
+            index = heappop(bins)
+            if not bins:
+                del self._bins[remaining]
+                self._capacities.remove(remaining)
+        elif self._bin_count < self._max_bins:
+            remaining, index = self._capacity, self._bin_count
+            self._bin_count += 1
+        else:
+            return -1
+        self._add(remaining - size, index)
+        return index
+
+
+def first_fit(sizes: Sequence[int], capacity: int, max_bins: int,
+              loads: Sequence[int] = ()) -> List[int]:
+    """
+    Assign items to bins with the first-fit rule.
+
+    Args:
+        sizes: Item sizes, in placement order; each must not exceed capacity
+        capacity: Capacity of each bin
+        max_bins: Maximum number of bins
+        loads: Current contents of bins that are already open; they are
+            bins 0 to len(loads) - 1 and count towards max_bins
+
+    Returns:
+        Bin index of each item, or -1 if it could not be placed
+    """
+    place = FirstFitPacker(capacity, max_bins, loads, len(sizes)).place
+    return [place(size) for size in sizes]
+
+
+def best_fit(sizes: Sequence[int], capacity: int, max_bins: int,
+             loads: Sequence[int] = ()) -> List[int]:
+    """
+    Assign items to bins with the best-fit rule.
+
+    Ties between bins with the same remaining capacity go to the lowest
+    numbered bin, so the result is deterministic.
+
+    Args:
+        sizes: Item sizes, in placement order; each must not exceed capacity
+        capacity: Capacity of each bin
+        max_bins: Maximum number of bins
+        loads: Current contents of bins that are already open; they are
+            bins 0 to len(loads) - 1 and count towards max_bins
+
+    Returns:
+        Bin index of each item, or -1 if it could not be placed
+    """
+    place = BestFitPacker(capacity, max_bins, loads, len(sizes)).place
+    return [place(size) for size in sizes]
+
+
+# Packing strategies by name, as accepted by --packing
+PACKERS: Dict[str, Callable[..., List[int]]] = {
+    'first-fit': first_fit,
+    'best-fit': best_fit,
+}
+
+# Packers that place one item at a time, by strategy name
+PACKER_CLASSES: Dict[str, type] = {
+    'first-fit': FirstFitPacker,
+    'best-fit': BestFitPacker,
+}
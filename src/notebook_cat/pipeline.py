@@ -0,0 +1,284 @@
+"""
+Overlapped processing pipeline for notebook-cat.
+
+process_directory runs its phases one after the other: the whole input
+directory is scanned before the first file is counted, so the CPUs wait for
+the disk while scanning and the disk waits for the CPUs while counting.
+process_directory_async overlaps the two. A scanning thread hands batches of
+files to a bounded asyncio queue as it finds them, and counting workers take
+each batch as soon as it is queued, counting it in a thread or process pool
+while the scan goes on. The bounded queue pauses the scan when counting falls
+behind, so scanned files do not pile up in memory.
+
+Grouping needs every word count (files are packed largest first), so it
+starts once counting is complete; the sources are written, largest files
+first and write_jobs at a time, as soon as the grouping is final. The
+grouping and sources are the same as those of process_directory.
+"""
+
+import asyncio
+import inspect
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from .config.defaults import WORD_LIMIT, PIPELINE_BATCH_FILES, PIPELINE_QUEUE_BATCHES
+from .cache import WordCountCache
+from .content_store import ContentStore
+from .core import (
+    FileEntry,
+    _group_and_write,
+    _open_count_stores,
+    _plan_settings,
+    check_count_engine,
+    collect_files,
+    count_words_in_files,
+    create_count_pool,
+    input_display_names,
+    iter_scan_files,
+    parse_json_path,
+    process_directory,
+    resolve_jobs,
+)
+from .filetable import FileTable
+from .jsonpath import JsonPath
+from .profiling import PhaseProfiler
+
+# A batch of scanned files, each with its position in scan order
+Batch = List[Tuple[int, FileEntry]]
+
+
+def _scan_in_batches(entries: Callable[[], Iterable[FileEntry]], queue: asyncio.Queue,
+                     loop: asyncio.AbstractEventLoop, workers: int, stop: threading.Event):
+    """
+    Scan files and queue them in batches (runs in a thread of its own).
+
+    Args:
+        entries: Returns the files to process, e.g. iter_scan_files
+        queue: Queue of batches read by the counting workers
+        loop: Event loop of the counting workers
+        workers: Number of counting workers, each sent None once the scan ends
+        stop: Event set if counting failed and the scan should end early
+    """
+    def put(item):
+        # Waits while the queue is full
+        asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+    try:
+        batch: Batch = []
+        for position, entry in enumerate(entries()):
+            if stop.is_set():
+                return
+            batch.append((position, entry))
+            if len(batch) == PIPELINE_BATCH_FILES:
+                put(batch)
+                batch = []
+        if batch:
+            put(batch)
+    finally:
+        if not stop.is_set():
+            for _ in range(workers):
+                put(None)
+
+
+async def _count_batches(queue: asyncio.Queue, pool: Executor, cache: Optional[WordCountCache],
+                         count: Callable[[List[Path]], List[int]],
+                         counted: List[Tuple[int, FileEntry, int]]):
+    """
+    Count the words of queued batches until the scan ends.
+
+    Args:
+        queue: Queue of batches, None once the scan has ended
+        pool: Executor that counts the files of a batch
+        cache: Word count cache, or None to count every file
+        count: Counts a list of files (count_words_in_files with the options of the run)
+        counted: (position, entry, word count) of every counted file, appended to
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = await queue.get()
+        if batch is None:
+            return
+        # The cache is only used from the event loop's thread
+        counts = [cache.get(entry.path, entry.fingerprint) if cache is not None else None
+                  for _, entry in batch]
+        stale = [i for i, words in enumerate(counts) if words is None]
+        if stale:
+            fresh = await loop.run_in_executor(pool, count, [batch[i][1].path for i in stale])
+            for i, words in zip(stale, fresh):
+                counts[i] = words
+                if cache is not None:
+                    cache.put(batch[i][1].path, batch[i][1].fingerprint, words)
+        counted.extend((position, entry, words) for (position, entry), words in zip(batch, counts))
+
+
+async def scan_and_count(entries: Callable[[], Iterable[FileEntry]], cache: Optional[WordCountCache],
+                         json_path: Optional[JsonPath] = None, jobs: int = 1, executor: str = "process",
+                         content_store: Optional[ContentStore] = None,
+                         engine: str = "python") -> FileTable:
+    """
+    Scan files and count their words at the same time.
+
+    Args:
+        entries: Returns the files to process, e.g. iter_scan_files; it is
+            iterated in a thread of its own
+        cache: Word count cache, or None to count every file
+        json_path: Optional path to the text in JSON files
+        jobs: Number of counting workers (0 uses one per CPU core)
+        executor: "process" for CPU-bound counting, "thread" for I/O-bound storage
+        content_store: Optional store that retains the content of files that
+            are read (ignored with more than one "process" worker)
+        engine: Counting engine, "python" or "numpy"
+
+    Returns:
+        Table of the files in the order of entries, with their word counts
+    """
+    loop = asyncio.get_running_loop()
+    workers = resolve_jobs(jobs)
+    if workers > 1:
+        pool = create_count_pool(workers, executor)
+        if executor == "process":
+            content_store = None
+    else:
+        pool = ThreadPoolExecutor(max_workers=1)
+    count = partial(count_words_in_files, json_path=json_path, content_store=content_store, engine=engine)
+
+    stop = threading.Event()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_BATCHES)
+    counted: List[Tuple[int, FileEntry, int]] = []
+    scan = loop.run_in_executor(None, _scan_in_batches, entries, queue, loop, workers, stop)
+    counters = [asyncio.ensure_future(_count_batches(queue, pool, cache, count, counted))
+                for _ in range(workers)]
+    try:
+        await asyncio.gather(*counters)
+    except BaseException:
+        stop.set()
+        for counter in counters:
+            counter.cancel()
+        # Make room for a batch the scan may be waiting to queue
+        while not scan.done():
+            while not queue.empty():
+                queue.get_nowait()
+            await asyncio.sleep(0.01)
+        raise
+    finally:
+        pool.shutdown(wait=True)
+    await scan
+
+    counted.sort(key=lambda item: item[0])
+    table = FileTable.from_entries(entry for _, entry, _ in counted)
+    table.set_words(words for _, _, words in counted)
+    return table
+
+
+async def process_directory_async(input_dir: Optional[str], output_dir: str, **options) -> List[str]:
+    """
+    Process a directory like process_directory, overlapping scanning and counting.
+
+    Files are counted while the directory is still being scanned, and the
+    sources are written as soon as the grouping is final. Grouping and
+    writing run in a worker thread, so the event loop stays responsive.
+    Resumed and low-memory runs (resume, memory_budget) read their saved
+    plan or spill database instead of scanning into memory, and are run by
+    process_directory as they are. With max_files, the whole directory is
+    scanned before counting starts, since the files kept are the first in
+    path order.
+
+    Args:
+        input_dir: Input directory containing source files (None with input_files)
+        output_dir: Output directory for concatenated files
+        **options: Options of process_directory
+
+    Returns:
+        Names of the output sources written by this run (empty in dry run
+        mode or if nothing could be processed)
+    """
+    # Checks the options and fills in their defaults
+    bound = inspect.signature(process_directory).bind(input_dir, output_dir, **options)
+    bound.apply_defaults()
+    run = bound.arguments
+    loop = asyncio.get_running_loop()
+    if run["resume"] or run["memory_budget"] > 0:
+        return await loop.run_in_executor(None, partial(process_directory, input_dir, output_dir, **options))
+
+    input_files = run["input_files"]
+    input_path = Path(input_dir) if input_files is None else None
+    output_path = Path(output_dir)
+    if input_path is not None and not input_path.is_dir():
+        print(f"Error: Input directory '{input_dir}' not found or is not a directory.")
+        return []
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    file_extensions = run["file_extensions"] or {"txt", "md", "json"}
+    word_limit = run["word_limit"] if run["word_limit"] is not None else WORD_LIMIT
+    json_path = parse_json_path(run["json_path"])
+    check_count_engine(run["count_engine"])
+    incremental, zip_path = run["incremental"], run["zip_path"]
+    if zip_path is not None and incremental:
+        print("Note: Sources written to a ZIP archive are always written in full; "
+              "resume and incremental updates are ignored.")
+        incremental = False
+    settings = _plan_settings(input_path, input_files, file_extensions, json_path, run["source_limit"],
+                              run["max_files"], run["recursive"], run["include"], run["exclude"],
+                              run["packing"], word_limit)
+    display_names = input_display_names(input_files) if input_files is not None else None
+    profiler = PhaseProfiler(enabled=run["profile"], cprofile=run["cprofile"])
+
+    max_files = run["max_files"]
+    if input_path is not None:
+        print(f"Scanning for files with extensions {file_extensions} in '{input_path}'...")
+        def entries() -> Iterable[FileEntry]:
+            found = iter_scan_files(input_path, file_extensions, run["recursive"], run["include"], run["exclude"],
+                                    output_path)
+            if max_files is not None and max_files > 0:
+                table = FileTable.from_entries(found).sorted_by_path()
+                print(f"Limited to {max_files} files, returning {min(max_files, len(table))}")
+                return (FileEntry(table.path(row), table.sizes[row], table.mtimes[row])
+                        for row in range(min(max_files, len(table))))
+            return found
+    else:
+        def entries() -> Iterable[FileEntry]:
+            found = collect_files(input_files, file_extensions)
+            if max_files is not None and max_files > 0:
+                found = found[:max_files]
+                print(f"Limited to {max_files} files, returning {len(found)}")
+            return found
+
+    workers = resolve_jobs(run["jobs"])
+    if workers > 1:
+        print(f"Counting words with {workers} {run['executor']} workers while scanning...")
+    else:
+        print("Counting words while scanning...")
+    cache, content_store = _open_count_stores(output_path, json_path, run["use_cache"], run["clear_cache"],
+                                              0 if run["dry_run"] else run["content_budget"], workers,
+                                              run["executor"], word_limit)
+    try:
+        with profiler.phase("scan+count") as stats:
+            table = await scan_and_count(entries, cache, json_path, workers, run["executor"],
+                                         content_store, run["count_engine"])
+            if input_path is not None:
+                table = table.sorted_by_path()
+            stats.files = len(table)
+            stats.bytes_read = sum(table.sizes)
+    finally:
+        if cache is not None:
+            try:
+                cache.save()
+            except Exception as e:
+                print(f"Warning: Could not update word count cache: {e}")
+            cache.close()
+    cache_message = cache.stats_message() if cache is not None else None
+
+    if not len(table):
+        print(f"No matching files found in the input {'directory' if input_path is not None else 'files'}.")
+        if content_store is not None:
+            content_store.close()
+        return []
+    print(f"Found and counted {len(table)} files.")
+
+    return await loop.run_in_executor(None, partial(
+        _group_and_write, output_path, table, settings, run["source_limit"], word_limit, run["packing"],
+        run["dry_run"], incremental, json_path, content_store, cache_message, profiler, display_names,
+        run["write_jobs"], zip_path))
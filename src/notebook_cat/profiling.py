@@ -0,0 +1,149 @@
+"""
+Per-phase profiling for notebook-cat.
+
+With --profile, process_directory times each phase of a run (scanning,
+word counting, JSON parsing, grouping, writing and the reports) and records
+the files and bytes it handled. The phases are written to a JSON report in
+the output directory and summarized on one line. Optionally, each phase also
+runs under cProfile and the statistics of the slowest phase are dumped for
+inspection with pstats or a viewer such as snakeviz.
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+
+def _cpu_time() -> float:
+    """CPU time of this process and of its finished worker processes."""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+class PhaseStats:
+    """Time taken and data handled by one phase of a run."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.files = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def to_dict(self) -> dict:
+        """Return the statistics, with throughput, as a JSON serializable dict."""
+        seconds = self.wall_seconds
+        return {
+            'name': self.name,
+            'wall_seconds': round(seconds, 6),
+            'cpu_seconds': round(self.cpu_seconds, 6),
+            'files': self.files,
+            'bytes_read': self.bytes_read,
+            'bytes_written': self.bytes_written,
+            'files_per_second': round(self.files / seconds, 1) if seconds > 0 else None,
+            'mb_per_second': round((self.bytes_read + self.bytes_written) / 1e6 / seconds, 2) if seconds > 0 else None,
+        }
+
+
+class PhaseProfiler:
+    """Collects PhaseStats for the phases of a run."""
+
+    def __init__(self, enabled: bool = True, cprofile: bool = False):
+        """
+        Create a profiler.
+
+        Args:
+            enabled: If False, phases are not timed or recorded
+            cprofile: If True, run each phase under cProfile and keep the
+                statistics of the slowest one
+        """
+        self.enabled = enabled
+        self.cprofile = enabled and cprofile
+        self.phases: List[PhaseStats] = []
+        self._slowest_profile: Optional["cProfile.Profile"] = None
+        self._slowest_seconds = -1.0
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[PhaseStats]:
+        """
+        Time a phase of the run.
+
+        The caller fills in the files and bytes of the yielded statistics.
+
+        Args:
+            name: Name of the phase
+
+        Yields:
+            Statistics of the phase
+        """
+        stats = PhaseStats(name)
+        if not self.enabled:
+            yield stats
+            return
+        profile = None
+        if self.cprofile:
+            import cProfile  # Only needed with --cprofile
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Another profiler is already active
+                profile = None
+        wall, cpu = time.perf_counter(), _cpu_time()
+        try:
+            yield stats
+        finally:
+            stats.wall_seconds = time.perf_counter() - wall
+            stats.cpu_seconds = _cpu_time() - cpu
+            if profile is not None:
+                profile.disable()
+                if stats.wall_seconds > self._slowest_seconds:
+                    self._slowest_profile, self._slowest_seconds = profile, stats.wall_seconds
+            self.phases.append(stats)
+
+    def slowest_phase(self) -> Optional[PhaseStats]:
+        """Return the phase that took the longest, if any."""
+        return max(self.phases, key=lambda stats: stats.wall_seconds, default=None)
+
+    def summary(self) -> str:
+        """Describe the time and throughput of each phase on one line."""
+        parts = []
+        for stats in self.phases:
+            part = f"{stats.name} {stats.wall_seconds:.2f}s"
+            moved = stats.bytes_read + stats.bytes_written
+            if moved and stats.wall_seconds > 0:
+                part += f" ({moved / 1e6 / stats.wall_seconds:.1f} MB/s)"
+            parts.append(part)
+        total = sum(stats.wall_seconds for stats in self.phases)
+        return f"Profile: {', '.join(parts)}; total {total:.2f}s"
+
+    def save(self, report_path: Path, cprofile_path: Optional[Path] = None):
+        """
+        Write the JSON report, and the cProfile statistics of the slowest phase.
+
+        Args:
+            report_path: Path of the JSON report
+            cprofile_path: Path of the cProfile dump (written only when
+                cProfile was enabled)
+        """
+        slowest = self.slowest_phase()
+        dumped = None
+        try:
+            if cprofile_path is not None and self._slowest_profile is not None:
+                self._slowest_profile.dump_stats(str(cprofile_path))
+                dumped = str(cprofile_path)
+            report = {
+                'phases': [stats.to_dict() for stats in self.phases],
+                'total_wall_seconds': round(sum(stats.wall_seconds for stats in self.phases), 6),
+                'total_cpu_seconds': round(sum(stats.cpu_seconds for stats in self.phases), 6),
+                'slowest_phase': slowest.name if slowest is not None else None,
+                'cprofile': dumped,
+            }
+            with open(report_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+        except Exception as e:
+            print(f"Warning: Could not save profile report: {e}")
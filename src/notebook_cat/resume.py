@@ -0,0 +1,194 @@
+"""
+Resume journal for notebook-cat.
+
+While sources are written, each completed group is appended to a journal as
+one JSON line holding the group's number and input files. Writing the
+progress therefore costs time proportional to the group, not to every file
+processed so far. The journal is flushed after every record and synced to
+disk in batches. It is replayed on top of the resume state snapshot when
+resuming, and folded into the snapshot at the end of an interrupted run.
+
+Before writing starts, the grouping plan (the files of every group, with
+their word counts) is also saved, so a resumed run can continue writing
+without scanning the input directory or counting words again.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+
+class ResumeJournal:
+    """Append-only record of the groups that have been written."""
+
+    def __init__(self, journal_path: Path, sync_every: int = 16):
+        """
+        Open a journal for appending.
+
+        Args:
+            journal_path: Path to the journal file
+            sync_every: Number of records between fsync calls
+        """
+        self.journal_path = Path(journal_path)
+        self.sync_every = max(1, sync_every)
+        self._unsynced = 0
+        self._file = open(self.journal_path, 'a', encoding='utf-8')
+
+    def record(self, groups_processed: int, files: Iterable[str]):
+        """
+        Append a completed group.
+
+        Args:
+            groups_processed: Number of groups written so far, including this one
+            files: Input files of the group
+        """
+        self._file.write(json.dumps({'groups_processed': groups_processed, 'files': list(files)}) + "\n")
+        # Flushing hands the record to the OS, so it survives the process being
+        # killed; fsync, which also covers power loss, is done in batches
+        self._file.flush()
+        self._unsynced += 1
+        if self._unsynced >= self.sync_every:
+            self.sync()
+
+    def sync(self):
+        """Force the records written so far to disk."""
+        if self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def close(self):
+        """Sync and close the journal."""
+        try:
+            self.sync()
+        finally:
+            self._file.close()
+
+    def __enter__(self) -> "ResumeJournal":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def replay_journal(journal_path: Path, groups_processed: int = 0,
+                   files_processed: Optional[Set[str]] = None) -> Tuple[int, Set[str]]:
+    """
+    Apply the records of a journal to a resume state.
+
+    A final record that was only partly written (for example when the
+    process was killed mid-write) is ignored.
+
+    Args:
+        journal_path: Path to the journal file
+        groups_processed: Number of groups processed before the journal
+        files_processed: Files processed before the journal
+
+    Returns:
+        Tuple of (groups_processed, files_processed)
+    """
+    files_processed = set(files_processed or ())
+    for entry in _journal_entries(journal_path):
+        groups_processed = max(groups_processed, entry['groups_processed'])
+        files_processed.update(entry['files'])
+    return groups_processed, files_processed
+
+
+def journal_progress(journal_path: Path) -> int:
+    """
+    Return the number of groups recorded in a journal, without collecting
+    their files (which can be millions in a low-memory run).
+
+    Args:
+        journal_path: Path to the journal file
+
+    Returns:
+        Number of groups processed
+    """
+    return max((entry['groups_processed'] for entry in _journal_entries(journal_path)), default=0)
+
+
+def _journal_entries(journal_path: Path) -> Iterator[Dict[str, Any]]:
+    if not journal_path.exists():
+        return
+    with open(journal_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                return
+
+
+class PlannedFile(NamedTuple):
+    """An input file in a saved plan, with its word count and fingerprint."""
+    path: str
+    words: int
+    size: int
+    mtime_ns: int
+
+
+class ResumePlan(NamedTuple):
+    """The grouping computed for a run, saved so a resumed run can skip scanning and counting."""
+    settings: Dict[str, Any]  # Options the grouping depends on
+    groups: List[List[PlannedFile]]  # Groups in source number order, from source 1
+    ungrouped: List[Tuple[str, int]]  # (path, word count) of files that could not be grouped
+    total_files: int
+    total_words: int
+
+
+# Plan format version, increased on incompatible changes
+PLAN_VERSION = 1
+
+
+def save_plan(plan_path: Path, plan: ResumePlan):
+    """
+    Save a grouping plan, replacing any previous one atomically.
+
+    Args:
+        plan_path: Path to the plan file
+        plan: Plan to save
+    """
+    data = {
+        'version': PLAN_VERSION,
+        'settings': plan.settings,
+        'groups': [[list(item) for item in group] for group in plan.groups],
+        'ungrouped': [list(item) for item in plan.ungrouped],
+        'total_files': plan.total_files,
+        'total_words': plan.total_words,
+    }
+    partial_path = plan_path.with_name(plan_path.name + ".part")
+    try:
+        with open(partial_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(partial_path, plan_path)
+    except Exception as e:
+        print(f"Warning: Could not save grouping plan: {e}")
+
+
+def load_plan(plan_path: Path) -> Optional[ResumePlan]:
+    """
+    Load a saved grouping plan.
+
+    Args:
+        plan_path: Path to the plan file
+
+    Returns:
+        The plan, or None if there is no usable plan
+    """
+    if not plan_path.exists():
+        return None
+    try:
+        with open(plan_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != PLAN_VERSION:
+            return None
+        return ResumePlan(
+            data['settings'],
+            [[PlannedFile(*item) for item in group] for group in data['groups']],
+            [tuple(item) for item in data['ungrouped']],
+            data['total_files'],
+            data['total_words'],
+        )
+    except Exception as e:
+        print(f"Warning: Could not load grouping plan: {e}")
+        return None
@@ -0,0 +1,313 @@
+"""
+On-disk file records for low-memory runs.
+
+A normal run keeps the path, stat information, word count and group of every
+input file in Python lists, which for millions of files takes gigabytes of
+memory before any output is written. With a memory budget, process_directory
+stores these records in a SQLite database in the output directory instead and
+streams them through each step: files are added as they are scanned, counted
+in batches, fed to the packer in decreasing word count order and read back one
+group at a time when the sources and summary report are written. SQLite sorts
+larger-than-memory data in temporary files, and its page cache is bounded by
+the budget.
+
+The database also serves as the grouping plan of the run: it is kept if some
+sources could not be written, so --resume can continue without scanning and
+counting again.
+"""
+
+import json
+import os
+import threading
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .filetable import GroupView, path_sort_key
+
+# Spill format version, increased on incompatible changes
+SPILL_VERSION = 1
+
+
+def _sort_key(path: str) -> bytes:
+    # Compares like path_sort_key, as SQLite compares blobs byte by byte
+    return os.fsencode(path_sort_key(path))
+
+
+class FileSpill:
+    """SQLite store of the file records of a run."""
+
+    def __init__(self, db_path: Path, cache_bytes: int, fresh: bool = True):
+        """
+        Open a spill database.
+
+        Args:
+            db_path: Path to the database file
+            cache_bytes: Memory SQLite may use for its page cache
+            fresh: If True, remove any existing database and start empty
+        """
+        import sqlite3  # Loaded on first use, to keep startup fast
+
+        self.db_path = Path(db_path)
+        if fresh:
+            self.remove_file(self.db_path)
+        # Groups may be read by the threads that write sources in parallel
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._lock = threading.Lock()
+        self._conn.execute(f"PRAGMA cache_size = {-max(1, cache_bytes // 1024)}")
+        # The database is rebuilt if a run is interrupted while filling it, so
+        # it needs no rollback journal or syncing
+        self._conn.execute("PRAGMA journal_mode = OFF")
+        self._conn.execute("PRAGMA synchronous = OFF")
+        self._conn.execute("PRAGMA temp_store = FILE")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " id INTEGER PRIMARY KEY,"
+            " path TEXT NOT NULL,"
+            " sort_key BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL,"
+            " words INTEGER NOT NULL DEFAULT 0)"
+        )
+        # Placement of each file, in packing order; grp is -1 for files that could not be grouped
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS placements ("
+            " position INTEGER PRIMARY KEY,"
+            " file_id INTEGER NOT NULL,"
+            " grp INTEGER NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def remove_file(db_path: Path):
+        """Remove a spill database, if it exists."""
+        try:
+            Path(db_path).unlink()
+        except FileNotFoundError:
+            pass
+
+    @classmethod
+    def open_plan(cls, db_path: Path, settings: Dict, cache_bytes: int) -> Optional["FileSpill"]:
+        """
+        Open the spill of an interrupted run as its grouping plan.
+
+        Args:
+            db_path: Path to the database file
+            settings: Options of the current run (see process_directory)
+            cache_bytes: Memory SQLite may use for its page cache
+
+        Returns:
+            The spill, or None if there is none that was completely planned
+            with the same options
+        """
+        if not Path(db_path).exists():
+            return None
+        try:
+            spill = cls(db_path, cache_bytes, fresh=False)
+            if (spill.get_meta('version') == str(SPILL_VERSION)
+                    and spill.get_meta('settings') == json.dumps(settings, sort_keys=True)):
+                return spill
+            spill.close()
+        except Exception as e:
+            print(f"Warning: Could not open the saved grouping plan: {e}")
+        return None
+
+    def _execute(self, sql: str, parameters: Tuple = ()):
+        with self._lock:
+            return self._conn.execute(sql, parameters).fetchall()
+
+    def get_meta(self, key: str) -> Optional[str]:
+        rows = self._execute("SELECT value FROM meta WHERE key = ?", (key,))
+        return rows[0][0] if rows else None
+
+    def save_plan(self, settings: Dict, total_files: int, total_words: int):
+        """
+        Mark the spill as a complete grouping plan for a run with these options.
+
+        Args:
+            settings: Options of the run
+            total_files: Number of files processed
+            total_words: Number of words processed
+        """
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", [
+                ('settings', json.dumps(settings, sort_keys=True)),
+                ('total_files', str(total_files)),
+                ('total_words', str(total_words)),
+                ('version', str(SPILL_VERSION)),
+            ])
+
+    def add_files(self, entries: Iterable, batch_size: int, sort_by_path: bool = True) -> int:
+        """
+        Add scanned files.
+
+        Args:
+            entries: Files with path, size and mtime_ns attributes (FileEntry)
+            batch_size: Number of records inserted at a time
+            sort_by_path: If True, the files are ordered by path (like
+                scan_files); if False, they keep the order they are added in
+                (like collect_files)
+
+        Returns:
+            Number of files added
+        """
+        added = 0
+        first = self.file_count()
+        entries = iter(entries)
+        while True:
+            batch = [(str(e.path),
+                      _sort_key(str(e.path)) if sort_by_path else (first + added + i).to_bytes(8, 'big'),
+                      e.size, e.mtime_ns)
+                     for i, e in enumerate(islice(entries, batch_size))]
+            if not batch:
+                return added
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    "INSERT INTO files (path, sort_key, size, mtime_ns) VALUES (?, ?, ?, ?)", batch)
+            added += len(batch)
+
+    def limit_files(self, max_files: int):
+        """Keep only the first max_files files, in the order of add_files."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM files WHERE id NOT IN (SELECT id FROM files ORDER BY sort_key LIMIT ?)",
+                (max_files,))
+
+    def file_count(self) -> int:
+        return self._execute("SELECT COUNT(*) FROM files")[0][0]
+
+    def file_batches(self, batch_size: int) -> Iterator[List[Tuple[int, str, int, int]]]:
+        """
+        Read the files in batches, e.g. to count their words.
+
+        Args:
+            batch_size: Number of files per batch
+
+        Yields:
+            Lists of (file id, path, size, mtime_ns)
+        """
+        last_id = 0
+        while True:
+            batch = self._execute(
+                "SELECT id, path, size, mtime_ns FROM files WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, batch_size))
+            if not batch:
+                return
+            yield batch
+            last_id = batch[-1][0]
+
+    def set_words(self, counts: Iterable[Tuple[int, int]]):
+        """
+        Record word counts.
+
+        Args:
+            counts: (file id, word count) pairs
+        """
+        with self._lock, self._conn:
+            self._conn.executemany("UPDATE files SET words = ? WHERE id = ?",
+                                   ((words, file_id) for file_id, words in counts))
+
+    def total_words(self) -> int:
+        return self._execute("SELECT COALESCE(SUM(words), 0) FROM files")[0][0]
+
+    def count_packable(self, word_limit: int) -> int:
+        """Number of files that can be placed in a group (with 1 to word_limit words)."""
+        return self._execute("SELECT COUNT(*) FROM files WHERE words > 0 AND words <= ?", (word_limit,))[0][0]
+
+    def files_by_words(self) -> Iterator[Tuple[int, str, int]]:
+        """
+        Stream the files largest first, in the order of add_files among equal word counts.
+
+        Yields:
+            (file id, path, word count)
+        """
+        # A cursor of its own: the placements are written while it is read
+        cursor = self._conn.cursor()
+        cursor.execute("SELECT id, path, words FROM files ORDER BY words DESC, sort_key")
+        try:
+            while True:
+                with self._lock:
+                    rows = cursor.fetchmany(1024)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            cursor.close()
+
+    def add_placements(self, placements: List[Tuple[int, int, int]]):
+        """
+        Record the group of files.
+
+        Args:
+            placements: (position in packing order, file id, group index or -1) tuples
+        """
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT INTO placements (position, file_id, grp) VALUES (?, ?, ?)",
+                                   placements)
+
+    def finish_placements(self):
+        """Index the placements, once all are recorded, for reading groups."""
+        with self._lock, self._conn:
+            self._conn.execute("CREATE INDEX IF NOT EXISTS placements_by_group ON placements (grp, position)")
+
+    def group_count(self) -> int:
+        return self._execute("SELECT COALESCE(MAX(grp), -1) + 1 FROM placements")[0][0]
+
+    def _group_rows(self, index: int) -> List[Tuple[str, int]]:
+        return self._execute(
+            "SELECT f.path, f.words FROM placements p JOIN files f ON f.id = p.file_id"
+            " WHERE p.grp = ? ORDER BY p.position", (index,))
+
+    def group(self, index: int) -> List[Tuple[Path, int]]:
+        """Return the files of a group, as (path, word count) in packing order."""
+        return [(Path(path), words) for path, words in self._group_rows(index)]
+
+    def group_names(self, index: int) -> List[Tuple[str, str, int]]:
+        """Return (path, file name, word count) of the files of a group."""
+        return [(path, os.path.basename(path), words) for path, words in self._group_rows(index)]
+
+    def group_view(self) -> GroupView:
+        """Return the groups as a sequence, each group read when it is accessed."""
+        return GroupView(self.group, self.group_count(), load_names=self.group_names)
+
+    def group_totals(self) -> List[Tuple[int, int, int]]:
+        """Return the (file count, word count, bytes) of every group, in group order."""
+        rows = self._execute(
+            "SELECT p.grp, COUNT(*), SUM(f.words), SUM(f.size) FROM placements p JOIN files f ON f.id = p.file_id"
+            " WHERE p.grp >= 0 GROUP BY p.grp ORDER BY p.grp")
+        return [(files, words, size) for _, files, words, size in rows]
+
+    def ungrouped_count(self) -> int:
+        return self._execute("SELECT COUNT(*) FROM placements WHERE grp < 0")[0][0]
+
+    def ungrouped(self) -> Iterator[Tuple[Path, int]]:
+        """Stream the files that could not be grouped, as (path, word count)."""
+        last_position = -1
+        while True:
+            rows = self._execute(
+                "SELECT p.position, f.path, f.words FROM placements p JOIN files f ON f.id = p.file_id"
+                " WHERE p.grp < 0 AND p.position > ? ORDER BY p.position LIMIT 1024", (last_position,))
+            if not rows:
+                return
+            for position, path, words in rows:
+                yield Path(path), words
+            last_position = rows[-1][0]
+
+    def close(self):
+        """Close the database."""
+        self._conn.close()
+
+
+class SpilledUngrouped:
+    """Files of a spill that could not be grouped, streamed when iterated."""
+
+    def __init__(self, spill: FileSpill):
+        self._spill = spill
+        self._count = spill.ungrouped_count()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[Tuple[Path, int]]:
+        return self._spill.ungrouped()
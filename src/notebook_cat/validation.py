@@ -13,6 +13,7 @@ from typing import Tuple, List, Optional
 try:
     from notebook_cat.config.defaults import SUPPORTED_EXTENSIONS, WORD_LIMIT
     from notebook_cat.utils import sanitize_filename
+    from notebook_cat.jsonpath import JsonPath
 except ImportError:
     # Fall back to relative import for development
     import sys
@@ -20,6 +21,10 @@ except ImportError:
     sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
     from src.notebook_cat.config.defaults import SUPPORTED_EXTENSIONS, WORD_LIMIT
     from src.notebook_cat.utils import sanitize_filename
+    from src.notebook_cat.jsonpath import JsonPath
+
+# Characters allowed in JSON paths besides letters and digits
+JSON_PATH_CHARACTERS = ".*,_-"
 
 
 def validate_file_extension(filename: str) -> bool:
@@ -58,13 +63,19 @@ def validate_json_path(json_path: Optional[str]) -> Tuple[bool, str]:
     if '..' in json_path or '/' in json_path or '\\' in json_path:
         return False, ""
     
-    # Only allow alphanumeric and dot characters
-    sanitized_path = ''.join(c for c in json_path if c.isalnum() or c == '.')
+    # Only allow alphanumeric characters, separators and wildcards
+    sanitized_path = ''.join(c for c in json_path if c.isalnum() or c in JSON_PATH_CHARACTERS)
     
     # If the path was changed, it contained invalid characters
     if sanitized_path != json_path:
         return False, sanitized_path
     
+    # The path must also be well formed (no empty keys, e.g. "a.", "a,,b")
+    try:
+        JsonPath(sanitized_path)
+    except ValueError:
+        return False, ""
+    
     return True, sanitized_path
 
 
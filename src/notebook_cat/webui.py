@@ -4,14 +4,14 @@ Web interface for notebook-cat using Gradio.
 This module provides a simple web UI for the notebook-cat tool,
 allowing users to select files, configure options, and download
 the concatenated output files.
+
+Gradio is imported when the interface is built, not with this module, so
+process_files can be used without paying for (or installing) Gradio.
 """
 
 import os
-import tempfile
-import shutil
-import gradio as gr
+import threading
 from pathlib import Path
-import zipfile
 import sys
 import re
 
@@ -22,8 +22,12 @@ try:
         WORD_LIMIT,
         DEFAULT_SOURCE_LIMIT,
         PLUS_SOURCE_LIMIT,
-        SUPPORTED_EXTENSIONS
+        SUPPORTED_EXTENSIONS,
+        WEB_CONCURRENCY,
+        WORKSPACE_QUOTA_MB,
+        WORKSPACE_MAX_AGE
     )
+    from notebook_cat.workspace import WorkspaceManager
     from notebook_cat.validation import (
         validate_inputs, 
         sanitize_filename,
@@ -37,20 +41,69 @@ except ImportError:
         WORD_LIMIT,
         DEFAULT_SOURCE_LIMIT,
         PLUS_SOURCE_LIMIT,
-        SUPPORTED_EXTENSIONS
+        SUPPORTED_EXTENSIONS,
+        WEB_CONCURRENCY,
+        WORKSPACE_QUOTA_MB,
+        WORKSPACE_MAX_AGE
     )
+    from src.notebook_cat.workspace import WorkspaceManager
     from src.notebook_cat.validation import (
         validate_inputs, 
         sanitize_filename,
         validate_json_path
     )
 
+# Job directories of the web interface, created on first use
+_workspaces = None
+_workspaces_lock = threading.Lock()
+
+def get_workspace_manager() -> WorkspaceManager:
+    """Return the workspace manager of the web interface, creating it if needed."""
+    global _workspaces
+    with _workspaces_lock:
+        if _workspaces is None:
+            _workspaces = WorkspaceManager()
+        return _workspaces
+
+def configure_workspaces(quota_mb: int = WORKSPACE_QUOTA_MB, max_age: float = WORKSPACE_MAX_AGE,
+                         root: str = None) -> WorkspaceManager:
+    """
+    Create the workspace manager of the web interface and start its reaper.
+    
+    Args:
+        quota_mb: Disk space of finished jobs, in MB, above which the least
+            recently used are removed (0 for no quota)
+        max_age: Seconds after its last use a finished job is removed (0 for no limit)
+        root: Directory the jobs are kept in (default: a new directory in the
+            system temp directory); jobs an earlier server left there are removed too
+    
+    Returns:
+        The workspace manager
+    """
+    global _workspaces
+    with _workspaces_lock:
+        if _workspaces is not None:
+            _workspaces.stop_reaper()
+        _workspaces = WorkspaceManager(root, quota_bytes=quota_mb * 1024 * 1024, max_age=max_age)
+        _workspaces.start_reaper()
+        return _workspaces
+
+def record_download(job_id):
+    """
+    Record that the results of a job were downloaded, so they are kept longest.
+    
+    Args:
+        job_id: Identifier of the job, or None if there are no results
+    """
+    if job_id:
+        get_workspace_manager().touch(job_id)
+
 def process_files(
     files,
     plan_type="free",
     word_limit=WORD_LIMIT,
     json_path=None,
-    progress=gr.Progress()
+    progress=None
 ):
     """
     Process uploaded files and create concatenated output files.
@@ -60,11 +113,14 @@ def process_files(
         plan_type: NotebookLM plan type ('free', 'plus', or 'custom')
         word_limit: Word limit per source file
         json_path: Optional path to text field in JSON files
-        progress: Gradio progress indicator
+        progress: Gradio progress indicator (progress is not reported if None)
         
     Returns:
         tuple: (list of output files, status message, summary)
     """
+    if progress is None:
+        progress = lambda *args, **kwargs: None
+    
     # Validate all inputs
     is_valid, sanitized, errors = validate_inputs(files, plan_type, word_limit, json_path)
     
@@ -100,51 +156,34 @@ def process_files(
     file_count = len(files)
     progress(0.0, desc=f"Starting to process {file_count} files...")
     
-    # Create actual directories in /tmp that will persist
-    import subprocess
-    temp_base = "/tmp/notebook-cat-temp-" + str(int(time.time()))
-    temp_input_dir = temp_base + "-input"
-    temp_output_dir = temp_base + "-output"
-    
-    # Create the directories with secure permissions
+    # Create a workspace for the output that persists until the download is done;
+    # uploads are read in place. Every request gets its own directory, readable by the user only
+    workspaces = get_workspace_manager()
     try:
-        os.makedirs(temp_input_dir, exist_ok=True)
-        os.makedirs(temp_output_dir, exist_ok=True)
-        # Set more secure permissions (user read/write/execute only)
-        os.chmod(temp_input_dir, 0o700)
-        os.chmod(temp_output_dir, 0o700)
-        print(f"Created temp directories: {temp_input_dir}, {temp_output_dir}")
+        workspace = workspaces.create()
+        temp_output_dir = str(workspace.path)
+        print(f"Created temp directory: {temp_output_dir}")
     except Exception as e:
-        print(f"Error creating temp directories: {e}")
+        print(f"Error creating temp directory: {e}")
         return [], f"Error creating temporary directories: {str(e)}", ""
     
     try:
-        # Copy uploaded files to the temporary input directory with validation
-        progress(0.1, desc=f"Copying {file_count} files...")
-        copied_count = 0
-        for i, file in enumerate(files):
+        # Select the uploaded files with supported extensions, shown under their sanitized names
+        progress(0.1, desc=f"Checking {file_count} files...")
+        input_files = []
+        for file in files:
             file_path = Path(file)
-            # Only copy files with supported extensions
             extension = file_path.suffix.lower()[1:]
             if extension in SUPPORTED_EXTENSIONS:
-                # Sanitize filename to prevent path traversal
+                # Sanitize filename before it appears in the output
                 safe_filename = sanitize_filename(file_path.name)
                 if safe_filename != file_path.name:
                     print(f"Sanitized filename: {file_path.name} -> {safe_filename}")
-                
-                dest_path = os.path.join(temp_input_dir, safe_filename)
-                shutil.copy2(file, dest_path)
-                copied_count += 1
-                progress(0.1 + 0.1 * (i + 1) / file_count)
-                print(f"Copied file {i+1}/{file_count}: {file} -> {dest_path}")
+                input_files.append((str(file_path), safe_filename))
             else:
                 print(f"Skipped unsupported file: {file}")
         
-        # Check if files were copied
-        copied_files = os.listdir(temp_input_dir)
-        print(f"Files copied to temp dir: {len(copied_files)} - {copied_files}")
-        
-        if copied_count == 0:
+        if not input_files:
             return [], "No valid files were found. Please upload files with supported extensions (.txt, .md, .json).", ""
         
         # Validate JSON path one more time before processing
@@ -159,24 +198,23 @@ def process_files(
         # Process the files
         progress(0.2, desc="Processing files...")
         
-        # Override the word limit for this run
-        original_word_limit = core.WORD_LIMIT
-        core.WORD_LIMIT = word_limit
-        
-        # Process the directory
-        core.process_directory(
-            input_dir=temp_input_dir,
+        # Process the uploads, writing the sources straight into the ZIP archive.
+        # The word limit is passed to this run only, so concurrent requests don't interfere
+        zip_filename = "notebook_cat_output.zip"
+        zip_path = os.path.join(temp_output_dir, zip_filename)
+        print(f"Creating ZIP at {zip_path}")
+        output_sources = core.process_files(
+            input_files,
             output_dir=temp_output_dir,
             source_limit=source_limit,
             json_path=json_path,
-            max_files=None  # No limit for the web UI
+            max_files=None,  # No limit for the web UI
+            zip_path=zip_path,
+            word_limit=word_limit
         )
         
-        # Restore the original word limit
-        core.WORD_LIMIT = original_word_limit
-        
         # Update progress
-        progress(0.8, desc="Reading processing summary...")
+        progress(0.9, desc="Reading processing summary...")
         
         # Read the summary report
         summary_path = os.path.join(temp_output_dir, "notebook_cat_summary.txt")
@@ -186,73 +224,13 @@ def process_files(
                 summary = f.read()
                 print(f"Read summary file: {summary_path}")
         
-        # Check if any output files were created
-        output_files_list = []
-        for item in os.listdir(temp_output_dir):
-            if item.startswith("notebooklm_source_") and item.endswith(".txt"):
-                output_file_path = os.path.join(temp_output_dir, item)
-                if os.path.isfile(output_file_path):
-                    output_files_list.append(output_file_path)
-                    print(f"Found output file: {output_file_path}")
-        
-        if not output_files_list:
+        if not output_sources or not os.path.exists(zip_path):
             print("No output files were created")
             return [], "Error: No output files were created. Check if input files are valid.", summary
         
-        # Create zip file path
-        progress(0.85, desc="Creating output archive...")
-        zip_filename = "notebook_cat_output.zip"
-        zip_path = os.path.join(temp_output_dir, zip_filename)
-        print(f"Creating ZIP at {zip_path}")
-        
-        try:
-            # Create ZIP file
-            with zipfile.ZipFile(zip_path, 'w') as zipf:
-                # Add summary file if it exists
-                if os.path.exists(summary_path):
-                    zipf.write(summary_path, arcname=os.path.basename(summary_path))
-                    progress(0.87, desc="Archiving summary file...")
-                    print(f"Added summary to ZIP: {summary_path}")
-                
-                # Add output files
-                total_files = len(output_files_list)
-                for i, file_path in enumerate(output_files_list):
-                    zipf.write(file_path, arcname=os.path.basename(file_path))
-                    # Update progress from 0.87 to 0.97
-                    progress_value = 0.87 + (0.1 * (i + 1) / total_files)
-                    progress(progress_value, desc=f"Archiving file {i+1} of {total_files}...")
-                    print(f"Added file to ZIP ({i+1}/{total_files}): {file_path}")
-        except Exception as e:
-            print(f"Error creating ZIP: {e}")
-            # Create simple error text file instead
-            error_file = os.path.join(temp_output_dir, "error.txt")
-            with open(error_file, 'w') as f:
-                f.write(f"Error creating ZIP: {str(e)}\n\n")
-                f.write("Files processed:\n")
-                for i, file_path in enumerate(output_files_list):
-                    f.write(f"{i+1}. {os.path.basename(file_path)}\n")
-            return [error_file], f"Error creating ZIP: {str(e)}", summary
-        
-        # Check if ZIP exists
-        if not os.path.exists(zip_path):
-            print(f"ZIP file doesn't exist at expected path: {zip_path}")
-            # Return the first output file as a fallback
-            if output_files_list:
-                return [output_files_list[0]], "Error creating ZIP archive. Returning first output file instead.", summary
-            else:
-                return [], "Error: No output files found.", summary
-        
-        # Get ZIP file size
         zip_size = os.path.getsize(zip_path)
-        print(f"ZIP created successfully at {zip_path}, size: {zip_size} bytes")
-        
-        # Verify ZIP contents
-        try:
-            with zipfile.ZipFile(zip_path, 'r') as zipf:
-                zip_contents = zipf.namelist()
-                print(f"ZIP contains {len(zip_contents)} files: {zip_contents}")
-        except Exception as e:
-            print(f"Error reading ZIP file: {e}")
+        print(f"ZIP created successfully at {zip_path}, size: {zip_size} bytes, "
+              f"{len(output_sources)} sources: {output_sources}")
         
         # Complete progress
         progress(1.0, desc="Processing complete!")
@@ -261,7 +239,7 @@ def process_files(
         elapsed_time = time.time() - start_time
         
         # Add validation warnings if any
-        status_message = f"Processing complete! {len(output_files_list)} files created in {elapsed_time:.2f} seconds."
+        status_message = f"Processing complete! {len(output_sources)} files created in {elapsed_time:.2f} seconds."
         if validation_warnings:
             status_message += "\n\nWarnings: " + "; ".join(validation_warnings)
         
@@ -285,9 +263,20 @@ def process_files(
         except:
             progress(1.0, desc=f"Error: {str(e)}")
             return [], f"Error processing files: {str(e)}", ""
+    finally:
+        # The workspace can be evicted from now on
+        workspaces.finish(workspace)
 
 def create_ui():
     """Create and configure the Gradio interface."""
+    import gradio as gr
+    
+    def process_with_progress(files, plan_type, word_limit, json_path, progress=gr.Progress()):
+        # Gradio reports progress to functions with a gr.Progress default
+        output, status, summary = process_files(files, plan_type, word_limit, json_path, progress)
+        # Gradio serves a copy of the output, so the job is remembered for the download event
+        job_id = get_workspace_manager().job_of(output[0]) if output else None
+        return output, status, summary, job_id
     
     # Define CSS for a cleaner look
     css = """
@@ -347,8 +336,9 @@ def create_ui():
                 
                 json_path = gr.Textbox(
                     label="JSON Path (Optional)",
-                    placeholder="E.g., segments.text",
-                    info="Path to text field in JSON files using dot notation"
+                    placeholder="E.g., segments.*.text",
+                    info="Path to text field in JSON files using dot notation; "
+                         "* matches any field or item, commas separate alternatives"
                 )
                 
                 process_btn = gr.Button("Process Files", variant="primary", size="lg")
@@ -357,6 +347,7 @@ def create_ui():
                 gr.Markdown("## Results")
                 status = gr.Textbox(label="Status", interactive=False)
                 output_files = gr.File(label="Download Concatenated Files")
+                output_job = gr.State(None)
                 
                 gr.Markdown("## Processing Summary")
                 summary = gr.Textbox(
@@ -379,16 +370,20 @@ def create_ui():
         
         # Process files when button is clicked
         process_btn.click(
-            fn=process_files,
+            fn=process_with_progress,
             inputs=[
                 files,
                 plan,
                 word_limit,
                 json_path,
             ],
-            outputs=[output_files, status, summary]
+            outputs=[output_files, status, summary, output_job]
         )
         
+        # Downloads keep a job's files from being removed first (Gradio 4.x and later)
+        if hasattr(output_files, "download"):
+            output_files.download(fn=record_download, inputs=output_job)
+        
         # Auto-update the source limit based on the plan
         def get_source_limit(plan_value, custom_value):
             if plan_value == "free":
@@ -410,6 +405,22 @@ def create_ui():
     
     return app
 
+def enable_concurrency(app, concurrency: int):
+    """
+    Queue requests and let up to `concurrency` of them be processed at the same time.
+    
+    Args:
+        app: Gradio Blocks app
+        concurrency: Maximum number of requests processed at once
+    """
+    import inspect
+    parameters = inspect.signature(app.queue).parameters
+    if "default_concurrency_limit" in parameters:
+        # Gradio 4 and later
+        app.queue(default_concurrency_limit=concurrency)
+    else:
+        app.queue(concurrency_count=concurrency)
+
 def launch_ui():
     """Launch the Gradio interface."""
     import socket
@@ -418,7 +429,22 @@ def launch_ui():
     # Parse command line arguments
     parser = argparse.ArgumentParser(description="Launch the Notebook Cat web interface")
     parser.add_argument("--network", action="store_true", help="Allow network access (bind to all interfaces)")
+    parser.add_argument("--concurrency", type=int, default=WEB_CONCURRENCY,
+                        help=f"Number of uploads processed at the same time (default: {WEB_CONCURRENCY})")
+    parser.add_argument("--workspace-quota", type=int, default=WORKSPACE_QUOTA_MB,
+                        help=f"Disk space in MB kept for finished jobs; the least recently used are removed above it "
+                             f"(0 for no quota, default: {WORKSPACE_QUOTA_MB})")
+    parser.add_argument("--workspace-max-age", type=int, default=WORKSPACE_MAX_AGE,
+                        help=f"Seconds after its last use a finished job is removed "
+                             f"(0 for no limit, default: {WORKSPACE_MAX_AGE})")
+    parser.add_argument("--workspace-dir", default=None,
+                        help="Directory job files are kept in, reused across restarts "
+                             "(default: a new directory in the system temp directory)")
     args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency must be a positive number")
+    if args.workspace_quota < 0 or args.workspace_max_age < 0:
+        parser.error("--workspace-quota and --workspace-max-age must not be negative")
     
     # Determine server name based on network flag
     server_name = "0.0.0.0" if args.network else "127.0.0.1"
@@ -433,7 +459,10 @@ def launch_ui():
         except:
             ip_address = "your-ip-address"
     
+    workspaces = configure_workspaces(args.workspace_quota, args.workspace_max_age, args.workspace_dir)
+    print(f"📁 Job files are kept in {workspaces.root}")
     app = create_ui()
+    enable_concurrency(app, args.concurrency)
     print("\n🔥 Starting Notebook Cat Web UI...")
     print("📝 Local access: http://localhost:7860")
     
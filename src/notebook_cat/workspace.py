@@ -0,0 +1,282 @@
+"""
+Temporary workspaces for web interface jobs.
+
+Every upload processed by the web interface gets its own directory for the
+sources, summary and ZIP archive. The directory has to outlive the request,
+because the archive is downloaded afterwards, but a long-running server must
+not fill up the temporary filesystem. The WorkspaceManager hands out unique
+directories and a background reaper removes finished jobs once they are
+older than a maximum age, and the least recently used ones whenever their
+total size is over a quota. Jobs that are still running are never removed.
+
+A job counts as used when it finishes, when touch() is called for it (the
+web interface does so when its archive is downloaded) and when its files are
+read (their access time, where the filesystem records it), so downloaded
+archives are kept longest.
+
+Every workspace holds a marker file, and only marked directories are taken
+over from an earlier process, so a root shared with other programs never
+loses their files. Without an explicit root each manager creates a root of
+its own in the system temp directory; pass the same root to a restarted
+server to have it clean up the jobs its predecessor left behind.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .config.defaults import (
+    WORKSPACE_MARKER_FILE,
+    WORKSPACE_MAX_AGE,
+    WORKSPACE_QUOTA_MB,
+    WORKSPACE_REAP_INTERVAL,
+)
+
+
+def _directory_size(path: Path) -> int:
+    """Total size of the files under a directory."""
+    total = 0
+    pending = [str(path)]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            total += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+    return total
+
+
+def _last_read(path: Path) -> float:
+    """Latest access time of the files directly in a directory."""
+    latest = 0.0
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    latest = max(latest, entry.stat(follow_symlinks=False).st_atime)
+                except OSError:
+                    pass
+    except OSError:
+        pass
+    return latest
+
+
+class Workspace:
+    """Directory of one job."""
+
+    def __init__(self, job_id: str, path: Path, created: float):
+        self.job_id = job_id
+        self.path = path
+        self.created = created
+        self.last_used = created
+        self.finished = False
+        self.size = 0  # Measured when the job finishes
+
+
+class WorkspaceManager:
+    """Creates job workspaces and evicts finished ones by age and total size."""
+
+    def __init__(self, root: Optional[Path] = None, quota_bytes: int = WORKSPACE_QUOTA_MB * 1024 * 1024,
+                 max_age: float = WORKSPACE_MAX_AGE, reap_interval: float = WORKSPACE_REAP_INTERVAL,
+                 clock: Callable[[], float] = time.time):
+        """
+        Create a workspace manager.
+
+        Workspaces left in the root directory by an earlier manager are
+        adopted as finished jobs, so they are evicted like any other. Give
+        each running server a root of its own.
+
+        Args:
+            root: Directory the workspaces are created in (default: a new
+                notebook-cat-workspaces-* directory in the system temp directory)
+            quota_bytes: Total size of finished workspaces above which the
+                least recently used are evicted (0 for no quota)
+            max_age: Seconds since a finished workspace was last used after
+                which it is evicted (0 for no limit)
+            reap_interval: Seconds between runs of the background reaper
+            clock: Source of the current time, in seconds since the epoch
+        """
+        if root is None:
+            root = tempfile.mkdtemp(prefix="notebook-cat-workspaces-")
+        self.root = Path(root)
+        self.quota_bytes = quota_bytes
+        self.max_age = max_age
+        self.reap_interval = reap_interval
+        self.clock = clock
+        self._workspaces: Dict[str, Workspace] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._reaper: Optional[threading.Thread] = None
+        self.evicted_count = 0
+        self.evicted_bytes = 0
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        os.chmod(self.root, 0o700)
+        self._adopt_existing()
+
+    def _adopt_existing(self):
+        with os.scandir(self.root) as it:
+            for entry in it:
+                # Only directories created by a workspace manager
+                if not (entry.is_dir(follow_symlinks=False)
+                        and os.path.isfile(os.path.join(entry.path, WORKSPACE_MARKER_FILE))):
+                    continue
+                path = Path(entry.path)
+                workspace = Workspace(entry.name, path, entry.stat().st_mtime)
+                workspace.finished = True
+                workspace.last_used = max(workspace.created, _last_read(path))
+                workspace.size = _directory_size(path)
+                self._workspaces[workspace.job_id] = workspace
+
+    def create(self) -> Workspace:
+        """
+        Create the workspace of a new job.
+
+        Returns:
+            The workspace, with a new directory only the current user can access
+        """
+        path = Path(tempfile.mkdtemp(prefix="job-", dir=self.root))
+        (path / WORKSPACE_MARKER_FILE).touch()
+        workspace = Workspace(path.name, path, self.clock())
+        with self._lock:
+            self._workspaces[workspace.job_id] = workspace
+        return workspace
+
+    def finish(self, workspace: Workspace):
+        """
+        Mark a job as finished, so its workspace can be evicted.
+
+        Args:
+            workspace: Workspace of the job
+        """
+        size = _directory_size(workspace.path)
+        with self._lock:
+            workspace.size = size
+            workspace.finished = True
+            workspace.last_used = self.clock()
+
+    def touch(self, job_id: str):
+        """
+        Record that a job's files were used, e.g. downloaded.
+
+        Args:
+            job_id: Identifier of the job
+        """
+        with self._lock:
+            workspace = self._workspaces.get(job_id)
+            if workspace is not None:
+                workspace.last_used = self.clock()
+
+    def job_of(self, path) -> Optional[str]:
+        """
+        Return the job whose workspace holds a file.
+
+        Args:
+            path: Path to a file or directory
+
+        Returns:
+            Identifier of the job, or None if the path is in no workspace
+        """
+        try:
+            relative = Path(path).resolve().relative_to(self.root.resolve())
+        except ValueError:
+            return None
+        if not relative.parts:
+            return None
+        with self._lock:
+            return relative.parts[0] if relative.parts[0] in self._workspaces else None
+
+    def reap(self) -> List[str]:
+        """
+        Evict finished workspaces that are too old or over the size quota.
+
+        Returns:
+            Identifiers of the evicted jobs
+        """
+        # The filesystem is only accessed with the lock released, so creating,
+        # finishing and touching jobs never waits for a slow disk
+        with self._lock:
+            finished = [w for w in self._workspaces.values() if w.finished]
+        last_read = [_last_read(w.path) for w in finished]
+
+        evicted = []
+        with self._lock:
+            for workspace, read in zip(finished, last_read):
+                workspace.last_used = max(workspace.last_used, read)
+            finished = [w for w in self._workspaces.values() if w.finished]
+            now = self.clock()
+            # Least recently used first
+            finished.sort(key=lambda w: w.last_used)
+            total = sum(w.size for w in finished)
+            for workspace in finished:
+                expired = self.max_age > 0 and now - workspace.last_used > self.max_age
+                over_quota = self.quota_bytes > 0 and total > self.quota_bytes
+                if not (expired or over_quota):
+                    continue
+                total -= workspace.size
+                del self._workspaces[workspace.job_id]
+                self.evicted_count += 1
+                self.evicted_bytes += workspace.size
+                evicted.append(workspace)
+
+        for workspace in evicted:
+            shutil.rmtree(workspace.path, ignore_errors=True)
+        return [workspace.job_id for workspace in evicted]
+
+    def metrics(self) -> Dict[str, int]:
+        """
+        Report the number and disk usage of the workspaces.
+
+        Returns:
+            Dictionary of metrics
+        """
+        with self._lock:
+            workspaces = list(self._workspaces.values())
+            evicted_count, evicted_bytes = self.evicted_count, self.evicted_bytes
+        return {
+            'workspaces': len(workspaces),
+            'active': sum(1 for w in workspaces if not w.finished),
+            'finished': sum(1 for w in workspaces if w.finished),
+            'finished_bytes': sum(w.size for w in workspaces if w.finished),
+            'quota_bytes': self.quota_bytes,
+            'evicted': evicted_count,
+            'evicted_bytes': evicted_bytes,
+        }
+
+    def _reap_forever(self):
+        while not self._stop.wait(self.reap_interval):
+            try:
+                evicted = self.reap()
+            except Exception as e:
+                print(f"Warning: Could not clean up workspaces: {e}")
+                continue
+            if evicted:
+                metrics = self.metrics()
+                print(f"Evicted {len(evicted)} workspaces; {metrics['finished']} finished workspaces "
+                      f"use {metrics['finished_bytes']} bytes")
+
+    def start_reaper(self):
+        """Start evicting workspaces in a background thread."""
+        if self._reaper is not None and self._reaper.is_alive():
+            return
+        self._stop.clear()
+        self._reaper = threading.Thread(target=self._reap_forever, name="workspace-reaper", daemon=True)
+        self._reaper.start()
+
+    def stop_reaper(self):
+        """Stop the background reaper, waiting for it to finish."""
+        self._stop.set()
+        if self._reaper is not None:
+            self._reaper.join()
+            self._reaper = None
@@ -0,0 +1,57 @@
+"""
+Tests for the benchmark suite and its synthetic corpus generator.
+"""
+import os
+import sys
+import json
+import pytest
+from pathlib import Path
+
+# Always use relative imports for testing
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.notebook_cat import core
+from benchmarks.corpus import JSON_SHAPES, generate_corpus, parse_mix
+from benchmarks import run_benchmarks
+
+def _snapshot(corpus):
+    return [(f.path.relative_to(corpus.directory), f.path.read_bytes()) for f in corpus.files]
+
+def test_corpus_is_deterministic(tmp_path):
+    """Test that the same settings and seed produce identical files."""
+    first = generate_corpus(tmp_path / "a", files=30, seed=7, mean_words=200, subdirectories=3)
+    second = generate_corpus(tmp_path / "b", files=30, seed=7, mean_words=200, subdirectories=3)
+    other = generate_corpus(tmp_path / "c", files=30, seed=8, mean_words=200, subdirectories=3)
+
+    assert _snapshot(first) == _snapshot(second)
+    assert _snapshot(first) != _snapshot(other)
+    assert len({f.path.parent for f in first.files}) == 3
+
+@pytest.mark.parametrize("shape", sorted(JSON_SHAPES))
+def test_corpus_word_counts_match_core(tmp_path, shape):
+    """Test that generated files hold the number of words the corpus reports."""
+    corpus = generate_corpus(tmp_path, files=12, seed=1, mean_words=150, distribution="uniform",
+                             mix=parse_mix("txt=1,md=1,json=2"), json_shape=shape)
+    for f in corpus.files:
+        assert core.count_words_in_file(f.path, JSON_SHAPES[shape]) == f.words
+
+def test_parse_mix_rejects_unsupported_types():
+    """Test parsing of file type mixes."""
+    assert parse_mix("txt=2, json") == {"txt": 2, "json": 1}
+    with pytest.raises(ValueError):
+        parse_mix("pdf=1")
+    with pytest.raises(ValueError):
+        parse_mix("txt=0")
+
+def test_run_benchmarks_reports_throughput(tmp_path, capsys):
+    """Test a small benchmark run end to end."""
+    output = tmp_path / "results.json"
+    run_benchmarks.main(["--files", "20", "--mean-words", "100", "--repeat", "1",
+                         "--only", "count_words_in_file,group_files,concatenate_files,process_directory",
+                         "--corpus-dir", str(tmp_path / "corpus"), "--json", str(output)])
+
+    assert "count_words_in_file" in capsys.readouterr().out
+    with open(output, 'r', encoding='utf-8') as f:
+        results = json.load(f)["results"]
+    assert [r["name"] for r in results] == ["count_words_in_file", "group_files",
+                                             "concatenate_files", "process_directory"]
+    assert all(r["files"] == 20 and r["files_per_second"] > 0 and r["mb_per_second"] > 0 for r in results)
@@ -0,0 +1,122 @@
+"""
+Tests for reading compressed input files.
+"""
+import bz2
+import gzip
+import json
+import lzma
+import os
+import sys
+import pytest
+from pathlib import Path
+
+# Always use relative imports for testing
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.notebook_cat import core
+from src.notebook_cat.compression import available, compression_of, file_extension
+
+COMPRESSORS = {"gz": gzip.compress, "bz2": bz2.compress, "xz": lzma.compress}
+
+@pytest.mark.parametrize("name, extension, compression", [
+    ("notes.txt", "txt", None),
+    ("notes.txt.gz", "txt", "gzip"),
+    ("data.JSON.XZ", "json", "xz"),
+    ("readme.md.bz2", "md", "bz2"),
+    ("archive.zst", "", "zstd"),
+    ("archive.tar", "tar", None),
+])
+def test_file_extension(name, extension, compression):
+    """Test that the compression suffix is recognised and stripped."""
+    assert file_extension(Path(name)) == extension
+    assert compression_of(Path(name)) == compression
+
+@pytest.mark.parametrize("suffix", sorted(COMPRESSORS))
+def test_compressed_files_match_plain_files(tmp_path, suffix):
+    """Test that compressed files are found, counted and written like their plain originals."""
+    texts = {
+        "a.txt": "Héllo wörld,\r\nthis is a test.\n",
+        "b.md": "# Title\n\nSome *markdown* text",
+        "c.json": json.dumps({"segments": [{"text": "first part"}, {"text": "second"}]}),
+    }
+    plain, compressed = tmp_path / "plain", tmp_path / "compressed"
+    plain.mkdir()
+    compressed.mkdir()
+    for name, text in texts.items():
+        (plain / name).write_bytes(text.encode("utf-8"))
+        (compressed / f"{name}.{suffix}").write_bytes(COMPRESSORS[suffix](text.encode("utf-8")))
+
+    found = core.get_files_by_extensions(compressed, {"txt", "md", "json"})
+    assert [f.name for f in found] == [f"{name}.{suffix}" for name in sorted(texts)]
+    for name in texts:
+        assert core.count_words_in_file(compressed / f"{name}.{suffix}", "segments.*.text") == \
+            core.count_words_in_file(plain / name, "segments.*.text")
+    assert core.extract_text_from_json(compressed / f"c.json.{suffix}", "segments.*.text") == "first part\n\nsecond"
+
+    for directory in (plain, compressed):
+        files = sorted(directory.iterdir())
+        assert core.concatenate_files([(f, 1) for f in files], tmp_path / f"{directory.name}.txt")
+    expected = (tmp_path / "plain.txt").read_text(encoding="utf-8")
+    for name in texts:
+        expected = expected.replace(f"FILE: {name} ", f"FILE: {name}.{suffix} ")
+    assert (tmp_path / "compressed.txt").read_text(encoding="utf-8") == expected
+
+def test_compressed_input_files_and_content_store(tmp_path):
+    """Test that explicit compressed files are accepted and their text retained for writing."""
+    filepath = tmp_path / "talk.txt.gz"
+    filepath.write_bytes(gzip.compress(b"one two three"))
+    (tmp_path / "skip.tar.gz").write_bytes(gzip.compress(b"other"))
+    entries = core.collect_files([filepath, tmp_path / "skip.tar.gz"], {"txt"})
+    assert [entry.path for entry in entries] == [filepath]
+
+    written = core.process_files([filepath], str(tmp_path / "output"), content_budget=1024 * 1024)
+    assert written == ["notebooklm_source_1.txt"]
+    assert "one two three" in (tmp_path / "output" / "notebooklm_source_1.txt").read_text()
+
+def test_corrupt_compressed_file(tmp_path, capsys):
+    """Test that a corrupt compressed file is reported instead of stopping the run."""
+    filepath = tmp_path / "broken.txt.gz"
+    filepath.write_bytes(gzip.compress(b"some words")[:-12])
+    assert core.count_words_in_file(filepath) == 0
+    assert "Error reading or counting words" in capsys.readouterr().out
+
+@pytest.mark.skipif(available("zstd"), reason="Zstandard support is installed")
+def test_zstd_without_support(tmp_path, capsys):
+    """Test that .zst files explain how to enable Zstandard support."""
+    filepath = tmp_path / "notes.txt.zst"
+    filepath.write_bytes(b"\x28\xb5\x2f\xfd")
+    assert core.count_words_in_file(filepath) == 0
+    assert "pip install zstandard" in capsys.readouterr().out
+
+@pytest.mark.skipif(not available("zstd"), reason="Zstandard support is not installed")
+def test_zstd(tmp_path):
+    """Test reading Zstandard-compressed files."""
+    try:
+        from compression import zstd
+        compress = zstd.compress
+    except ImportError:
+        import zstandard
+        compress = zstandard.ZstdCompressor().compress
+    filepath = tmp_path / "notes.md.zst"
+    filepath.write_bytes(compress("zstd words here".encode("utf-8")))
+    assert core.count_words_in_file(filepath) == 3
+    assert core.concatenate_files([(filepath, 3)], tmp_path / "out.txt")
+    assert "zstd words here" in (tmp_path / "out.txt").read_text()
+
+def test_zip_entries_of_compressed_files_use_zip64(tmp_path, monkeypatch):
+    """Test that ZIP64 headers are chosen for sources whose decompressed size is unknown."""
+    import zipfile
+    (tmp_path / "plain.txt").write_text("plain words")
+    (tmp_path / "packed.txt.gz").write_bytes(gzip.compress(b"packed words"))
+    forced = []
+    original_open = zipfile.ZipFile.open
+    def recording_open(self, name, mode="r", *args, **kwargs):
+        if mode == "w":
+            forced.append((name, kwargs.get("force_zip64", False)))
+        return original_open(self, name, mode, *args, **kwargs)
+    monkeypatch.setattr(zipfile.ZipFile, "open", recording_open)
+
+    groups = [[(tmp_path / "plain.txt", 2)], [(tmp_path / "packed.txt.gz", 2)]]
+    assert core.write_groups_to_zip(groups, tmp_path / "out.zip") == [True, True]
+    assert forced == [("notebooklm_source_1.txt", False), ("notebooklm_source_2.txt", True)]
+    with zipfile.ZipFile(tmp_path / "out.zip") as archive:
+        assert "packed words" in archive.read("notebooklm_source_2.txt").decode("utf-8")
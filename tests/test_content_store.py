@@ -0,0 +1,118 @@
+"""
+Tests for retaining file contents between counting and concatenation.
+"""
+import os
+import sys
+import builtins
+import tempfile
+import pytest
+from pathlib import Path
+
+# Always use relative imports for testing
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.notebook_cat import core
+from src.notebook_cat.content_store import ContentStore
+
+@pytest.fixture
+def temp_dir():
+    """Create a temporary directory for test files."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+def test_content_store_keeps_small_content_in_memory():
+    """Test that content within the budget is kept in memory."""
+    store = ContentStore(memory_budget=100)
+    store.put(Path("a.txt"), "hello world")
+    
+    assert Path("a.txt") in store
+    assert store.memory_used == sys.getsizeof("hello world")
+    assert store.spilled_bytes == 0
+    assert "".join(store.pop_chunks(Path("a.txt"))) == "hello world"
+    assert store.memory_used == 0
+    assert store.pop_chunks(Path("a.txt")) is None
+    store.close()
+
+def test_content_store_spills_beyond_budget(monkeypatch):
+    """Test that content beyond the budget is spilled and read back intact."""
+    from src.notebook_cat import content_store
+    monkeypatch.setattr(content_store, "SPILL_READ_SIZE", 5)
+    
+    text = "café 日本語 \U0001f431 end"
+    store = ContentStore(memory_budget=sys.getsizeof(text[:3]))
+    writer = store.writer(Path("b.txt"))
+    writer.write(text[:3])
+    writer.write(text[3:])
+    writer.commit()
+    
+    assert store.memory_used == sys.getsizeof(text[:3])
+    assert store.spilled_bytes > 0
+    assert "".join(store.pop_chunks(Path("b.txt"))) == text
+    store.close()
+
+def test_content_store_budget_counts_bytes():
+    """Test that the budget limits the memory used, not the number of characters."""
+    store = ContentStore(memory_budget=sys.getsizeof("x" * 1000))
+    store.put(Path("ascii.txt"), "x" * 1000)
+    assert store.spilled_bytes == 0
+    store.close()
+    
+    # The same number of characters outside Latin-1 takes more memory, so it is spilled
+    store = ContentStore(memory_budget=sys.getsizeof("x" * 1000))
+    store.put(Path("cjk.txt"), "日" * 1000)
+    assert store.memory_used == 0
+    assert store.spilled_bytes == len("日".encode("utf-8")) * 1000
+    assert "".join(store.pop_chunks(Path("cjk.txt"))) == "日" * 1000
+    store.close()
+
+def test_process_directory_reads_each_file_once(temp_dir, monkeypatch):
+    """Test that input files are opened once when contents are retained."""
+    input_dir = temp_dir / "input"
+    input_dir.mkdir()
+    (input_dir / "a.txt").write_text("alpha beta gamma", encoding="utf-8")
+    (input_dir / "b.md").write_text("# Title\nbody text", encoding="utf-8")
+    (input_dir / "c.json").write_text('{"text": "json words here"}', encoding="utf-8")
+    
+    # Reference output without retention
+    core.process_directory(str(input_dir), str(temp_dir / "reference"))
+    
+    opened = []
+    real_open = builtins.open
+    def tracking_open(file, *args, **kwargs):
+        if str(file).startswith(str(input_dir)):
+            opened.append(str(file))
+        return real_open(file, *args, **kwargs)
+    monkeypatch.setattr(builtins, "open", tracking_open)
+    
+    core.process_directory(str(input_dir), str(temp_dir / "output"), content_budget=8)
+    monkeypatch.setattr(builtins, "open", real_open)
+    
+    assert sorted(opened) == sorted(str(p) for p in input_dir.iterdir())
+    expected = (temp_dir / "reference" / "notebooklm_source_1.txt").read_text(encoding="utf-8")
+    actual = (temp_dir / "output" / "notebooklm_source_1.txt").read_text(encoding="utf-8")
+    assert actual == expected
+
+@pytest.mark.parametrize("content_budget", [1024 * 1024, 1])
+def test_unwritten_files_are_not_retained(temp_dir, monkeypatch, content_budget):
+    """Test that files over the word limit or left ungrouped are dropped from the store."""
+    monkeypatch.setattr(core, "COUNT_CHUNK_SIZE", 64)
+    input_dir = temp_dir / "input"
+    input_dir.mkdir()
+    (input_dir / "a.txt").write_text("a " * 6, encoding="utf-8")
+    (input_dir / "b.txt").write_text("b " * 6, encoding="utf-8")  # No room left for it
+    (input_dir / "big.txt").write_text("big " * 5000, encoding="utf-8")  # Over the word limit
+    
+    stores = []
+    class RecordingStore(ContentStore):
+        def close(self):
+            stores.append((sorted(self._entries), self.memory_used, self.spilled_bytes))
+            super().close()
+    monkeypatch.setattr(core, "ContentStore", RecordingStore)
+    
+    written = core.process_directory(str(input_dir), str(temp_dir / "output"), source_limit=1, word_limit=10,
+                                     content_budget=content_budget)
+    assert written == ["notebooklm_source_1.txt"]
+    entries, memory_used, spilled_bytes = stores[0]
+    assert entries == [] and memory_used == 0
+    # At most the blocks read before the large file was known to be too large
+    assert spilled_bytes <= len("a " * 6) + len("b " * 6) + 2 * 64
+    assert "a a a" in (temp_dir / "output" / "notebooklm_source_1.txt").read_text(encoding="utf-8")
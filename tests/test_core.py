@@ -52,6 +52,70 @@ def test_count_words_nonexistent_file(temp_dir):
     # A better approach might be to raise an exception, which we could test with pytest.raises
     assert core.count_words_in_file(filepath) == 0 
 
+def test_count_words_in_stream_matches_split():
+    """Test that block-wise counting matches str.split() for any block size."""
+    import io
+    import random
+    
+    rng = random.Random(42)
+    pieces = ["word", "straddling", "\u00e9t\u00e9", " ", "\n", "\t", "\u3000", "\u00a0", "\r\n", "x"]
+    text = "".join(rng.choice(pieces) for _ in range(2000))
+    
+    for chunk_size in (1, 2, 3, 7, 64, 4096):
+        stream = io.StringIO(text)
+        assert core.count_words_in_stream(stream, chunk_size) == len(text.split())
+
+def test_count_words_in_stream_word_across_blocks(temp_dir):
+    """Test that a word split across read blocks is counted once."""
+    filepath = temp_dir / "blocks.txt"
+    filepath.write_text("alpha betagamma delta", encoding="utf-8")
+    
+    with open(filepath, "r", encoding="utf-8") as f:
+        assert core.count_words_in_stream(f, 8) == 3
+    assert core.count_words_in_file(filepath) == 3
+
+
+# === Tests for count_words_in_files ===
+
+@pytest.mark.parametrize("executor", ["process", "thread"])
+def test_count_words_in_files_parallel_keeps_order(temp_dir, executor):
+    """Test that parallel counting returns counts in input order."""
+    files = []
+    for i in range(12):
+        filepath = temp_dir / f"file{i:02d}.txt"
+        filepath.write_text(" ".join(["word"] * (i + 1)), encoding="utf-8")
+        files.append(filepath)
+    
+    sequential = core.count_words_in_files(files)
+    parallel = core.count_words_in_files(files, jobs=3, executor=executor)
+    
+    assert sequential == [i + 1 for i in range(12)]
+    assert parallel == sequential
+
+def test_count_words_in_files_invalid_arguments(temp_dir):
+    """Test that invalid worker settings are rejected."""
+    with pytest.raises(ValueError):
+        core.count_words_in_files([temp_dir / "a.txt"], executor="fiber")
+    with pytest.raises(ValueError):
+        core.count_words_in_files([temp_dir / "a.txt"], jobs=-2)
+    with pytest.raises(ValueError):
+        core.count_words_in_files([temp_dir / "a.txt"], engine="abacus")
+
+def test_process_directory_jobs_does_not_change_groups(temp_dir):
+    """Test that the summary report is identical regardless of worker count."""
+    input_dir = temp_dir / "input"
+    input_dir.mkdir()
+    for i in range(20):
+        (input_dir / f"doc{i:02d}.txt").write_text(" ".join(["w"] * (i * 7 % 13 + 1)), encoding="utf-8")
+    
+    summaries = []
+    for jobs in (1, 4):
+        output_dir = temp_dir / f"output{jobs}"
+        core.process_directory(str(input_dir), str(output_dir), dry_run=True, jobs=jobs)
+        summaries.append((output_dir / "notebook_cat_summary.txt").read_text(encoding="utf-8"))
+    
+    assert summaries[0] == summaries[1]
+
 
 # === Tests for group_files ===
 
@@ -270,4 +334,96 @@ def test_concatenate_files_read_error(temp_dir, capsys):
     captured = capsys.readouterr()
     assert f"Error reading file {file2_path}" in captured.out
 
+def _expected_concatenation(entries):
+    """Build the expected output for (path, words, text) entries."""
+    return "".join(
+        f"--- START FILE: {path.name} ({words} words) ---\n\n{text}\n\n--- END FILE: {path.name} ---\n\n"
+        for path, words, text in entries
+    )
+
+def test_concatenate_files_copies_bytes(temp_dir, monkeypatch):
+    """Test that inputs are copied as bytes with newlines translated as text mode would."""
+    # Small blocks so multi-byte characters and "\r\n" are split between blocks
+    monkeypatch.setattr(core, "COUNT_CHUNK_SIZE", 3)
+    plain = temp_dir / "plain.txt"
+    plain.write_bytes("naïve café — ünïcödé text\n".encode("utf-8") * 50)
+    crlf = temp_dir / "crlf.txt"
+    crlf.write_bytes(b"line one\r\nline two\r\nold mac\rend\r")
+    empty = temp_dir / "empty.txt"
+    empty.write_bytes(b"")
+    output_path = temp_dir / "output_bytes.txt"
+
+    core.concatenate_files([(plain, 200), (crlf, 7), (empty, 0)], output_path)
+
+    expected = _expected_concatenation([
+        (plain, 200, "naïve café — ünïcödé text\n" * 50),
+        (crlf, 7, "line one\nline two\nold mac\nend\n"),  # Newlines translated as before
+        (empty, 0, ""),
+    ])
+    assert output_path.read_bytes() == expected.encode("utf-8")
+
+def test_concatenate_files_reads_inputs_once(temp_dir, monkeypatch):
+    """Test that each input file is opened and read a single time."""
+    file_path = temp_dir / "once.txt"
+    file_path.write_text("Read only once. " * 100, encoding="utf-8")
+    opened = []
+    def recording_open(path, *args, **kwargs):
+        opened.append(Path(path).name)
+        return open(path, *args, **kwargs)
+    monkeypatch.setattr(core, "open", recording_open, raising=False)
+
+    output_path = temp_dir / "output_once.txt"
+    core.concatenate_files([(file_path, 300)], output_path)
+    assert opened == ["output_once.txt.part", "once.txt"]
+    assert output_path.read_text(encoding="utf-8") == \
+        _expected_concatenation([(file_path, 300, "Read only once. " * 100)])
+
+def test_concatenate_files_invalid_utf8_after_valid_blocks(temp_dir, monkeypatch, capsys):
+    """Test that the part of a file written before invalid UTF-8 is found is removed again."""
+    monkeypatch.setattr(core, "COUNT_CHUNK_SIZE", 4)
+    good = temp_dir / "good.txt"
+    good.write_text("fine", encoding="utf-8")
+    bad = temp_dir / "bad.txt"
+    bad.write_bytes(b"valid start, then " + "café".encode("latin-1"))
+    output_path = temp_dir / "output_partial.txt"
+
+    core.concatenate_files([(good, 1), (bad, 4)], output_path)
+
+    assert output_path.read_text(encoding="utf-8") == \
+        _expected_concatenation([(good, 1, "fine")]) + f"--- ERROR: Could not read file {bad.name} ---\n\n"
+    assert f"Error reading file {bad}" in capsys.readouterr().out
+
+def test_concatenate_files_invalid_utf8(temp_dir, capsys):
+    """Test that files that are not UTF-8 are still reported as unreadable."""
+    file_path = temp_dir / "latin1.txt"
+    file_path.write_bytes("café".encode("latin-1"))
+    output_path = temp_dir / "output_latin1.txt"
+
+    core.concatenate_files([(file_path, 1)], output_path)
+
+    assert output_path.read_text(encoding="utf-8") == f"--- ERROR: Could not read file {file_path.name} ---\n\n"
+    assert f"Error reading file {file_path}" in capsys.readouterr().out
+
 # TODO: Add more tests for group_files, concatenate_files
+
+@pytest.mark.parametrize("options", [{}, {"memory_budget": 64 * 1024 * 1024}])
+def test_process_directory_output_inside_input(temp_dir, options):
+    """Test that a recursive run does not read the outputs of earlier runs as input."""
+    input_dir = temp_dir / "input"
+    (input_dir / "sub").mkdir(parents=True)
+    (input_dir / "a.txt").write_text("one two three")
+    (input_dir / "sub" / "b.md").write_text("four five")
+    output_dir = input_dir / "output"
+
+    first = core.process_directory(str(input_dir), str(output_dir), recursive=True, **options)
+    summary = (output_dir / "notebook_cat_summary.txt").read_text()
+    second = core.process_directory(str(input_dir), str(output_dir), recursive=True, **options)
+
+    assert first == second == ["notebooklm_source_1.txt"]
+    assert (output_dir / "notebook_cat_summary.txt").read_text() == summary
+    assert "Total files processed: 2" in summary
+    # Given with another spelling, the output directory is still recognised
+    third = core.process_directory(str(input_dir), str(input_dir / "sub" / ".." / "output"), recursive=True,
+                                   **options)
+    assert third == first
+    assert (output_dir / "notebook_cat_summary.txt").read_text() == summary
@@ -5,6 +5,7 @@ import pytest
 import tempfile
 import os
 import json
+import re
 from pathlib import Path
 import sys
 
@@ -58,22 +59,21 @@ def test_extract_default_text_from_json_nested_objects():
     assert "First record text" in result
     assert "Second record text" in result
 
-def test_extract_text_from_json_file_size_limit(temp_dir):
-    """Test file size limit check in extract_text_from_json."""
-    # Create a large JSON file that exceeds the limit
+def test_extract_text_from_json_large_file_is_streamed(temp_dir):
+    """Test that JSON files above the streaming threshold are still extracted."""
+    # Create a JSON file and pretend it is larger than the streaming threshold
     json_path = temp_dir / "large.json"
     
-    # Create a string that's larger than 50MB
-    large_string = "x" * (60 * 1024 * 1024)  # 60MB string
+    large_string = "x" * 1000
     
     with open(json_path, 'w', encoding='utf-8') as f:
-        f.write('{"text": "' + large_string[:1000] + '"}')  # Write first 1000 chars to make it valid JSON
+        f.write('{"text": "' + large_string + '"}')
     
     # Monkey patch the file size check - we don't want to actually create a huge file
     orig_stat = Path.stat
     try:
-        def mock_stat(self):
-            result = orig_stat(self)
+        def mock_stat(self, *args, **kwargs):
+            result = orig_stat(self, *args, **kwargs)
             if self.name == "large.json":
                 class MockStat:
                     st_size = 60 * 1024 * 1024  # Pretend it's 60MB
@@ -82,9 +82,10 @@ def test_extract_text_from_json_file_size_limit(temp_dir):
         
         Path.stat = mock_stat
         
-        # Should return empty string due to size limit
+        # Large files are parsed incrementally instead of being skipped
         result = core.extract_text_from_json(json_path)
-        assert result == ""
+        assert result == large_string
+        assert core.count_words_in_file(json_path) == 1
     finally:
         # Restore the original stat method
         Path.stat = orig_stat
@@ -218,10 +219,12 @@ def test_process_directory_with_resume(temp_dir):
     
     # Check that only file2.txt was processed
     # (since file1.txt was already marked as processed in the resume state)
-    files_created = list(output_dir.glob("*.txt"))
-    # There should be exactly one output file excluding the resume marker
-    output_files = [f for f in files_created if f.name != core.RESUME_MARKER_FILE]
-    assert len(output_files) == 1
+    files_created = list(output_dir.glob("notebooklm_source_*.txt"))
+    # Its group is numbered after the group that was already written
+    assert [f.name for f in files_created] == ["notebooklm_source_2.txt"]
+    content = files_created[0].read_text(encoding='utf-8')
+    assert "file2.txt" in content
+    assert "file1.txt" not in content
 
 def test_process_directory_dry_run(temp_dir):
     """Test process_directory with dry_run option."""
@@ -279,3 +282,430 @@ def test_process_directory_with_max_files(temp_dir):
         content = f.read()
     # Only 2 files should be processed due to max_files limit
     assert "Total files processed: 2" in content
+
+def test_process_directory_word_count_cache(temp_dir, capsys):
+    """Test that unchanged files are served from the word count cache."""
+    input_dir = temp_dir / "input"
+    output_dir = temp_dir / "output"
+    input_dir.mkdir()
+    
+    (input_dir / "file1.txt").write_text("one two three")
+    (input_dir / "file2.txt").write_text("four five")
+    
+    core.process_directory(str(input_dir), str(output_dir), dry_run=True, use_cache=True)
+    assert (output_dir / core.COUNT_CACHE_FILE).exists()
+    assert "0 hits, 2 misses" in capsys.readouterr().out
+    
+    # Change one file; only that file should be counted again
+    (input_dir / "file2.txt").write_text("four five six seven")
+    core.process_directory(str(input_dir), str(output_dir), dry_run=True, use_cache=True)
+    assert "1 hits, 1 misses" in capsys.readouterr().out
+    
+    with open(output_dir / "notebook_cat_summary.txt", 'r', encoding='utf-8') as f:
+        assert "Total words processed: 7" in f.read()
+    
+    # Clearing the cache forces every file to be counted again
+    core.process_directory(str(input_dir), str(output_dir), dry_run=True,
+                           use_cache=True, clear_cache=True)
+    assert "0 hits, 2 misses" in capsys.readouterr().out
+
+def test_word_count_cache_keyed_by_json_path(temp_dir):
+    """Test that cache entries depend on the file fingerprint and JSON path."""
+    from src.notebook_cat.cache import WordCountCache, file_fingerprint
+    
+    filepath = temp_dir / "doc.json"
+    filepath.write_text('{"text": "a b c"}')
+    fingerprint = file_fingerprint(filepath)
+    db_path = temp_dir / "cache.sqlite"
+    
+    cache = WordCountCache(db_path)
+    cache.put(filepath, fingerprint, 3)
+    cache.close()
+    
+    cache = WordCountCache(db_path)
+    assert cache.get(filepath, fingerprint) == 3
+    assert cache.get(filepath, (fingerprint[0] + 1, fingerprint[1])) is None
+    cache.close()
+    
+    other_path_cache = WordCountCache(db_path, json_path="segments")
+    assert other_path_cache.get(filepath, fingerprint) is None
+    other_path_cache.close()
+
+def test_write_groups_parallel_matches_sequential(temp_dir):
+    """Test that writing groups in parallel gives the same files and resume state."""
+    input_dir = temp_dir / "input"
+    input_dir.mkdir()
+    groups = []
+    for g in range(6):
+        group = []
+        for f in range(3):
+            path = input_dir / f"g{g}_f{f}.txt"
+            path.write_text(f"group {g} file {f} " * 50)
+            group.append((path, 200))
+        groups.append(group)
+    
+    outputs = {}
+    for jobs in (1, 4):
+        output_dir = temp_dir / f"output_{jobs}"
+        output_dir.mkdir()
+        assert core.write_groups(groups, output_dir, jobs=jobs) == [True] * len(groups)
+        outputs[jobs] = {p.name: p.read_bytes() for p in output_dir.iterdir()
+                         if p.name.startswith("notebooklm_source_")}
+        assert core.load_resume_state(output_dir) == (6, {str(p) for group in groups for p, _ in group})
+    
+    assert sorted(outputs[1]) == [f"notebooklm_source_{i}.txt" for i in range(1, 7)]
+    assert outputs[1] == outputs[4]
+
+def test_write_groups_resume_state_stops_at_failed_group(temp_dir, monkeypatch):
+    """Test that a group that fails to write is not marked as done, nor any after it."""
+    input_dir = temp_dir / "input"
+    output_dir = temp_dir / "output"
+    input_dir.mkdir()
+    output_dir.mkdir()
+    groups = []
+    for g in range(4):
+        path = input_dir / f"file{g}.txt"
+        path.write_text(f"content {g}")
+        groups.append([(path, 2)])
+    
+    original_concatenate = core.concatenate_files
+    def failing_concatenate(group, output_filepath, content_store=None, display_names=None):
+        if output_filepath.name == "notebooklm_source_4.txt":
+            return False
+        return original_concatenate(group, output_filepath, content_store, display_names)
+    monkeypatch.setattr(core, "concatenate_files", failing_concatenate)
+    
+    # Numbering continues after two groups written by an earlier run
+    written = core.write_groups(groups, output_dir, first_number=3, jobs=3)
+    
+    assert written == [True, False, True, True]
+    groups_processed, files_processed = core.load_resume_state(output_dir)
+    assert groups_processed == 3
+    assert files_processed == {str(input_dir / "file0.txt")}
+    # Later groups are still written, and no partial files are left behind
+    assert (output_dir / "notebooklm_source_5.txt").exists()
+    assert not list(output_dir.glob("*.part"))
+
+def test_process_directory_incremental(temp_dir, monkeypatch, capsys):
+    """Test that an incremental run only rewrites sources whose inputs changed."""
+    monkeypatch.setattr(core, "WORD_LIMIT", 10)
+    input_dir = temp_dir / "input"
+    output_dir = temp_dir / "output"
+    input_dir.mkdir()
+    for name in ("a", "b", "c", "d"):
+        (input_dir / f"{name}.txt").write_text(f"{name} " * 6)
+    
+    core.process_directory(str(input_dir), str(output_dir), source_limit=10)
+    assert (output_dir / core.MANIFEST_FILE).exists()
+    sources = {p.name: p.read_text() for p in output_dir.glob("notebooklm_source_*.txt")}
+    assert len(sources) == 4
+    source_of = {name: next(s for s, text in sources.items() if f"{name}.txt" in text)
+                 for name in ("a", "b", "c", "d")}
+    
+    # Change one file, delete another and add three
+    (input_dir / "b.txt").write_text("b " * 7)
+    os.utime(input_dir / "b.txt", ns=(1, 1))
+    (input_dir / "c.txt").unlink()
+    (input_dir / "e.txt").write_text("e e")
+    (input_dir / "f.txt").write_text("f " * 8)
+    (input_dir / "g.txt").write_text("g " * 9)
+    untouched = output_dir / source_of["a"]
+    os.utime(untouched, ns=(1, 1))
+    capsys.readouterr()
+    
+    core.process_directory(str(input_dir), str(output_dir), source_limit=10, incremental=True)
+    out = capsys.readouterr().out
+    
+    # New and changed files go first into the sources of b and c, which are rewritten
+    # anyway, then into a new source; a's and d's sources are left as they are
+    assert untouched.stat().st_mtime_ns == 1
+    assert "Untouched sources (2)" in out
+    assert "Changed sources (2)" in out
+    assert "New sources (1): 5" in out
+    rewritten = "".join((output_dir / name).read_text()
+                        for name in (source_of["b"], source_of["c"], "notebooklm_source_5.txt"))
+    for expected in ("b.txt (7 words)", "e.txt (2 words)", "f.txt (8 words)", "g.txt (9 words)"):
+        assert rewritten.count(expected) == 1
+    
+    # A source whose files are all deleted is removed
+    for name in re.findall(r"START FILE: (\S+)", (output_dir / "notebooklm_source_5.txt").read_text()):
+        (input_dir / name).unlink()
+    core.process_directory(str(input_dir), str(output_dir), source_limit=10, incremental=True)
+    out = capsys.readouterr().out
+    assert "Removed sources (1): 5" in out
+    assert "Untouched sources (4)" in out
+    assert not (output_dir / "notebooklm_source_5.txt").exists()
+    
+    # Nothing changed since: every source is left as it is
+    core.process_directory(str(input_dir), str(output_dir), source_limit=10, incremental=True)
+    out = capsys.readouterr().out
+    assert "Untouched sources (4)" in out
+    assert "0 source files written" in out
+
+def test_resume_journal_replayed_on_snapshot(temp_dir):
+    """Test that journal records are applied on top of the saved resume state."""
+    from src.notebook_cat.resume import ResumeJournal
+    
+    # A resume state in the original format, e.g. left by an earlier version
+    with open(temp_dir / core.RESUME_MARKER_FILE, 'w', encoding='utf-8') as f:
+        json.dump({'groups_processed': 2, 'files_processed': ["a.txt", "b.txt"]}, f)
+    
+    with ResumeJournal(temp_dir / core.RESUME_JOURNAL_FILE, sync_every=2) as journal:
+        journal.record(3, ["c.txt"])
+        journal.record(4, ["d.txt", "e.txt"])
+    # A record cut short by a crash is ignored
+    with open(temp_dir / core.RESUME_JOURNAL_FILE, 'a', encoding='utf-8') as f:
+        f.write('{"groups_processed": 5, "fil')
+    
+    expected = (4, {"a.txt", "b.txt", "c.txt", "d.txt", "e.txt"})
+    assert core.load_resume_state(temp_dir) == expected
+    
+    # Compaction folds the journal into a state file in the original format
+    core.compact_resume_state(temp_dir)
+    assert not (temp_dir / core.RESUME_JOURNAL_FILE).exists()
+    with open(temp_dir / core.RESUME_MARKER_FILE, 'r', encoding='utf-8') as f:
+        state = json.load(f)
+    assert state['groups_processed'] == 4
+    assert set(state['files_processed']) == expected[1]
+    assert core.load_resume_state(temp_dir) == expected
+    
+    core.clear_resume_state(temp_dir)
+    assert core.load_resume_state(temp_dir) == (0, set())
+
+def test_write_groups_appends_one_record_per_group(temp_dir):
+    """Test that writing groups appends to the journal instead of rewriting the state."""
+    input_dir = temp_dir / "input"
+    output_dir = temp_dir / "output"
+    input_dir.mkdir()
+    output_dir.mkdir()
+    groups = []
+    for g in range(3):
+        path = input_dir / f"file{g}.txt"
+        path.write_text(f"content {g}")
+        groups.append([(path, 2)])
+    
+    core.write_groups(groups, output_dir)
+    
+    assert not (output_dir / core.RESUME_MARKER_FILE).exists()
+    with open(output_dir / core.RESUME_JOURNAL_FILE, 'r', encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    assert records == [{'groups_processed': g + 1, 'files': [str(input_dir / f"file{g}.txt")]}
+                       for g in range(3)]
+
+def test_resume_uses_saved_plan(temp_dir, monkeypatch, capsys):
+    """Test that a resumed run writes the remaining groups of the saved plan without scanning."""
+    monkeypatch.setattr(core, "WORD_LIMIT", 10)
+    input_dir = temp_dir / "input"
+    output_dir = temp_dir / "output"
+    input_dir.mkdir()
+    for name in ("a", "b", "c", "d"):
+        (input_dir / f"{name}.txt").write_text(f"{name} " * 6)
+    
+    original_concatenate = core.concatenate_files
+    def failing_concatenate(group, output_filepath, content_store=None, display_names=None):
+        if output_filepath.name == "notebooklm_source_3.txt":
+            return False
+        return original_concatenate(group, output_filepath, content_store, display_names)
+    monkeypatch.setattr(core, "concatenate_files", failing_concatenate)
+    core.process_directory(str(input_dir), str(output_dir), source_limit=10)
+    assert (output_dir / core.PLAN_FILE).exists()
+    assert not (output_dir / "notebooklm_source_3.txt").exists()
+    
+    # The resumed run must not scan the directory or count words again
+    def unexpected(*args, **kwargs):
+        raise AssertionError("resumed run rescanned the input directory")
+    monkeypatch.setattr(core, "concatenate_files", original_concatenate)
+    monkeypatch.setattr(core, "scan_files", unexpected)
+    monkeypatch.setattr(core, "scan_table", unexpected)
+    monkeypatch.setattr(core, "count_words_with_cache", unexpected)
+    capsys.readouterr()
+    core.process_directory(str(input_dir), str(output_dir), source_limit=10, resume=True)
+    
+    assert "Using the saved grouping plan" in capsys.readouterr().out
+    assert sorted(p.name for p in output_dir.glob("notebooklm_source_*.txt")) == [
+        f"notebooklm_source_{n}.txt" for n in range(1, 5)]
+    assert "c.txt" in (output_dir / "notebooklm_source_3.txt").read_text(encoding='utf-8')
+    # Once every group is written the plan is removed and the manifest is complete
+    assert not (output_dir / core.PLAN_FILE).exists()
+    assert not (output_dir / core.RESUME_JOURNAL_FILE).exists()
+    manifest = core.load_manifest(output_dir / core.MANIFEST_FILE)
+    assert all(entries for entries in manifest.sources.values())
+
+def test_resume_ignores_plan_with_different_options(temp_dir, capsys):
+    """Test that a plan made with other options is not reused."""
+    input_dir = temp_dir / "input"
+    output_dir = temp_dir / "output"
+    input_dir.mkdir()
+    output_dir.mkdir()
+    (input_dir / "file1.txt").write_text("This is file 1 content.")
+    settings = core._plan_settings(input_dir, None, {"txt"}, None, 50, None, False, None, None, "first-fit",
+                                   core.WORD_LIMIT)
+    core.save_plan(output_dir / core.PLAN_FILE, core.ResumePlan(settings, [], [], 0, 0))
+    
+    core.process_directory(str(input_dir), str(output_dir), source_limit=20, resume=True)
+    
+    assert "different options" in capsys.readouterr().out
+    assert (output_dir / "notebooklm_source_1.txt").exists()
+
+def test_process_directory_profile_report(temp_dir, capsys):
+    """Test that --profile reports the time, files and bytes of each phase."""
+    input_dir = temp_dir / "input"
+    output_dir = temp_dir / "output"
+    input_dir.mkdir()
+    (input_dir / "file1.txt").write_text("one two three")
+    (input_dir / "file2.md").write_text("four five")
+    (input_dir / "data.json").write_text(json.dumps({"text": "six seven"}))
+    
+    core.process_directory(str(input_dir), str(output_dir), profile=True, cprofile=True)
+    
+    out = capsys.readouterr().out
+    assert "Profile: scan" in out
+    with open(output_dir / core.PROFILE_FILE, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    phases = {phase['name']: phase for phase in report['phases']}
+    assert list(phases) == ["scan", "count", "json", "group", "write", "report"]
+    assert phases["count"]["files"] == 2
+    assert phases["json"]["files"] == 1
+    assert phases["json"]["bytes_read"] == (input_dir / "data.json").stat().st_size
+    assert phases["write"]["bytes_written"] == (output_dir / "notebooklm_source_1.txt").stat().st_size
+    assert all(phase["wall_seconds"] >= 0 and phase["cpu_seconds"] >= 0 for phase in phases.values())
+    assert report['slowest_phase'] in phases
+    assert (output_dir / core.PROFILE_STATS_FILE).exists()
+
+@pytest.mark.parametrize("memory_budget", [0, 64 * 1024 * 1024])
+def test_profile_includes_worker_processes(temp_dir, monkeypatch, memory_budget):
+    """Test that worker processes have finished when a phase is timed, so their CPU time is included."""
+    import multiprocessing
+    from src.notebook_cat import profiling
+    input_dir = temp_dir / "input"
+    output_dir = temp_dir / "output"
+    input_dir.mkdir()
+    for i in range(4):
+        (input_dir / f"file{i}.txt").write_text("one two three " * 100)
+        (input_dir / f"data{i}.json").write_text(json.dumps({"text": "four five"}))
+    
+    live_workers = []
+    original_cpu_time = profiling._cpu_time
+    def recording_cpu_time():
+        live_workers.append(len(multiprocessing.active_children()))
+        return original_cpu_time()
+    monkeypatch.setattr(profiling, "_cpu_time", recording_cpu_time)
+    
+    core.process_directory(str(input_dir), str(output_dir), profile=True, jobs=2, executor="process",
+                           memory_budget=memory_budget)
+    
+    assert live_workers and not any(live_workers)
+    with open(output_dir / core.PROFILE_FILE, 'r', encoding='utf-8') as f:
+        phases = {phase['name']: phase for phase in json.load(f)['phases']}
+    # Low-memory runs count JSON files in the same phase
+    assert phases["count"]["files"] == (8 if memory_budget else 4)
+
+def test_process_directory_without_profile_writes_no_report(temp_dir):
+    """Test that no profile report is written unless requested."""
+    input_dir = temp_dir / "input"
+    output_dir = temp_dir / "output"
+    input_dir.mkdir()
+    (input_dir / "file1.txt").write_text("one two three")
+    
+    core.process_directory(str(input_dir), str(output_dir))
+    
+    assert (output_dir / "notebooklm_source_1.txt").exists()
+    assert not (output_dir / core.PROFILE_FILE).exists()
+
+def test_process_directory_writes_sources_into_zip(temp_dir, monkeypatch):
+    """Test that sources can be written straight into a ZIP archive."""
+    import zipfile
+    monkeypatch.setattr(core, "WORD_LIMIT", 10)
+    input_dir = temp_dir / "input"
+    input_dir.mkdir()
+    for name in ("a", "b", "c"):
+        (input_dir / f"{name}.txt").write_text(f"{name} " * 6)
+    (input_dir / "d.json").write_text(json.dumps({"text": "d " * 6}))
+    
+    core.process_directory(str(input_dir), str(temp_dir / "plain"))
+    zip_path = temp_dir / "archive" / "output.zip"
+    (temp_dir / "archive").mkdir()
+    written = core.process_directory(str(input_dir), str(temp_dir / "archive"), zip_path=str(zip_path))
+    
+    assert written == [f"notebooklm_source_{n}.txt" for n in range(1, 5)]
+    # Nothing but the summary is written next to the archive
+    assert not list((temp_dir / "archive").glob("notebooklm_source_*"))
+    assert not (temp_dir / "archive" / core.PLAN_FILE).exists()
+    with zipfile.ZipFile(zip_path) as archive:
+        assert sorted(archive.namelist()) == sorted(written + ["notebook_cat_summary.txt"])
+        for name in written:
+            assert archive.read(name) == (temp_dir / "plain" / name).read_bytes()
+
+def test_write_groups_to_zip_failure_leaves_no_archive(temp_dir, monkeypatch):
+    """Test that an archive that could not be completed is removed."""
+    path = temp_dir / "file.txt"
+    path.write_text("some words")
+    zip_path = temp_dir / "output.zip"
+    
+    def failing_write(*args, **kwargs):
+        raise OSError("disk full")
+    monkeypatch.setattr(core, "_write_group", failing_write)
+    
+    assert core.write_groups_to_zip([[(path, 2)], [(path, 2)]], zip_path) == [False, False]
+    assert not zip_path.exists()
+    assert not list(temp_dir.glob("*.part"))
+
+def test_process_files_reads_inputs_in_place(temp_dir):
+    """Test processing an explicit list of files with display names."""
+    uploads = temp_dir / "uploads"
+    uploads.mkdir()
+    (uploads / "tmp1a2b.txt").write_text("first upload")
+    (uploads / "tmp3c4d.json").write_text(json.dumps({"text": "second upload"}))
+    (uploads / "tmp5e6f.pdf").write_text("not supported")
+    output_dir = temp_dir / "output"
+    
+    written = core.process_files([(uploads / "tmp1a2b.txt", "notes.txt"),
+                                  (str(uploads / "tmp3c4d.json"), "episode.json"),
+                                  uploads / "tmp5e6f.pdf",
+                                  uploads / "missing.txt"], str(output_dir))
+    
+    assert written == ["notebooklm_source_1.txt"]
+    content = (output_dir / "notebooklm_source_1.txt").read_text(encoding='utf-8')
+    assert "--- START FILE: notes.txt (2 words) ---" in content
+    assert "--- START FILE: episode.json (2 words) ---" in content
+    assert "tmp1a2b" not in content
+    summary = (output_dir / "notebook_cat_summary.txt").read_text(encoding='utf-8')
+    assert "notes.txt" in summary and "episode.json" in summary
+    assert "Total files processed: 2" in summary
+    # Nothing was copied next to the uploads
+    assert sorted(p.name for p in uploads.iterdir()) == ["tmp1a2b.txt", "tmp3c4d.json", "tmp5e6f.pdf"]
+
+def test_process_directory_word_limit_per_run(temp_dir):
+    """Test that runs with different word limits can take place at the same time."""
+    from concurrent.futures import ThreadPoolExecutor
+    input_dir = temp_dir / "input"
+    input_dir.mkdir()
+    for name in ("a", "b", "c", "d"):
+        (input_dir / f"{name}.txt").write_text(f"{name} " * 6)
+    original_limit = core.WORD_LIMIT
+    
+    def run(job):
+        # Each run writes to a directory of its own, as concurrent web jobs do
+        index, word_limit = job
+        output_dir = temp_dir / f"output_{index}"
+        return core.process_directory(str(input_dir), str(output_dir), word_limit=word_limit)
+    
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(run, enumerate([12, 24, 12, 24])))
+    
+    assert [len(written) for written in results] == [2, 1, 2, 1]
+    assert core.WORD_LIMIT == original_limit
+    for index, word_limit in enumerate([12, 24, 12, 24]):
+        summary = (temp_dir / f"output_{index}" / "notebook_cat_summary.txt").read_text(encoding='utf-8')
+        assert f"{word_limit} words (100.0% of capacity)" in summary
+        manifest = core.load_manifest(temp_dir / f"output_{index}" / core.MANIFEST_FILE)
+        assert manifest.word_limit == word_limit
+
+def test_group_files_word_limit_argument(tmp_path):
+    """Test passing the word limit to group_files instead of using WORD_LIMIT."""
+    files_counts = [(tmp_path / "a.txt", 6), (tmp_path / "b.txt", 5), (tmp_path / "c.txt", 11)]
+    
+    groups, ungrouped = core.group_files(files_counts, 5, word_limit=10)
+    
+    assert [[f.name for f, _ in group] for group in groups] == [["a.txt"], ["b.txt"]]
+    assert [f.name for f, _ in ungrouped] == ["c.txt"]
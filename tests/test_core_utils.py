@@ -263,3 +263,46 @@ def test_concatenate_files():
         assert "END FILE: file1.txt" in content
         assert "START FILE: file2.txt" in content
         assert "END FILE: file2.txt" in content
+
+def test_scan_files_single_pass_with_stat(temp_directory, monkeypatch):
+    """Test that all extensions are matched in a single directory listing."""
+    from src.notebook_cat import core
+    
+    scandir_calls = []
+    real_scandir = os.scandir
+    def counting_scandir(path):
+        scandir_calls.append(path)
+        return real_scandir(path)
+    monkeypatch.setattr(core.os, "scandir", counting_scandir)
+    
+    entries = core.scan_files(temp_directory, {"txt", "md", "json"})
+    
+    assert len(scandir_calls) == 1
+    assert len(entries) == 6
+    assert [e.path for e in entries] == sorted(e.path for e in entries)
+    for entry in entries:
+        stat = os.stat(entry.path)
+        assert entry.fingerprint == (stat.st_size, stat.st_mtime_ns)
+
+def test_get_files_by_extensions_recursive_include_exclude(tmp_path):
+    """Test recursive scanning with include and exclude globs."""
+    (tmp_path / "top.txt").write_text("top")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "nested.txt").write_text("nested")
+    (tmp_path / "sub" / "notes.draft.md").write_text("draft")
+    (tmp_path / "archive").mkdir()
+    (tmp_path / "archive" / "old.txt").write_text("old")
+    
+    # Subdirectories are only visited in recursive mode
+    assert get_files_by_extensions(tmp_path, {"txt", "md"}) == [tmp_path / "top.txt"]
+    
+    recursive = get_files_by_extensions(tmp_path, {"txt", "md"}, recursive=True)
+    assert len(recursive) == 4
+    
+    filtered = get_files_by_extensions(tmp_path, {"txt", "md"}, recursive=True,
+                                       exclude=["archive", "*.draft.md"])
+    assert filtered == [tmp_path / "sub" / "nested.txt", tmp_path / "top.txt"]
+    
+    included = get_files_by_extensions(tmp_path, {"txt", "md"}, recursive=True,
+                                       include=["sub/*"])
+    assert included == [tmp_path / "sub" / "nested.txt", tmp_path / "sub" / "notes.draft.md"]
@@ -0,0 +1,68 @@
+"""
+Tests for the compact file record table.
+"""
+import os
+import sys
+import random
+import pytest
+from pathlib import Path
+
+# Always use relative imports for testing
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.notebook_cat import core
+from src.notebook_cat.filetable import FileTable, GroupView, UNGROUPED, SKIPPED
+
+def test_paths_round_trip_with_interned_directories(tmp_path):
+    """Test that paths are stored as shared directories plus names and restored exactly."""
+    paths = [tmp_path / "a" / "one.txt", tmp_path / "a" / "two.md", Path("relative.txt"), Path("/root.txt")]
+    table = FileTable()
+    for size, path in enumerate(paths):
+        table.add(path, size=size, mtime_ns=size * 10)
+
+    assert list(table.paths) == paths
+    assert table.paths[-1] == paths[-1]
+    assert table.directory[0] == table.directory[1]
+    assert table.names == ["one.txt", "two.md", "relative.txt", "root.txt"]
+    assert list(table.fingerprints) == [(0, 0), (1, 10), (2, 20), (3, 30)]
+    with pytest.raises(IndexError):
+        table.paths[len(paths)]
+
+def test_sorted_by_path_matches_path_order():
+    """Test that sorting by path orders paths component by component, like Path objects."""
+    names = ["a/b.txt", "a-b.txt", "a/c/d.txt", "a.txt", "b/a.txt", "a/b/c.txt", "A.txt"]
+    rng = random.Random(3)
+    rng.shuffle(names)
+    table = FileTable()
+    for name in names:
+        table.add(Path("/data") / name)
+
+    assert list(table.sorted_by_path().paths) == sorted(Path("/data") / name for name in names)
+
+def test_pack_files_matches_group_files():
+    """Test that packing a table records the same groups as group_files returns."""
+    rng = random.Random(5)
+    files_counts = [(Path(f"/data/file{i}.txt"), rng.choice([0, 1, 3, 5, 8, 13, 40])) for i in range(200)]
+    groups, ungrouped = core.group_files(files_counts, 6, word_limit=30)
+
+    table = FileTable.from_pairs(files_counts)
+    core.pack_files(table, 6, word_limit=30)
+
+    assert list(table.group_view()) == groups
+    assert list(table.ungrouped_view()) == ungrouped
+    assert [files for files, _, _ in table.group_totals()] == [len(group) for group in groups]
+    assert set(table.groups) <= set(range(len(groups))) | {UNGROUPED, SKIPPED}
+    assert all(table.groups[row] == SKIPPED for row, (_, count) in enumerate(files_counts) if count == 0)
+
+def test_group_view_slices_and_names():
+    """Test that group views can be sliced and list file names without loading paths."""
+    table = FileTable.from_pairs([(Path("/x/a.txt"), 2), (Path("/x/b.txt"), 1), (Path("/y/c.txt"), 2)])
+    table.set_groups([(0, 0), (2, 1), (1, 1)])
+    view = table.group_view()
+
+    assert len(view) == 2
+    assert view[1] == [(Path("/y/c.txt"), 2), (Path("/x/b.txt"), 1)]
+    assert list(view[1:]) == [view[1]]
+    assert view[1:].names(0) == [("/y/c.txt", "c.txt", 2), ("/x/b.txt", "b.txt", 1)]
+    assert GroupView(view.__getitem__, 2).names(0) == [("/x/a.txt", "a.txt", 2)]
+    with pytest.raises(IndexError):
+        view[2]
@@ -0,0 +1,118 @@
+"""
+Tests for incremental JSON text extraction.
+"""
+import io
+import os
+import sys
+import json
+import random
+import pytest
+import tempfile
+from pathlib import Path
+
+# Always use relative imports for testing
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.notebook_cat import core
+from src.notebook_cat.config.defaults import JSON_TEXT_FIELDS
+from src.notebook_cat.jsonstream import iter_json_events, iter_json_text
+from src.notebook_cat.jsonpath import JsonPath
+
+@pytest.fixture
+def fixture_dir():
+    """Return the path to the fixtures directory."""
+    return Path(__file__).parent / "fixtures"
+
+@pytest.fixture
+def always_stream(monkeypatch):
+    """Force every JSON file through the streaming extraction."""
+    monkeypatch.setattr(core, "JSON_STREAM_THRESHOLD", -1)
+
+def _random_value(rng, depth=0):
+    """Build a random JSON-compatible value with text-like fields."""
+    choice = rng.random()
+    if depth > 3 or choice < 0.3:
+        return rng.choice([
+            "plain words here", "café \"quoted\" \\ back", "", "line\nbreak", 
+            42, -7, 3.5, 1e21, True, False, None,
+        ])
+    if choice < 0.6:
+        return [_random_value(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+    keys = rng.sample(JSON_TEXT_FIELDS + ["title", "segments", "meta", "0"], rng.randint(0, 5))
+    return {key: _random_value(rng, depth + 1) for key in keys}
+
+def _read_events(text, chunk_size):
+    """Rebuild a value from parse events, to compare with json.loads."""
+    events = iter_json_events(io.StringIO(text), chunk_size)
+    def build(event):
+        kind, value = event
+        if kind == 'start_map':
+            result = {}
+            for kind, key in events:
+                if kind == 'end_map':
+                    return result
+                result[key] = build(next(events))
+        if kind == 'start_array':
+            result = []
+            for item in events:
+                if item[0] == 'end_array':
+                    return result
+                result.append(build(item))
+        return value
+    value = build(next(events))
+    for _ in events:
+        pass
+    return value
+
+def test_iter_json_events_matches_json_loads():
+    """Test that the event parser reads documents exactly like json.loads."""
+    rng = random.Random(7)
+    for _ in range(200):
+        text = json.dumps(_random_value(rng), indent=rng.choice([None, 2]))
+        for chunk_size in (1, 3, 64):
+            assert _read_events(text, chunk_size) == json.loads(text)
+
+@pytest.mark.parametrize("text", ['{"a": 1,}', '[1 2]', '{"a" 1}', '[1', '"open', '{} {}', '', '[01]'])
+def test_iter_json_events_rejects_invalid_json(text):
+    """Test that invalid documents raise ValueError."""
+    with pytest.raises(ValueError):
+        _read_events(text, 2)
+
+def test_iter_json_text_matches_in_memory_extraction(tmp_path, monkeypatch):
+    """Test that streamed extraction equals in-memory extraction for random documents."""
+    rng = random.Random(11)
+    filepath = tmp_path / "doc.json"
+    paths = [None, "segments", "0", "text", "segments.0", "meta.segments", "meta.0.text",
+             "*", "*.text", "segments.text", "meta.*.0", "title,segments.*.text", "missing,*.*"]
+    for _ in range(300):
+        filepath.write_text(json.dumps(_random_value(rng)), encoding="utf-8")
+        for json_path in paths:
+            monkeypatch.setattr(core, "JSON_STREAM_THRESHOLD", 50 * 1024 * 1024)
+            expected = core.extract_text_from_json(filepath, json_path)
+            
+            compiled = JsonPath(json_path) if json_path else None
+            opener = lambda: open(filepath, 'r', encoding='utf-8')
+            streamed = "".join(iter_json_text(opener, compiled, JSON_TEXT_FIELDS, chunk_size=5))
+            assert streamed == expected, (filepath.read_text(), json_path)
+
+def test_streamed_fixtures_match(fixture_dir, monkeypatch):
+    """Test the streaming path against the JSON fixtures."""
+    for name, json_path in [("sample.json", None), ("sample.json", "sections.0.text"),
+                            ("transcript.json", None), ("transcript.json", "segments.0.text"),
+                            ("simple_array.json", None), ("sample.json", "nonexistent.field")]:
+        filepath = fixture_dir / name
+        with open(filepath, 'r', encoding='utf-8') as f:
+            content = f.read()
+        expected = core.extract_text_from_json(filepath, json_path)
+        
+        monkeypatch.setattr(core, "JSON_STREAM_THRESHOLD", -1)
+        assert core.extract_text_from_json(filepath, json_path) == expected
+        assert "".join(core.iter_text_from_json_stream(filepath, json_path, content)) == expected
+        assert core.count_words_in_file(filepath, json_path) == len(expected.split())
+        monkeypatch.undo()
+
+def test_streamed_invalid_json_counts_zero(tmp_path, always_stream):
+    """Test that invalid large documents are treated like invalid small ones."""
+    filepath = tmp_path / "broken.json"
+    filepath.write_text('{"text": "some words"} trailing', encoding="utf-8")
+    assert core.extract_text_from_json(filepath) == ""
+    assert core.count_words_in_file(filepath) == 0
@@ -0,0 +1,78 @@
+"""
+Tests for compiled JSON path expressions.
+"""
+import os
+import sys
+import json
+import pickle
+import pytest
+from pathlib import Path
+
+# Always use relative imports for testing
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.notebook_cat import core
+from src.notebook_cat.jsonpath import JsonPath
+
+@pytest.fixture
+def fixture_dir():
+    """Return the path to the fixtures directory."""
+    return Path(__file__).parent / "fixtures"
+
+DOCUMENT = {
+    "title": "Episode",
+    "segments": [
+        {"speaker": "A", "text": "first"},
+        {"speaker": "B"},
+        "not an object",
+        {"speaker": "C", "text": "third"},
+    ],
+    "chapters": {"intro": {"text": "hello"}, "outro": {"text": "bye"}},
+}
+
+def test_json_path_parsing():
+    """Test that expressions are parsed into alternatives of steps."""
+    path = JsonPath(" transcript , segments.*.text")
+    assert path.alternatives == (("transcript",), ("segments", "*", "text"))
+    assert str(path) == "transcript,segments.*.text"
+    assert path == JsonPath("transcript,segments.*.text")
+
+    # Compiling an existing path returns it unchanged
+    assert JsonPath.compile(path) is path
+    assert JsonPath.compile(None) is None
+    assert JsonPath.compile("") is None
+
+@pytest.mark.parametrize("expression", ["", "a..b", "a.", "a,,b", "a/b", "a.b*", "../etc"])
+def test_json_path_rejects_malformed_expressions(expression):
+    """Test that malformed expressions raise ValueError."""
+    with pytest.raises(ValueError):
+        JsonPath(expression)
+
+def test_json_path_find():
+    """Test selection of values with keys, indices, wildcards and alternatives."""
+    assert JsonPath("segments.0.text").find(DOCUMENT) == ["first"]
+    assert JsonPath("segments.*.text").find(DOCUMENT) == ["first", "third"]
+    # A key applied to a list is applied to each item
+    assert JsonPath("segments.text").find(DOCUMENT) == ["first", "third"]
+    assert JsonPath("chapters.*.text").find(DOCUMENT) == ["hello", "bye"]
+    assert JsonPath("segments.9.text").find(DOCUMENT) == []
+    # The first alternative that matches is used
+    assert JsonPath("missing,chapters.intro.text,title").find(DOCUMENT) == ["hello"]
+    assert JsonPath("missing,other").find(DOCUMENT) == []
+
+def test_json_path_is_picklable():
+    """Test that compiled paths can be sent to worker processes."""
+    path = JsonPath("segments.*.text")
+    restored = pickle.loads(pickle.dumps(path))
+    assert restored == path
+    assert restored.find(DOCUMENT) == ["first", "third"]
+
+def test_extract_text_with_wildcard_path(fixture_dir):
+    """Test extracting the text of every segment of a transcript."""
+    json_file = fixture_dir / "transcript.json"
+    with open(json_file, 'r', encoding='utf-8') as f:
+        segments = json.load(f)["segments"]
+    expected = "\n\n".join(segment["text"] for segment in segments)
+
+    assert core.extract_text_from_json(json_file, json_path="segments.*.text") == expected
+    assert core.extract_text_from_json(json_file, json_path=JsonPath("missing,segments.text")) == expected
+    assert core.count_words_in_file(json_file, json_path="segments.*.text") == len(expected.split())
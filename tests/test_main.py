@@ -61,6 +61,8 @@ def test_main_basic_usage(mock_argv, temp_dirs, monkeypatch):
     assert 'md' in call_args['file_extensions']
     assert 'json' in call_args['file_extensions']
     assert call_args['max_files'] is None
+    assert call_args['use_cache'] is True
+    assert call_args['clear_cache'] is False
 
 @patch('sys.argv')
 def test_main_plus_plan(mock_argv, temp_dirs, monkeypatch):
@@ -194,6 +196,180 @@ def test_main_json_path(mock_argv, temp_dirs, monkeypatch):
     call_args = mock_process.call_args[1]
     assert call_args['json_path'] == "content.text"
 
+@patch('sys.argv')
+def test_main_invalid_json_path(mock_argv, temp_dirs, monkeypatch):
+    """Test that a malformed JSON path is rejected before processing."""
+    input_dir, output_dir = temp_dirs
+    
+    mock_argv.__getitem__.side_effect = lambda idx: [
+        "notebook-cat",
+        str(input_dir),
+        str(output_dir),
+        "--json-path", "segments..text"
+    ][idx]
+    
+    mock_process = MagicMock()
+    monkeypatch.setattr("src.notebook_cat.main.core.process_directory", mock_process)
+    
+    with pytest.raises(SystemExit):
+        main.main()
+    mock_process.assert_not_called()
+
+@patch('sys.argv')
+def test_main_parallel_jobs(mock_argv, temp_dirs, monkeypatch):
+    """Test passing the number of counting workers and executor type."""
+    input_dir, output_dir = temp_dirs
+    
+    # Set up mock command line arguments
+    mock_argv.__getitem__.side_effect = lambda idx: [
+        "notebook-cat",
+        str(input_dir),
+        str(output_dir),
+        "--jobs", "8",
+        "--executor", "thread",
+        "--write-jobs", "4"
+    ][idx]
+    
+    # Create a mock for process_directory
+    mock_process = MagicMock()
+    
+    # Apply the mock to the main module
+    monkeypatch.setattr("src.notebook_cat.main.core.process_directory", mock_process)
+    
+    # Run the main function
+    main.main()
+    
+    # Check that process_directory was called with the worker settings
+    call_args = mock_process.call_args[1]
+    assert call_args['jobs'] == 8
+    assert call_args['executor'] == "thread"
+    assert call_args['write_jobs'] == 4
+
+@patch('sys.argv')
+def test_main_profile_options(mock_argv, temp_dirs, monkeypatch):
+    """Test that --cprofile turns on profiling."""
+    input_dir, output_dir = temp_dirs
+    
+    mock_argv.__getitem__.side_effect = lambda idx: [
+        "notebook-cat",
+        str(input_dir),
+        str(output_dir),
+        "--cprofile"
+    ][idx]
+    
+    mock_process = MagicMock()
+    monkeypatch.setattr("src.notebook_cat.main.core.process_directory", mock_process)
+    
+    main.main()
+    
+    call_args = mock_process.call_args[1]
+    assert call_args['profile'] is True
+    assert call_args['cprofile'] is True
+
+@patch('sys.argv')
+def test_main_count_engine(mock_argv, temp_dirs, monkeypatch):
+    """Test selecting the counting engine, and rejecting one that cannot be used."""
+    input_dir, output_dir = temp_dirs
+    
+    mock_argv.__getitem__.side_effect = lambda idx: [
+        "notebook-cat",
+        str(input_dir),
+        str(output_dir),
+        "--count-engine", "numpy"
+    ][idx]
+    
+    mock_process = MagicMock()
+    monkeypatch.setattr("src.notebook_cat.main.core.process_directory", mock_process)
+    monkeypatch.setattr("src.notebook_cat.main.core.check_count_engine", lambda engine: None)
+    
+    main.main()
+    assert mock_process.call_args[1]['count_engine'] == "numpy"
+    
+    def numpy_missing(engine):
+        raise ValueError("The numpy count engine requires NumPy.")
+    monkeypatch.setattr("src.notebook_cat.main.core.check_count_engine", numpy_missing)
+    mock_process.reset_mock()
+    with pytest.raises(SystemExit):
+        main.main()
+    mock_process.assert_not_called()
+
+@patch('sys.argv')
+def test_main_memory_budget(mock_argv, temp_dirs, monkeypatch):
+    """Test that --memory-budget is passed in bytes and rejected with --incremental."""
+    input_dir, output_dir = temp_dirs
+    argv = ["notebook-cat", str(input_dir), str(output_dir), "--memory-budget", "256"]
+    mock_argv.__getitem__.side_effect = lambda idx: argv[idx]
+    
+    mock_process = MagicMock()
+    monkeypatch.setattr("src.notebook_cat.main.core.process_directory", mock_process)
+    
+    main.main()
+    assert mock_process.call_args[1]['memory_budget'] == 256 * 1024 * 1024
+    
+    argv.append("--incremental")
+    mock_process.reset_mock()
+    with pytest.raises(SystemExit):
+        main.main()
+    mock_process.assert_not_called()
+
+@patch('sys.argv')
+def test_main_pipeline(mock_argv, temp_dirs, monkeypatch):
+    """Test that --pipeline runs process_directory_async with the same options."""
+    input_dir, output_dir = temp_dirs
+    argv = ["notebook-cat", str(input_dir), str(output_dir), "--pipeline", "-j", "4"]
+    mock_argv.__getitem__.side_effect = lambda idx: argv[idx]
+    
+    calls = []
+    async def fake_process(**options):
+        calls.append(options)
+        return []
+    monkeypatch.setattr("src.notebook_cat.pipeline.process_directory_async", fake_process)
+    mock_process = MagicMock()
+    monkeypatch.setattr("src.notebook_cat.main.core.process_directory", mock_process)
+    
+    main.main()
+    mock_process.assert_not_called()
+    assert calls[0]['jobs'] == 4
+    assert calls[0]['input_dir'] == str(input_dir.absolute())
+
+@patch('sys.argv')
+def test_main_packing_strategy(mock_argv, temp_dirs, monkeypatch):
+    """Test selecting the packing strategy."""
+    input_dir, output_dir = temp_dirs
+    
+    mock_argv.__getitem__.side_effect = lambda idx: [
+        "notebook-cat",
+        str(input_dir),
+        str(output_dir),
+        "--packing", "best-fit"
+    ][idx]
+    
+    mock_process = MagicMock()
+    monkeypatch.setattr("src.notebook_cat.main.core.process_directory", mock_process)
+    
+    main.main()
+    
+    assert mock_process.call_args[1]['packing'] == "best-fit"
+
+@patch('sys.argv')
+def test_main_incremental(mock_argv, temp_dirs, monkeypatch):
+    """Test the incremental option."""
+    input_dir, output_dir = temp_dirs
+    
+    mock_argv.__getitem__.side_effect = lambda idx: [
+        "notebook-cat",
+        str(input_dir),
+        str(output_dir),
+        "--incremental"
+    ][idx]
+    
+    mock_process = MagicMock()
+    monkeypatch.setattr("src.notebook_cat.main.core.process_directory", mock_process)
+    
+    main.main()
+    
+    assert mock_process.call_args[1]['incremental'] is True
+
 @patch('sys.argv')
 def test_main_file_not_found_error(mock_argv, temp_dirs, capsys, monkeypatch):
     """Test handling of FileNotFoundError."""
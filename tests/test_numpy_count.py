@@ -0,0 +1,69 @@
+"""
+Tests for the NumPy word counting engine.
+"""
+import os
+import sys
+import random
+import pytest
+from pathlib import Path
+
+np = pytest.importorskip("numpy")
+
+# Always use relative imports for testing
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.notebook_cat import core
+from src.notebook_cat.numpy_count import count_words_in_buffer, count_words_in_mapped_file
+
+# Every character str.split() treats as whitespace, and some that it doesn't
+WHITESPACE = [chr(c) for c in range(sys.maxunicode + 1) if chr(c).isspace()]
+OTHER = list("ab1.é中😀\x00\x1b\x7f​﻿")
+
+def test_count_matches_str_split():
+    """Test that random Unicode text is counted like str.split(), across block boundaries."""
+    rng = random.Random(7)
+    for _ in range(200):
+        text = "".join(rng.choice(WHITESPACE + OTHER) for _ in range(rng.randint(0, 40)))
+        data = np.frombuffer(text.encode('utf-8'), dtype=np.uint8)
+        for block_size in (1, 3, 1024):
+            assert count_words_in_buffer(data, block_size) == len(text.split()), repr(text)
+
+def test_mapped_file_matches_python_engine(tmp_path):
+    """Test that both engines count text and markdown files the same."""
+    samples = {
+        "plain.txt": "The quick brown fox\njumps over\tthe lazy dog.\r\n",
+        "unicode.md": "# Título\n\nPalabras separadas　por espacios raros 中文 😀\n",
+        "empty.txt": "",
+        "blank.txt": " \n\t  ",
+    }
+    for name, text in samples.items():
+        path = tmp_path / name
+        path.write_text(text, encoding='utf-8')
+        assert count_words_in_mapped_file(path) == len(text.split())
+        assert core.count_words_in_file(path, engine="numpy") == core.count_words_in_file(path)
+
+def test_invalid_utf8(tmp_path):
+    """Test that files that are not UTF-8 are rejected as when read as text."""
+    path = tmp_path / "latin1.txt"
+    path.write_bytes("caf\xe9 au lait".encode('latin-1'))
+    with pytest.raises(UnicodeDecodeError):
+        count_words_in_mapped_file(path)
+    assert core.count_words_in_file(path, engine="numpy") == 0
+
+    # A character cut at the end of the file is invalid too
+    path.write_bytes("word 　".encode('utf-8')[:-1])
+    with pytest.raises(UnicodeDecodeError):
+        count_words_in_mapped_file(path)
+
+def test_process_directory_with_numpy_engine(tmp_path):
+    """Test that the engine can be selected for a whole run, in worker processes too."""
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    (input_dir / "a.txt").write_text("one two three four", encoding='utf-8')
+    (input_dir / "b.md").write_text("# five six", encoding='utf-8')
+    (input_dir / "c.json").write_text('{"text": "seven eight"}', encoding='utf-8')
+
+    assert core.count_words_in_files(sorted(input_dir.iterdir()), jobs=2, engine="numpy") == [4, 3, 2]
+    written = core.process_directory(str(input_dir), str(tmp_path / "output"), count_engine="numpy")
+    assert written == ["notebooklm_source_1.txt"]
+    summary = (tmp_path / "output" / "notebook_cat_summary.txt").read_text(encoding='utf-8')
+    assert "Total words processed: 9\n" in summary
@@ -0,0 +1,131 @@
+"""
+Tests for the bin packing strategies used to group files.
+"""
+import os
+import sys
+import random
+import pytest
+from pathlib import Path
+
+# Always use relative imports for testing
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.notebook_cat import core
+from src.notebook_cat.packing import first_fit, best_fit
+
+def _linear_first_fit(sizes, capacity, max_bins):
+    """Reference first-fit that scans every bin, as group_files used to."""
+    remaining = []
+    assignment = []
+    for size in sizes:
+        for i, room in enumerate(remaining):
+            if size <= room:
+                remaining[i] -= size
+                assignment.append(i)
+                break
+        else:
+            if len(remaining) < max_bins:
+                remaining.append(capacity - size)
+                assignment.append(len(remaining) - 1)
+            else:
+                assignment.append(-1)
+    return assignment
+
+def _linear_best_fit(sizes, capacity, max_bins, loads=()):
+    """Reference best-fit that scans every bin for the least room left."""
+    remaining = [capacity - load for load in loads]
+    assignment = []
+    for size in sizes:
+        fitting = [(room, i) for i, room in enumerate(remaining) if size <= room]
+        if fitting:
+            i = min(fitting)[1]
+        elif len(remaining) < max_bins:
+            remaining.append(capacity)
+            i = len(remaining) - 1
+        else:
+            assignment.append(-1)
+            continue
+        remaining[i] -= size
+        assignment.append(i)
+    return assignment
+
+def _random_instances(seed, count):
+    """Yield (sizes sorted descending, capacity, max_bins) instances."""
+    rng = random.Random(seed)
+    for _ in range(count):
+        capacity = rng.choice([10, 100, 1000, 380000])
+        sizes = sorted((rng.randint(1, capacity) for _ in range(rng.randint(0, 60))), reverse=True)
+        yield sizes, capacity, rng.choice([1, 3, 50, 300])
+
+def _bins_used(assignment):
+    return max(assignment, default=-1) + 1
+
+def test_first_fit_matches_linear_scan():
+    """Test that the tree-indexed first-fit places every item like a linear scan."""
+    for sizes, capacity, max_bins in _random_instances(1, 2000):
+        assert first_fit(sizes, capacity, max_bins) == _linear_first_fit(sizes, capacity, max_bins)
+
+def test_best_fit_matches_linear_scan():
+    """Test that the capacity-indexed best-fit places every item like a linear scan."""
+    rng = random.Random(3)
+    for sizes, capacity, max_bins in _random_instances(2, 2000):
+        assert best_fit(sizes, capacity, max_bins) == _linear_best_fit(sizes, capacity, max_bins)
+    # Capacities around the 64-bit mask boundaries, empty items and open bins over capacity
+    for _ in range(2000):
+        capacity = rng.choice([1, 63, 64, 65, 4095, 4096, 4097, 10 ** 9])
+        sizes = [rng.randint(0, capacity) for _ in range(rng.randint(0, 40))]
+        loads = [rng.randint(0, capacity + 2) for _ in range(rng.randint(0, 4))]
+        max_bins = len(loads) + rng.randint(0, 8)
+        assert best_fit(sizes, capacity, max_bins, loads) == _linear_best_fit(sizes, capacity, max_bins, loads)
+
+def test_best_fit_never_uses_more_groups_than_first_fit():
+    """Test that best-fit-decreasing needs no more groups than first-fit on seeded instances."""
+    for sizes, capacity, _ in _random_instances(2, 2000):
+        # Without a source limit every item is placed
+        unlimited = len(sizes)
+        assert _bins_used(best_fit(sizes, capacity, unlimited)) <= _bins_used(first_fit(sizes, capacity, unlimited))
+
+def test_best_fit_places_items_in_fullest_bin():
+    """Test that best-fit picks the bin with the least room left that fits."""
+    # After the first two items bin 0 has room for 4 and bin 1 for 3
+    assert first_fit([6, 7, 3], 10, 5) == [0, 1, 0]
+    assert best_fit([6, 7, 3], 10, 5) == [0, 1, 1]
+    # Ties go to the lowest numbered bin
+    assert best_fit([5, 5, 2, 2], 10, 5) == [0, 0, 1, 1]
+    assert best_fit([6, 6, 2], 10, 5) == [0, 1, 0]
+
+def test_packing_respects_limits():
+    """Test that no bin is overfilled and the bin limit holds."""
+    for sizes, capacity, max_bins in _random_instances(3, 500):
+        for packer in (first_fit, best_fit):
+            assignment = packer(sizes, capacity, max_bins)
+            totals = {}
+            for size, index in zip(sizes, assignment):
+                if index >= 0:
+                    totals[index] = totals.get(index, 0) + size
+            assert all(total <= capacity for total in totals.values())
+            assert _bins_used(assignment) <= max_bins
+
+def test_group_files_best_fit(monkeypatch, tmp_path):
+    """Test selecting best-fit packing in group_files."""
+    monkeypatch.setattr(core, "WORD_LIMIT", 10)
+    files_counts = [(tmp_path / "a.txt", 6), (tmp_path / "b.txt", 7), (tmp_path / "c.txt", 3),
+                    (tmp_path / "d.txt", 11), (tmp_path / "e.txt", 0)]
+
+    groups, ungrouped = core.group_files(files_counts, 2, strategy="best-fit")
+
+    assert [[f.name for f, _ in group] for group in groups] == [["b.txt", "c.txt"], ["a.txt"]]
+    assert [f.name for f, _ in ungrouped] == ["d.txt"]
+
+    with pytest.raises(ValueError):
+        core.group_files(files_counts, 2, strategy="worst-fit")
+
+def test_packing_with_open_bins():
+    """Test packing into bins that already hold items."""
+    # Bin 0 has room for 2, bin 1 for 5; a third bin may be opened
+    assert first_fit([4, 2, 6], 10, 3, loads=[8, 5]) == [1, 0, 2]
+    assert best_fit([4, 2, 6], 10, 3, loads=[8, 5]) == [1, 0, 2]
+    # No new bins beyond the limit
+    assert first_fit([6], 10, 2, loads=[8, 5]) == [-1]
+    assert best_fit([6], 10, 2, loads=[8, 5]) == [-1]
+    # Open bins that stay empty are kept
+    assert first_fit([3], 10, 2, loads=[0, 0]) == [0]
@@ -0,0 +1,91 @@
+"""
+Tests for the overlapped scan and count pipeline.
+"""
+import asyncio
+import os
+import sys
+import pytest
+from pathlib import Path
+
+# Always use relative imports for testing
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.notebook_cat import core, pipeline
+
+@pytest.fixture
+def corpus(tmp_path, monkeypatch):
+    """Input files spread over several scan batches."""
+    monkeypatch.setattr(pipeline, "PIPELINE_BATCH_FILES", 3)
+    monkeypatch.setattr(pipeline, "PIPELINE_QUEUE_BATCHES", 1)
+    input_dir = tmp_path / "input"
+    (input_dir / "sub").mkdir(parents=True)
+    for i in range(20):
+        name = f"sub/doc{i}.txt" if i % 3 else f"doc{i}.md"
+        (input_dir / name).write_text(" ".join("w" for _ in range(1 + (i * 7) % 11)))
+    (input_dir / "data.json").write_text('{"text": "one two three"}')
+    return input_dir
+
+def _outputs(output_dir):
+    return {p.name: p.read_bytes() for p in sorted(output_dir.iterdir())
+            if p.name.startswith("notebooklm_source_") or p.name == "notebook_cat_summary.txt"}
+
+@pytest.mark.parametrize("options", [
+    dict(jobs=1),
+    dict(jobs=3, executor="thread", packing="best-fit"),
+    dict(jobs=2, use_cache=True, max_files=12),
+])
+def test_pipeline_matches_process_directory(corpus, tmp_path, options):
+    """Test that the pipeline writes the same sources as process_directory."""
+    options = dict(source_limit=4, recursive=True, word_limit=15, **options)
+    expected = core.process_directory(str(corpus), str(tmp_path / "normal"), **options)
+    written = asyncio.run(pipeline.process_directory_async(str(corpus), str(tmp_path / "pipeline"), **options))
+
+    assert written == expected
+    assert _outputs(tmp_path / "pipeline") == _outputs(tmp_path / "normal")
+
+def test_pipeline_input_files_and_cache(corpus, tmp_path):
+    """Test that explicit files keep their order and counts are cached for the next run."""
+    files = [corpus / "sub" / "doc5.txt", (corpus / "doc0.md", "first.md"), corpus / "data.json"]
+    output_dir = tmp_path / "output"
+    expected = core.process_files(files, str(tmp_path / "normal"))
+    assert asyncio.run(pipeline.process_directory_async(None, str(output_dir), input_files=files,
+                                                        use_cache=True)) == expected
+    assert _outputs(output_dir) == _outputs(tmp_path / "normal")
+
+    cache = core.open_count_cache(output_dir)
+    assert cache.get(corpus / "data.json", core.file_fingerprint(corpus / "data.json")) == 3
+    cache.close()
+
+def test_pipeline_counts_while_scanning(corpus, tmp_path, monkeypatch):
+    """Test that counting starts before the scan has finished."""
+    events = []
+    original_scan = core.iter_scan_files
+    def recording_scan(*args, **kwargs):
+        for entry in original_scan(*args, **kwargs):
+            events.append("scan")
+            yield entry
+        events.append("scan done")
+    original_count = core.count_words_in_files
+    def recording_count(files, *args, **kwargs):
+        events.append("count")
+        return original_count(files, *args, **kwargs)
+    monkeypatch.setattr(pipeline, "iter_scan_files", recording_scan)
+    monkeypatch.setattr(pipeline, "count_words_in_files", recording_count)
+
+    asyncio.run(pipeline.process_directory_async(str(corpus), str(tmp_path / "output"), recursive=True,
+                                                 dry_run=True))
+    assert events.index("count") < events.index("scan done")
+    assert events.count("count") == 7  # 21 files in batches of 3
+
+def test_pipeline_scan_error(corpus, tmp_path, monkeypatch):
+    """Test that an error while scanning ends the run instead of leaving workers waiting."""
+    def failing_scan(*args, **kwargs):
+        yield from list(core.iter_scan_files(*args, **kwargs))[:5]
+        raise PermissionError("denied")
+    monkeypatch.setattr(pipeline, "iter_scan_files", failing_scan)
+    with pytest.raises(PermissionError):
+        asyncio.run(pipeline.process_directory_async(str(corpus), str(tmp_path / "output"), recursive=True))
+
+def test_pipeline_rejects_unknown_options(tmp_path):
+    """Test that options are checked against those of process_directory."""
+    with pytest.raises(TypeError):
+        asyncio.run(pipeline.process_directory_async(str(tmp_path), str(tmp_path), limit=3))
@@ -0,0 +1,146 @@
+"""
+Tests for low-memory runs, which keep the file records in a spill database.
+"""
+import os
+import sys
+import pytest
+from pathlib import Path
+
+# Always use relative imports for testing
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.notebook_cat import core
+from src.notebook_cat.cache import WordCountCache, file_fingerprint
+
+BUDGET = 64 * 1024 * 1024
+
+@pytest.fixture
+def corpus(tmp_path, monkeypatch):
+    """Input files that exercise every grouping outcome with a word limit of 10."""
+    monkeypatch.setattr(core, "WORD_LIMIT", 10)
+    input_dir = tmp_path / "input"
+    (input_dir / "sub").mkdir(parents=True)
+    words = {"a.txt": 6, "b.txt": 4, "c.md": 3, "sub/d.txt": 6, "sub-e.txt": 3, "f.txt": 12,
+             "empty.txt": 0, "g.txt": 2, "h.txt": 5}
+    for name, count in words.items():
+        (input_dir / name).write_text(" ".join(name[0] for _ in range(count)))
+    return input_dir
+
+def _outputs(output_dir):
+    return {p.name: p.read_bytes() for p in sorted(output_dir.iterdir())
+            if p.name.startswith("notebooklm_source_") or p.name == "notebook_cat_summary.txt"}
+
+@pytest.mark.parametrize("packing", ["first-fit", "best-fit"])
+def test_low_memory_run_matches_normal_run(corpus, tmp_path, packing):
+    """Test that spilling the file records gives the same sources and summary."""
+    options = dict(source_limit=3, recursive=True, packing=packing)
+    normal = core.process_directory(str(corpus), str(tmp_path / "normal"), **options)
+    spilled = core.process_directory(str(corpus), str(tmp_path / "spilled"), memory_budget=BUDGET, **options)
+
+    assert spilled == normal
+    assert _outputs(tmp_path / "spilled") == _outputs(tmp_path / "normal")
+    assert "Files not grouped: " in (tmp_path / "spilled" / "notebook_cat_summary.txt").read_text()
+    # The spill is removed once every source is written
+    assert not (tmp_path / "spilled" / core.SPILL_FILE).exists()
+
+def test_low_memory_dry_run_and_max_files(corpus, tmp_path, capsys):
+    """Test that max_files keeps the first files in path order and dry runs write nothing."""
+    normal = tmp_path / "normal"
+    spilled = tmp_path / "spilled"
+    core.process_directory(str(corpus), str(normal), dry_run=True, max_files=4)
+    normal_out = capsys.readouterr().out
+    core.process_directory(str(corpus), str(spilled), dry_run=True, max_files=4, memory_budget=BUDGET)
+
+    def groups(out):
+        return out.split("Would create")[1].split("Summary report")[0]
+    assert groups(capsys.readouterr().out) == groups(normal_out)
+    assert _outputs(spilled) == _outputs(normal)
+    assert list(spilled.iterdir()) == [spilled / "notebook_cat_summary.txt"]
+
+def test_low_memory_input_files_keep_given_order(corpus, tmp_path):
+    """Test that explicit input files are grouped in the order given, as in a normal run."""
+    files = [corpus / "h.txt", (corpus / "a.txt", "first.txt"), corpus / "b.txt", corpus / "g.txt"]
+    normal = core.process_files(files, str(tmp_path / "normal"), max_files=3)
+    spilled = core.process_files(files, str(tmp_path / "spilled"), max_files=3, memory_budget=BUDGET)
+
+    assert spilled == normal
+    assert _outputs(tmp_path / "spilled") == _outputs(tmp_path / "normal")
+
+def test_low_memory_counts_in_batches(corpus, tmp_path, monkeypatch):
+    """Test that files are counted a batch at a time with cached counts looked up on demand."""
+    monkeypatch.setattr(core, "MIN_SPILL_BATCH", 2)
+    batches = []
+    original_count = core.count_words_with_cache
+    def recording_count(files, cache, *args, **kwargs):
+        batches.append(len(files))
+        assert cache is None or cache._entries is None
+        return original_count(files, cache, *args, **kwargs)
+    monkeypatch.setattr(core, "count_words_with_cache", recording_count)
+
+    core.process_directory(str(corpus), str(tmp_path / "output"), recursive=True, use_cache=True,
+                           memory_budget=1)
+    assert batches == [2, 2, 2, 2, 1]
+    assert "Total words processed: 41" in (tmp_path / "output" / "notebook_cat_summary.txt").read_text()
+
+@pytest.mark.parametrize("executor", ["process", "thread"])
+def test_low_memory_counts_with_one_pool(corpus, tmp_path, monkeypatch, executor):
+    """Test that every batch is counted by the same pool of workers."""
+    monkeypatch.setattr(core, "MIN_SPILL_BATCH", 2)
+    pools = []
+    original_create = core.create_count_pool
+    def recording_create(*args, **kwargs):
+        pools.append(original_create(*args, **kwargs))
+        return pools[-1]
+    monkeypatch.setattr(core, "create_count_pool", recording_create)
+
+    normal = core.process_directory(str(corpus), str(tmp_path / "normal"), recursive=True)
+    spilled = core.process_directory(str(corpus), str(tmp_path / "spilled"), recursive=True, jobs=2,
+                                     executor=executor, memory_budget=1)
+    assert spilled == normal
+    assert _outputs(tmp_path / "spilled") == _outputs(tmp_path / "normal")
+    assert len(pools) == 1
+
+def test_low_memory_resume_uses_spill(corpus, tmp_path, monkeypatch, capsys):
+    """Test that a resumed low-memory run writes the remaining sources from the kept spill."""
+    output_dir = tmp_path / "output"
+    core.process_directory(str(corpus), str(tmp_path / "normal"))
+    original_concatenate = core.concatenate_files
+    def failing_concatenate(group, output_filepath, content_store=None, display_names=None):
+        if output_filepath.name == "notebooklm_source_2.txt":
+            return False
+        return original_concatenate(group, output_filepath, content_store, display_names)
+    monkeypatch.setattr(core, "concatenate_files", failing_concatenate)
+    core.process_directory(str(corpus), str(output_dir), memory_budget=BUDGET)
+    assert (output_dir / core.SPILL_FILE).exists()
+    assert not (output_dir / "notebooklm_source_2.txt").exists()
+
+    def unexpected(*args, **kwargs):
+        raise AssertionError("resumed run rescanned the input directory")
+    monkeypatch.setattr(core, "concatenate_files", original_concatenate)
+    monkeypatch.setattr(core, "iter_scan_files", unexpected)
+    monkeypatch.setattr(core, "count_words_with_cache", unexpected)
+    capsys.readouterr()
+    written = core.process_directory(str(corpus), str(output_dir), memory_budget=BUDGET, resume=True)
+
+    assert "Using the saved grouping plan" in capsys.readouterr().out
+    assert written == ["notebooklm_source_2.txt", "notebooklm_source_3.txt"]
+    assert not (output_dir / core.SPILL_FILE).exists()
+    assert not (output_dir / core.RESUME_JOURNAL_FILE).exists()
+    # The summary of a resumed run lists the sources it wrote; the sources match a normal run
+    assert {name: data for name, data in _outputs(output_dir).items() if name.startswith("notebooklm_")} == \
+        {name: data for name, data in _outputs(tmp_path / "normal").items() if name.startswith("notebooklm_")}
+
+def test_word_count_cache_without_preload(tmp_path):
+    """Test that entries are looked up in the database when they are not preloaded."""
+    filepath = tmp_path / "doc.txt"
+    filepath.write_text("a b c")
+    fingerprint = file_fingerprint(filepath)
+    cache = WordCountCache(tmp_path / "cache.sqlite", preload=False)
+    cache.put(filepath, fingerprint, 3)
+    assert cache.get(filepath, fingerprint) == 3  # Not saved yet
+    cache.save()
+    cache.close()
+
+    cache = WordCountCache(tmp_path / "cache.sqlite", preload=False)
+    assert cache.get(filepath, fingerprint) == 3
+    assert cache.get(filepath, (fingerprint[0] + 1, fingerprint[1])) is None
+    cache.close()
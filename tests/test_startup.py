@@ -0,0 +1,79 @@
+"""
+Tests for startup cost: lazily loaded dependencies and config resolution.
+
+Import time itself depends on the machine, so it is measured by the
+import_main benchmark (benchmarks/run_benchmarks.py) rather than tested.
+"""
+import os
+import sys
+import json
+import subprocess
+import pytest
+from pathlib import Path
+
+# Always use relative imports for testing
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.notebook_cat.config import loader
+
+SRC_DIR = Path(__file__).parent.parent / "src"
+
+# Modules only some runs need, which must not be loaded at startup
+LAZY_MODULES = ["gradio", "numpy", "multiprocessing", "concurrent.futures.process", "asyncio", "zipfile",
+                "sqlite3", "cProfile", "gzip", "zstandard", "compression.zstd", "config",
+                "notebook_cat.pipeline", "notebook_cat.numpy_count"]
+
+def _run_python(code, **env):
+    """Run code in a fresh interpreter with the package importable, returning its JSON output."""
+    environment = dict(os.environ, PYTHONPATH=str(SRC_DIR))
+    environment.pop(loader.CONFIG_ENV_VAR, None)
+    environment.update(env)
+    result = subprocess.run([sys.executable, "-c", code], env=environment,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+@pytest.mark.parametrize("module", ["notebook_cat.core", "notebook_cat.main", "notebook_cat.webui"])
+def test_no_heavy_imports(module):
+    """Test that the CLI, the core and the web UI module load no optional or heavy dependencies."""
+    code = (f"import json, sys; path = list(sys.path); import {module}; "
+            f"print(json.dumps([[m for m in {LAZY_MODULES!r} if m in sys.modules], sys.path == path]))")
+    loaded, path_unchanged = _run_python(code)
+    assert loaded == []
+    assert path_unchanged
+
+def test_read_config_file(tmp_path):
+    """Test that settings are read from literal assignments only."""
+    config_path = tmp_path / "config.py"
+    config_path.write_text(
+        "import os\n"
+        "WORD_LIMIT = 100000  # comment\n"
+        "DEFAULT_SOURCE_LIMIT: int = 20\n"
+        "OTHER = 5\n"
+    )
+    assert loader.read_config_file(config_path) == {'WORD_LIMIT': 100000, 'DEFAULT_SOURCE_LIMIT': 20}
+
+def test_read_config_file_rejects_code(tmp_path):
+    """Test that a setting computed by code is not evaluated."""
+    config_path = tmp_path / "config.py"
+    config_path.write_text("WORD_LIMIT = int(open('/etc/hostname').read())\n")
+    with pytest.raises(ValueError):
+        loader.read_config_file(config_path)
+
+def test_load_user_config_from_environment(tmp_path, monkeypatch, capsys):
+    """Test that NOTEBOOK_CAT_CONFIG selects the config file, and bad files fall back to defaults."""
+    config_path = tmp_path / "my_config.py"
+    config_path.write_text("WORD_LIMIT = 1234\nPLUS_SOURCE_LIMIT = 42\n")
+    monkeypatch.setenv(loader.CONFIG_ENV_VAR, str(config_path))
+    assert loader.find_config_file() == config_path
+    assert loader.load_user_config() == {'WORD_LIMIT': 1234, 'PLUS_SOURCE_LIMIT': 42}
+
+    config_path.write_text("WORD_LIMIT = \n")
+    assert loader.load_user_config() == {}
+    assert "Could not read config file" in capsys.readouterr().out
+
+def test_defaults_use_config_from_environment(tmp_path):
+    """Test that the defaults module applies the settings of the config file."""
+    config_path = tmp_path / "my_config.py"
+    config_path.write_text("WORD_LIMIT = 1234\n")
+    code = ("import json; from notebook_cat.config import defaults; "
+            "print(json.dumps([defaults.WORD_LIMIT, defaults.DEFAULT_SOURCE_LIMIT]))")
+    assert _run_python(code, NOTEBOOK_CAT_CONFIG=str(config_path)) == [1234, 50]
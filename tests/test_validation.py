@@ -38,12 +38,17 @@ def test_validate_json_path():
     assert validate_json_path("data.items.text") == (True, "data.items.text")
     assert validate_json_path("") == (True, "")
     assert validate_json_path(None) == (True, "")
+    assert validate_json_path("segments.*.text") == (True, "segments.*.text")
+    assert validate_json_path("transcript,segments.*.text") == (True, "transcript,segments.*.text")
+    assert validate_json_path("speaker_notes.text-body") == (True, "speaker_notes.text-body")
     
     # Invalid paths
     assert validate_json_path("content/text") == (False, "")  # Contains /
     assert validate_json_path("content\\text") == (False, "")  # Contains \
     assert validate_json_path("content..text") == (False, "")  # Contains ..
     assert validate_json_path("content@text") == (False, "contenttext")  # Contains @
+    assert validate_json_path("content.") == (False, "")  # Empty key
+    assert validate_json_path("a,,b") == (False, "")  # Empty alternative
 
 def test_validate_plan_type():
     """Test plan type validation."""
@@ -12,7 +12,20 @@ from unittest.mock import patch, MagicMock, Mock
 # Always use relative imports for testing
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from src.notebook_cat import webui
-from src.notebook_cat.config.defaults import DEFAULT_SOURCE_LIMIT, PLUS_SOURCE_LIMIT, WORD_LIMIT
+from src.notebook_cat.config.defaults import (
+    DEFAULT_SOURCE_LIMIT, PLUS_SOURCE_LIMIT, WORD_LIMIT, WEB_CONCURRENCY, WORKSPACE_QUOTA_MB, WORKSPACE_MAX_AGE
+)
+from src.notebook_cat.workspace import WorkspaceManager
+
+def _mock_launch_args(network):
+    """Parsed launch_ui arguments with the default settings."""
+    mock_args = MagicMock()
+    mock_args.network = network
+    mock_args.concurrency = WEB_CONCURRENCY
+    mock_args.workspace_quota = WORKSPACE_QUOTA_MB
+    mock_args.workspace_max_age = WORKSPACE_MAX_AGE
+    mock_args.workspace_dir = None
+    return mock_args
 
 class MockGradio:
     """Mock class for Gradio components."""
@@ -47,10 +60,10 @@ def test_csp_headers():
         mock_create_ui.return_value = mock_app
         
         # Set up the mock parser
-        with patch('argparse.ArgumentParser') as mock_parser:
-            mock_args = MagicMock()
-            mock_args.network = False
-            mock_parser.return_value.parse_args.return_value = mock_args
+        with patch('argparse.ArgumentParser') as mock_parser, \
+             patch('src.notebook_cat.webui.enable_concurrency'), \
+             patch('src.notebook_cat.webui.configure_workspaces'):
+            mock_parser.return_value.parse_args.return_value = _mock_launch_args(False)
             
             # Call launch_ui
             webui.launch_ui()
@@ -61,6 +74,26 @@ def test_csp_headers():
             assert "server_name" in call_kwargs
             assert call_kwargs["server_name"] == "127.0.0.1"
 
+def test_launch_workspace_options(tmp_path, monkeypatch):
+    """Test that the --workspace-* options configure the workspace manager."""
+    monkeypatch.setattr(webui, "_workspaces", None)
+    monkeypatch.setattr(sys, "argv", ["notebook-cat-web", "--workspace-quota", "5", "--workspace-max-age", "30",
+                                      "--workspace-dir", str(tmp_path / "jobs")])
+    with patch('src.notebook_cat.webui.create_ui') as mock_create_ui, \
+         patch('src.notebook_cat.webui.enable_concurrency') as mock_concurrency:
+        webui.launch_ui()
+    
+    manager = webui.get_workspace_manager()
+    try:
+        assert manager.root == tmp_path / "jobs"
+        assert manager.quota_bytes == 5 * 1024 * 1024
+        assert manager.max_age == 30
+        assert manager._reaper is not None and manager._reaper.is_alive()
+    finally:
+        manager.stop_reaper()
+    mock_concurrency.assert_called_once_with(mock_create_ui.return_value, WEB_CONCURRENCY)
+    mock_create_ui.return_value.launch.assert_called_once()
+
 def test_file_validation():
     """Test file validation in the process_files function."""
     # Create a mock progress tracker
@@ -146,10 +179,10 @@ def test_network_flag_handling():
         mock_create_ui.return_value = mock_app
         
         # Test with network=False
-        with patch('argparse.ArgumentParser') as mock_parser:
-            mock_args = MagicMock()
-            mock_args.network = False
-            mock_parser.return_value.parse_args.return_value = mock_args
+        with patch('argparse.ArgumentParser') as mock_parser, \
+             patch('src.notebook_cat.webui.enable_concurrency'), \
+             patch('src.notebook_cat.webui.configure_workspaces'):
+            mock_parser.return_value.parse_args.return_value = _mock_launch_args(False)
             
             webui.launch_ui()
             
@@ -161,10 +194,10 @@ def test_network_flag_handling():
         mock_app.reset_mock()
         
         # Test with network=True
-        with patch('argparse.ArgumentParser') as mock_parser:
-            mock_args = MagicMock()
-            mock_args.network = True
-            mock_parser.return_value.parse_args.return_value = mock_args
+        with patch('argparse.ArgumentParser') as mock_parser, \
+             patch('src.notebook_cat.webui.enable_concurrency'), \
+             patch('src.notebook_cat.webui.configure_workspaces'):
+            mock_parser.return_value.parse_args.return_value = _mock_launch_args(True)
             
             # Also mock socket functions
             with patch('socket.gethostname', return_value="test-host"):
@@ -175,38 +208,35 @@ def test_network_flag_handling():
                     mock_app.launch.assert_called_once()
                     assert mock_app.launch.call_args[1]["server_name"] == "0.0.0.0"
 
-def test_json_path_validation():
+def test_json_path_validation(tmp_path, monkeypatch):
     """Test validation of JSON path in process_files."""
-    # Create a temporary JSON file
-    with tempfile.NamedTemporaryFile(suffix='.json') as temp_file:
-        # Write test JSON data
-        json_data = {"content": "Test content"}
-        temp_file.write(json.dumps(json_data).encode())
-        temp_file.flush()
-        
-        # Valid JSON path
-        with patch('src.notebook_cat.core.process_directory'):
-            result = webui.process_files(
-                files=[temp_file.name],
-                plan_type="free",
-                json_path="content",
-                progress=MagicMock()
-            )
-            
-            # Should not have validation errors for JSON path
-            assert "JSON path" not in result[1].lower() or "valid" in result[1].lower()
-        
-        # Invalid JSON path
-        with patch('src.notebook_cat.core.process_directory'):
-            result = webui.process_files(
-                files=[temp_file.name],
-                plan_type="free",
-                json_path="content/invalid",
-                progress=MagicMock()
-            )
-            
-            # Should have validation warnings for invalid JSON path
-            assert "JSON path" in result[1].lower() or "sanitized" in result[1].lower()
+    import zipfile
+    # Keep the jobs of this test in its own directory
+    monkeypatch.setattr(webui, "_workspaces", WorkspaceManager(tmp_path / "workspaces"))
+    json_file = tmp_path / "data.json"
+    json_file.write_text(json.dumps({"content": "Test content"}))
+    
+    # Valid JSON path: the text it selects is written, without warnings
+    output_files, status, summary = webui.process_files(
+        files=[str(json_file)],
+        plan_type="free",
+        json_path="content",
+        progress=MagicMock()
+    )
+    assert len(output_files) == 1
+    assert "warnings" not in status.lower()
+    with zipfile.ZipFile(output_files[0]) as archive:
+        assert "Test content" in archive.read("notebooklm_source_1.txt").decode("utf-8")
+    
+    # Invalid JSON path: the file is still processed, with a warning about the path
+    output_files, status, summary = webui.process_files(
+        files=[str(json_file)],
+        plan_type="free",
+        json_path="content/invalid",
+        progress=MagicMock()
+    )
+    assert len(output_files) == 1
+    assert "invalid json path format: content/invalid" in status.lower()
 
 def test_no_files_scenario():
     """Test handling of no files scenario."""
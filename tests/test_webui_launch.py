@@ -54,3 +54,18 @@ def test_launch_ui_with_mocks():
                 mock_app.launch.assert_called_once()
                 call_args = mock_app.launch.call_args[1]
                 assert call_args["server_name"] == "127.0.0.1"
+
+def test_enable_concurrency():
+    """Test that the request queue allows the configured number of concurrent jobs."""
+    class NewGradioApp:
+        def queue(self, default_concurrency_limit=1, max_size=None):
+            self.limit = default_concurrency_limit
+    
+    class OldGradioApp:
+        def queue(self, concurrency_count=1, max_size=None):
+            self.limit = concurrency_count
+    
+    for app_class in (NewGradioApp, OldGradioApp):
+        app = app_class()
+        webui.enable_concurrency(app, 3)
+        assert app.limit == 3
@@ -0,0 +1,167 @@
+"""
+Tests for the workspace manager used by the web interface.
+"""
+import os
+import shutil
+import sys
+import time
+import pytest
+from pathlib import Path
+
+# Always use relative imports for testing
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.notebook_cat import workspace as workspace_module
+from src.notebook_cat.config.defaults import WORKSPACE_MARKER_FILE
+from src.notebook_cat.workspace import WorkspaceManager
+
+class FakeClock:
+    """Clock that only moves when told to, starting at the current time like file access times."""
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+def _finish_with_file(manager, size):
+    workspace = manager.create()
+    (workspace.path / "notebook_cat_output.zip").write_bytes(b"x" * size)
+    manager.finish(workspace)
+    return workspace
+
+def test_create_unique_workspaces(tmp_path):
+    """Test that every job gets its own private directory."""
+    manager = WorkspaceManager(tmp_path / "workspaces")
+    workspaces = [manager.create() for _ in range(20)]
+
+    paths = {workspace.path for workspace in workspaces}
+    assert len(paths) == 20
+    for workspace in workspaces:
+        assert workspace.path.is_dir()
+        assert workspace.path.parent == tmp_path / "workspaces"
+    assert (os.stat(tmp_path / "workspaces").st_mode & 0o777) == 0o700
+    assert manager.metrics()['active'] == 20
+
+def test_reap_by_age(tmp_path):
+    """Test that finished workspaces are evicted once unused for longer than the maximum age."""
+    clock = FakeClock()
+    manager = WorkspaceManager(tmp_path, quota_bytes=0, max_age=60, clock=clock)
+    old = _finish_with_file(manager, 10)
+    clock.now += 30
+    recent = _finish_with_file(manager, 10)
+    running = manager.create()
+
+    clock.now += 45
+    assert manager.reap() == [old.job_id]
+    assert not old.path.exists()
+    assert recent.path.exists()
+
+    # A job that is still running is never evicted
+    clock.now += 3600
+    assert manager.reap() == [recent.job_id]
+    assert running.path.exists()
+
+def test_reap_by_quota_least_recently_used(tmp_path):
+    """Test that the least recently used workspaces are evicted until under the quota."""
+    clock = FakeClock()
+    manager = WorkspaceManager(tmp_path, quota_bytes=250, max_age=0, clock=clock)
+    first = _finish_with_file(manager, 100)
+    clock.now += 1
+    second = _finish_with_file(manager, 100)
+    clock.now += 1
+    third = _finish_with_file(manager, 100)
+
+    # Downloading the first job makes the second the least recently used
+    clock.now += 1
+    manager.touch(first.job_id)
+
+    assert manager.reap() == [second.job_id]
+    assert first.path.exists() and third.path.exists()
+    assert manager.reap() == []
+
+    metrics = manager.metrics()
+    assert metrics['finished'] == 2
+    assert metrics['finished_bytes'] == 200
+    assert metrics['evicted'] == 1
+    assert metrics['evicted_bytes'] == 100
+
+def test_adopt_existing_workspaces(tmp_path):
+    """Test that workspaces left by an earlier manager are evicted too, and nothing else."""
+    old = time.time() - 7200
+    for name in ("job-leftover", "other-program"):
+        directory = tmp_path / name
+        directory.mkdir()
+        (directory / "notebook_cat_output.zip").write_bytes(b"x" * 10)
+        os.utime(directory / "notebook_cat_output.zip", (old, old))
+    (tmp_path / "job-leftover" / WORKSPACE_MARKER_FILE).touch()
+    os.utime(tmp_path / "job-leftover" / WORKSPACE_MARKER_FILE, (old, old))
+    os.utime(tmp_path / "job-leftover", (old, old))
+
+    manager = WorkspaceManager(tmp_path, max_age=3600)
+    assert manager.metrics()['finished'] == 1
+    assert manager.reap() == ["job-leftover"]
+    assert not (tmp_path / "job-leftover").exists()
+    assert (tmp_path / "other-program" / "notebook_cat_output.zip").exists()
+
+def test_default_root_per_manager():
+    """Test that managers without a root never share one."""
+    managers = [WorkspaceManager(), WorkspaceManager()]
+    try:
+        assert managers[0].root != managers[1].root
+        workspace = managers[0].create()
+        assert managers[1].metrics()['workspaces'] == 0
+        assert (workspace.path / WORKSPACE_MARKER_FILE).is_file()
+    finally:
+        for manager in managers:
+            shutil.rmtree(manager.root, ignore_errors=True)
+
+def test_reap_removes_files_without_lock(tmp_path, monkeypatch):
+    """Test that workspaces are deleted with the lock released, so other jobs are not held up."""
+    manager = WorkspaceManager(tmp_path, quota_bytes=1, max_age=0)
+    workspace = _finish_with_file(manager, 10)
+    held = []
+    rmtree = shutil.rmtree
+    def recording_rmtree(path, **kwargs):
+        held.append(manager._lock.locked())
+        rmtree(path, **kwargs)
+    monkeypatch.setattr(workspace_module.shutil, "rmtree", recording_rmtree)
+
+    assert manager.reap() == [workspace.job_id]
+    assert held == [False]
+    assert not workspace.path.exists()
+    assert manager.metrics()['workspaces'] == 0
+
+def test_download_touches_job(tmp_path, monkeypatch):
+    """Test that downloading a job's archive makes it the most recently used."""
+    from src.notebook_cat import webui
+    clock = FakeClock()
+    manager = WorkspaceManager(tmp_path, quota_bytes=150, max_age=0, clock=clock)
+    monkeypatch.setattr(webui, "_workspaces", manager)
+    first = _finish_with_file(manager, 100)
+    clock.now += 1
+    second = _finish_with_file(manager, 100)
+
+    job_id = manager.job_of(first.path / "notebook_cat_output.zip")
+    assert job_id == first.job_id
+    assert manager.job_of(tmp_path) is None
+    assert manager.job_of(tmp_path.parent / "elsewhere.zip") is None
+    clock.now += 1
+    webui.record_download(job_id)
+    webui.record_download(None)
+
+    assert manager.reap() == [second.job_id]
+
+def test_background_reaper(tmp_path):
+    """Test that the reaper thread evicts workspaces and stops when asked."""
+    manager = WorkspaceManager(tmp_path, quota_bytes=1, max_age=0, reap_interval=0.01)
+    workspace = _finish_with_file(manager, 10)
+
+    manager.start_reaper()
+    try:
+        deadline = time.time() + 5
+        while workspace.path.exists() and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        manager.stop_reaper()
+
+    assert not workspace.path.exists()
+    assert manager.metrics()['evicted'] == 1